@@ -3,7 +3,6 @@
 from mesa import Agent
 
 from Mailbox import Mailbox
-from MessageService import MessageService
 
 
 class CommunicatingAgent(Agent):
@@ -16,16 +15,17 @@ class CommunicatingAgent(Agent):
     attr:
         name: The name of the agent (str)
         mailbox: The mailbox of the agent (Mailbox)
-        message_service: The message service used to send and receive message (MessageService)
+        message_service: The message service of the model, used to send and receive message (MessageService)
     """
 
-    def __init__(self,model,name):
-        """ Create a new communicating agent.
+    def __init__(self,model,name,mailbox_history=None):
+        """ Create a new communicating agent, keeping at most mailbox_history read messages (all if None).
         """
         super().__init__(model)
         self.__name = name
-        self.__mailbox = Mailbox()
-        self.__messages_service = MessageService.get_instance()
+        self.__mailbox = Mailbox(mailbox_history)
+        self.__messages_service = model.message_service
+        self.__messages_service.register_agent(self)
 
     def step_agent(self):
         """ The step methods of the agent called by the scheduler at each time tick.
@@ -36,6 +36,19 @@ class CommunicatingAgent(Agent):
         """ Return the name of the communicating agent."""
         return self.__name
 
+    def set_name(self, name):
+        """ Rename the communicating agent, keeping the message service up to date.
+        """
+        self.__messages_service.unregister_agent(self)
+        self.__name = name
+        self.__messages_service.register_agent(self)
+
+    def remove(self):
+        """ Remove the agent from the model and from the message service.
+        """
+        self.__messages_service.unregister_agent(self)
+        super().remove()
+
     def receive_message(self, message):
         """ Receive a message (called by the MessageService object) and store it in the mailbox.
         """
@@ -46,6 +59,21 @@ class CommunicatingAgent(Agent):
         """
         self.__messages_service.send_message(message)
 
+    def broadcast_message(self, performative, content, agent_type=None):
+        """ Send one message to every agent of the given type (every agent if None) through the MessageService object.
+        """
+        self.__messages_service.broadcast(self.__name, performative, content, agent_type)
+
+    def subscribe(self, topic, region=None):
+        """ Subscribe to the messages published on the topic about a position in the region (anywhere if None).
+        """
+        self.__messages_service.subscribe(self, topic, region)
+
+    def publish_message(self, performative, topic, content, pos):
+        """ Send one message to the agents subscribed to the topic for the given position through the MessageService object.
+        """
+        self.__messages_service.publish(self.__name, performative, topic, content, pos)
+
     def get_new_messages(self):
         """ Return all the unread messages.
         """
@@ -56,6 +84,21 @@ class CommunicatingAgent(Agent):
         """
         return self.__mailbox.get_messages()
 
+    def get_mailbox_stats(self):
+        """ Return the number of messages held by the mailbox and the number of read messages it evicted.
+        """
+        return {"size": len(self.__mailbox), "evicted": self.__mailbox.evicted}
+
+    def get_mailbox_state(self):
+        """ Return the read messages, the unread messages and the number of evicted messages of the mailbox.
+        """
+        return self.__mailbox.get_state()
+
+    def set_mailbox_state(self, read_messages, unread_messages, evicted):
+        """ Replace the contents of the mailbox (used to restore a checkpoint).
+        """
+        self.__mailbox.set_state(read_messages, unread_messages, evicted)
+
     def get_messages_from_performative(self, performative):
         """ Return a list of messages which have the same performative.
         """
@@ -1,38 +1,68 @@
 #!/usr/bin/env python3
 
+from collections import deque
+
 
 class Mailbox:
     """Mailbox class.
     Class implementing the mailbox object which manages messages in communicating agents.
 
+    The read messages are kept in a ring buffer of max_read messages (every message if None, none
+    if 0): once it is full, reading a new message evicts the oldest read one. The unread and kept
+    read messages are indexed by performative and by sender.
+
     attr:
         unread_messages: The list of unread messages
-        read_messages: The list of read messages
+        read_messages: The ring buffer of read messages (deque)
+        max_read: The maximum number of read messages kept, None for no limit (int)
+        evicted: The number of read messages evicted from the ring buffer so far (int)
      """
 
-    def __init__(self):
+    def __init__(self, max_read=None):
         """ Create a new Mailbox.
         """
         self.__unread_messages = []
-        self.__read_messages = []
+        self.__read_messages = deque()
+        self.max_read = max_read
+        self.evicted = 0
+        self.__by_performative = {}
+        self.__by_exp = {}
+
+    def __len__(self):
+        """ Return the number of messages held (unread and kept read messages).
+        """
+        return len(self.__unread_messages) + len(self.__read_messages)
 
     def receive_messages(self, message):
         """ Receive a message and add it in the unread messages list.
         """
-        
+
         self.__unread_messages.append(message)
-        
+        self.__by_performative.setdefault(message.get_performative(), deque()).append(message)
+        self.__by_exp.setdefault(message.get_exp(), deque()).append(message)
+
+    def _evict_oldest(self):
+        #Le plus ancien message lu est aussi le plus ancien de ses deux index : les messages non lus
+        #sont toujours plus récents que les messages lus
+        message = self.__read_messages.popleft()
+        for index, key in ((self.__by_performative, message.get_performative()), (self.__by_exp, message.get_exp())):
+            index[key].popleft()
+            if not index[key]:
+                del index[key]
+        self.evicted += 1
 
     def get_new_messages(self):
         """ Return all the messages from unread messages list.
         """
-        
+
         unread_messages = self.__unread_messages.copy()
-       
+
         if len(unread_messages) > 0:
-           
+
             for messages in unread_messages:
                 self.__read_messages.append(messages)
+                if self.max_read is not None and len(self.__read_messages) > self.max_read:
+                    self._evict_oldest()
 
         self.__unread_messages.clear()
         return unread_messages
@@ -42,22 +72,36 @@ class Mailbox:
         """
         if len(self.__unread_messages) > 0:
             self.get_new_messages()
-        return self.__read_messages
+        return list(self.__read_messages)
+
+    def get_state(self):
+        """ Return the kept read messages, the unread messages (both in order of arrival) and the number
+        of evicted messages, without marking anything as read.
+        """
+        return list(self.__read_messages), list(self.__unread_messages), self.evicted
+
+    def set_state(self, read_messages, unread_messages, evicted):
+        """ Replace the contents of the mailbox (see get_state) and rebuild its indexes.
+        """
+        self.__read_messages = deque(read_messages)
+        self.__unread_messages = list(unread_messages)
+        self.evicted = evicted
+        self.__by_performative = {}
+        self.__by_exp = {}
+        #Les messages lus sont plus anciens que les messages non lus : les index restent dans l'ordre d'arrivée
+        for message in self.__read_messages:
+            self.__by_performative.setdefault(message.get_performative(), deque()).append(message)
+            self.__by_exp.setdefault(message.get_exp(), deque()).append(message)
+        for message in self.__unread_messages:
+            self.__by_performative.setdefault(message.get_performative(), deque()).append(message)
+            self.__by_exp.setdefault(message.get_exp(), deque()).append(message)
 
     def get_messages_from_performative(self, performative):
-        """ Return a list of messages which have the same performative.
+        """ Return a list of messages which have the same performative, in order of arrival.
         """
-        messages_from_performative = []
-        for message in self.__unread_messages + self.__read_messages:
-            if message.get_performative() == performative:
-                messages_from_performative.append(message)
-        return messages_from_performative
+        return list(self.__by_performative.get(performative, ()))
 
     def get_messages_from_exp(self, exp):
-        """ Return a list of messages which have the same sender.
+        """ Return a list of messages which have the same sender, in order of arrival.
         """
-        messages_from_exp = []
-        for message in self.__unread_messages + self.__read_messages:
-            if message.get_exp() == exp:
-                messages_from_exp.append(message)
-        return messages_from_exp
+        return list(self.__by_exp.get(exp, ()))
@@ -1,25 +1,56 @@
 #!/usr/bin/env python3
 
+from typing import NamedTuple
+
+from objects import WasteType
+
+
+class WasteNotification(NamedTuple):
+    """WasteNotification class.
+    Typed payload of the waste notifications (REQUEST when a red waste is dropped, DOING when a robot
+    targets a waste). It is an immutable tuple, shared by all the recipients of a broadcast.
+
+    attr:
+        waste_pos: the position of the waste (tuple)
+        waste_type: the type of the waste (WasteType)
+        tick: the step at which the notification was created (int)
+        agent_pos: the position of the sender when it targets the waste, None otherwise (tuple)
+    """
+    waste_pos: tuple
+    waste_type: WasteType
+    tick: int
+    agent_pos: tuple = None
+
 
 class Message:
     """Message class.
     Class implementing the message object which is exchanged between agents through a message service
     during communication.
 
+    Messages are slotted and immutable: a message can be shared by the recipients of a broadcast.
+
     attr:
         from_agent: the sender of the message (id)
-        to_agent: the receiver of the message (id)
+        to_agent: the receiver of the message (id), or the tuple of receivers of a multicast message
         message_performative: the performative of the message
         content: the content of the message
+        ttl: the number of ticks after which the message is dropped if not yet dispatched, None for no limit (int)
      """
 
-    def __init__(self, from_agent, to_agent, message_performative, content):
+    __slots__ = ("__from_agent", "__to_agent", "__message_performative", "__content", "__ttl")
+
+    def __init__(self, from_agent, to_agent, message_performative, content, ttl=None):
         """ Create a new message.
         """
-        self.__from_agent = from_agent
-        self.__to_agent = to_agent
-        self.__message_performative = message_performative
-        self.__content = content
+        init = object.__setattr__
+        init(self, "_Message__from_agent", from_agent)
+        init(self, "_Message__to_agent", to_agent)
+        init(self, "_Message__message_performative", message_performative)
+        init(self, "_Message__content", content)
+        init(self, "_Message__ttl", ttl)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Message is immutable")
 
     def __str__(self):
         """ Return Message as a String.
@@ -46,3 +77,8 @@ class Message:
         """ Return the content of the message.
         """
         return self.__content
+
+    def get_ttl(self):
+        """ Return the time to live of the message, in ticks.
+        """
+        return self.__ttl
@@ -1,70 +1,207 @@
 #!/usr/bin/env python3
 
+from itertools import count
+
+from Message import Message, WasteNotification
+from logs import messaging_log
+
+#Côté (en cellules) des buckets de l'index spatial des abonnements
+SUBSCRIPTION_BUCKET = 8
+
 class MessageService:
     """MessageService class.
     Class implementing the message service used to dispatch messages between communicating agents.
 
-    Not intended to be created more than once: it's a singleton.
+    Each model owns its message service (model.message_service), so that several models can run
+    side by side in the same process.
 
     attr:
     
         messages_to_proceed: the list of message to proceed mailbox of the agent (list)
+        agents: the registered communicating agents, by name (dict)
+        subscriptions: the subscriptions of each topic, by bucket of the region they cover (None for the whole grid) (dict)
+        coalesce: group the messages of a tick by recipient and keep the last one of each (sender, performative, waste_pos) (bool)
+        ttl: the default time to live of the messages, in ticks since they were sent (a message sent during
+             a step is dispatched at the next one, 1 tick later), None for no limit (int)
+        stats: the number of messages delivered to a mailbox, dropped as duplicates and dropped as expired (dict)
     """
 
-    __instance = None
-
-    @staticmethod
-    def get_instance():
-        """ Static access method.
+    def __init__(self, model,instant_delivery=True, coalesce=False, ttl=None):
+        """ Create a new MessageService object for the given model.
         """
-        return MessageService.__instance
-
-    def __init__(self, model,instant_delivery=True):
-        """ Create a new MessageService object.
-        """
-        if MessageService.__instance is not None:
-            MessageService.__instance = None
-        
-        MessageService.__instance = self
         self.__model = model
         self.__instant_delivery = instant_delivery
         self.__messages_to_proceed = []
+        self.__outboxes = None
+        self.__agents = {}
+        self.__subscriptions = {}
+        self.__subscription_ids = count()
+        self.__coalesce = coalesce
+        self.__ttl = ttl
+        self.stats = {"delivered": 0, "duplicates": 0, "expired": 0}
+
+    def register_agent(self, agent):
+        """ Register the agent under its current name (called by CommunicatingAgent).
+        """
+        self.__agents[agent.get_name()] = agent
+
+    def unregister_agent(self, agent):
+        """ Forget the agent: messages can no longer be dispatched to it.
+        """
+        if self.__agents.get(agent.get_name()) is agent:
+            del self.__agents[agent.get_name()]
+            self.unsubscribe(agent)
+
+    def subscribe(self, agent, topic, region=None):
+        """ Subscribe the agent to the messages published on the topic about a position in the region
+        (x_min, x_max, y_min, y_max), or anywhere if region is None. The subscription is indexed in
+        every bucket of SUBSCRIPTION_BUCKET cells the region overlaps.
+        """
+        subscription = (next(self.__subscription_ids), agent.get_name(), region)
+        buckets = self.__subscriptions.setdefault(topic, {})
+        if region is None:
+            buckets.setdefault(None, []).append(subscription)
+            return
+        x_min, x_max, y_min, y_max = region
+        for bx in range(x_min // SUBSCRIPTION_BUCKET, x_max // SUBSCRIPTION_BUCKET + 1):
+            for by in range(y_min // SUBSCRIPTION_BUCKET, y_max // SUBSCRIPTION_BUCKET + 1):
+                buckets.setdefault((bx, by), []).append(subscription)
+
+    def unsubscribe(self, agent, topic=None):
+        """ Remove the subscriptions of the agent to the topic (to every topic if None).
+        """
+        name = agent.get_name()
+        topics = self.__subscriptions if topic is None else [topic]
+        for t in topics:
+            for subscriptions in self.__subscriptions.get(t, {}).values():
+                subscriptions[:] = [s for s in subscriptions if s[1] != name]
+
+    def publish(self, exp, performative, topic, content, pos):
+        """ Send a single message to the agents subscribed to the topic whose region contains pos,
+        except the sender, in subscription order. Only the subscriptions indexed in the bucket of pos
+        (and those without region) are looked at.
+        """
+        buckets = self.__subscriptions.get(topic, {})
+        x, y = pos
+        candidates = buckets.get(None, []) + buckets.get((x // SUBSCRIPTION_BUCKET, y // SUBSCRIPTION_BUCKET), [])
+        dest = tuple([name for _, name, region in sorted(candidates)
+                      if name != exp and (region is None or (region[0] <= x <= region[1] and region[2] <= y <= region[3]))])
+        if dest:
+            self.send_message(Message(exp, dest, performative, content))
 
     def set_instant_delivery(self, instant_delivery):
         """ Set the instant delivery parameter.
         """
         self.__instant_delivery = instant_delivery
 
+    def start_buffering(self):
+        """ Keep the messages sent from now on in one outbox per sender until flush_outboxes.
+        """
+        self.__outboxes = {}
+
+    def flush_outboxes(self, senders):
+        """ Stop buffering and send the buffered messages, sender by sender in the given order.
+        """
+        outboxes, self.__outboxes = self.__outboxes, None
+        for sender in senders:
+            for message in outboxes.pop(sender, []):
+                self.send_message(message)
+
     def send_message(self, message):
         """ Dispatch message if instant delivery active, otherwise add the message to proceed list.
         """
-        print(message)
+        if self.__outboxes is not None:
+            self.__outboxes.setdefault(message.get_exp(), []).append(message)
+            return
+        messaging_log.debug("%s", message)
         if self.__instant_delivery:
     
             self.dispatch_message(message)
         else:
-            self.__messages_to_proceed.append(message)
+            self.__messages_to_proceed.append((self.__model.step_count, message))
             
            
 
+    def get_pending_messages(self):
+        """ Return the (tick sent, message) pairs waiting for the next dispatch.
+        """
+        return list(self.__messages_to_proceed)
+
+    def set_pending_messages(self, pending):
+        """ Replace the (tick sent, message) pairs waiting for the next dispatch (used to restore a checkpoint).
+        """
+        self.__messages_to_proceed = list(pending)
+
+    def broadcast(self, exp, performative, content, agent_type=None):
+        """ Send a single message to every registered agent of the given type (every agent if None),
+        except the sender. The message is created once and fanned out to the mailboxes on dispatch.
+        """
+        dest = tuple([name for name, agent in self.__agents.items()
+                      if name != exp and (agent_type is None or getattr(agent, "type", None) == agent_type)])
+        if dest:
+            self.send_message(Message(exp, dest, performative, content))
+
     def dispatch_message(self, message):
-        """ Dispatch the message to the right agent.
+        """ Dispatch the message to the right agent, or to each agent of a multicast message.
         """
-    
-        self.find_agent_from_name(message.get_dest()).receive_message(message)
+        dest = message.get_dest()
+        if isinstance(dest, tuple):
+            for name in dest:
+                self.__agents[name].receive_message(message)
+            self.stats["delivered"] += len(dest)
+        else:
+            self.find_agent_from_name(dest).receive_message(message)
+            self.stats["delivered"] += 1
 
     def dispatch_messages(self):
-        """ Proceed each message received by the message service.
+        """ Proceed each message received by the message service. The messages older than their time
+        to live are dropped and, with coalesce, only the last message of each (sender, performative,
+        waste_pos) is delivered to each recipient.
         """
-        if len(self.__messages_to_proceed) > 0:
-            for message in self.__messages_to_proceed:
+        pending, self.__messages_to_proceed = self.__messages_to_proceed, []
+        if not self.__coalesce and self.__ttl is None:
+            for _, message in pending:
                 self.dispatch_message(message)
+            return
 
-        self.__messages_to_proceed.clear()
+        tick = self.__model.step_count
+        live = []
+        for sent_at, message in pending:
+            ttl = message.get_ttl() if message.get_ttl() is not None else self.__ttl
+            if ttl is not None and tick - sent_at > ttl:
+                self.stats["expired"] += 1
+            else:
+                live.append(message)
+        if not self.__coalesce:
+            for message in live:
+                self.dispatch_message(message)
+            return
+
+        #Une boîte d'envoi par destinataire ; un message remplace le précédent de même clé
+        inboxes = {}
+        for i, message in enumerate(live):
+            dest = message.get_dest()
+            key = self._dedup_key(message) or i
+            for name in (dest if isinstance(dest, tuple) else (dest,)):
+                inbox = inboxes.setdefault(name, {})
+                if key in inbox:
+                    self.stats["duplicates"] += 1
+                    del inbox[key]
+                inbox[key] = message
+        for name, inbox in inboxes.items():
+            agent = self.find_agent_from_name(name)
+            for message in inbox.values():
+                agent.receive_message(message)
+            self.stats["delivered"] += len(inbox)
+
+    @staticmethod
+    def _dedup_key(message):
+        content = message.get_content()
+        if isinstance(content, WasteNotification):
+            return (message.get_exp(), message.get_performative(), content.waste_pos)
+        return None
 
     def find_agent_from_name(self, agent_name):
         """ Return the agent according to the agent name given.
         """
-        for agent in self.__model.robots:
-            if agent.get_name() == agent_name:
-                return agent
\ No newline at end of file
+        return self.__agents.get(agent_name)
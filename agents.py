@@ -10,23 +10,38 @@ Groupe 21
 '''
 
 import mesa
-from objects import Waste
+from objects import WasteType
 from CommunicatingAgent import CommunicatingAgent
 from MessagePerformative import MessagePerformative
-from Message import Message
+from Message import WasteNotification
+from logs import movement_log, messaging_log, lifecycle_log
+
+ROUTE_PATIENCE = 3  # Steps bloqués avant de contourner les robots sur le plus court chemin
 
 class RobotAgent(CommunicatingAgent):
     def __init__(self, unique_id, model, pos, assigned_zone=None):
-        super().__init__(model, f"Robot_{unique_id}")
+        super().__init__(model, f"Robot_{unique_id}", mailbox_history=model.mailbox_history)
         self.knowledge = {} 
         self.inventory = []
-        self.distance = 0
+        self._distance = 0
         self.unique_id = unique_id
         self.pos = pos
         self.assigned_zone = assigned_zone
         self.last_dropped_waste_id = None  # ID du dernier déchet déposé à ignorer
         self._last_notified_target = None  # Pour éviter des notifications dupliquées
         self.type = None  # Sera défini dans les sous-classes
+        self.walk_random = model.random  # Générateur des déplacements aléatoires (propre au robot en mode two_phase)
+        self.route_blocked_steps = 0  # Steps consécutifs où le plus court chemin était bloqué (option routing)
+
+    @property
+    def distance(self):
+        return self._distance
+
+    @distance.setter
+    def distance(self, value):
+        # Tenir à jour le cumul par couleur du modèle (lu par le DataCollector)
+        self.model.distance_by_type[self.type] += value - self._distance
+        self._distance = value
 
     def move(self):
         if not self.assigned_zone:
@@ -64,8 +79,7 @@ class RobotAgent(CommunicatingAgent):
             self.direction_y *= -1
 
         new_pos = (new_x, new_y)
-        cell_contents = self.model.grid.get_cell_list_contents(new_pos)
-        if not any(isinstance(obj, RobotAgent) for obj in cell_contents):
+        if not self.model.grid.has_robot(new_pos):
             self.model.grid.move_agent(self, new_pos)
             self.distance += 1
 
@@ -94,8 +108,92 @@ class RobotAgent(CommunicatingAgent):
 
         # Si aucun déchet détecté, continuer avec le comportement normal
         return {"action": "move"}
+
+    def seek_area(self):
+        """ Return the area (x_min, x_max, y_min, y_max) where the robot looks for the nearest waste:
+        its assigned zone, without the deposit column it has to ignore.
+        """
+        x_min, x_max, y_min, y_max = self.assigned_zone
+        if hasattr(self, "ignore_last_column") and x_max == self.deposit_column:
+            x_max -= 1
+        return (x_min, x_max, y_min, y_max)
+
+    def seek_move(self):
+        """ Return a move_to action one cell closer to the nearest waste of the robot's type in its
+        seek area, found with the waste index of the grid. Return None if the model is not created
+        with seek_nearest, if there is no such waste, if another robot stands on it (the waste is
+        left to that robot) or if both cells closer to it are occupied.
+        """
+        if not self.model.seek_nearest:
+            return None
+        area = self.seek_area()
+        goal = self.model.grid.nearest_waste(self.pos, self.type, area=area)
+        if goal is None or goal == self.pos or self.model.grid.has_robot(goal):
+            return None
+        x, y = self.pos
+        dx, dy = goal[0] - x, goal[1] - y
+        steps = [(x + (dx > 0) - (dx < 0), y), (x, y + (dy > 0) - (dy < 0))]
+        # Prioriser le mouvement sur l'axe le plus éloigné
+        if abs(dy) > abs(dx):
+            steps.reverse()
+        x_min, x_max, y_min, y_max = area
+        for step in steps:
+            if step != self.pos and x_min <= step[0] <= x_max and y_min <= step[1] <= y_max:
+                if not self.model.grid.has_robot(step):
+                    return {"action": "move_to", "target": step}
+        return None
+
+    def notify_region(self):
+        """ Return the region (x_min, x_max, y_min, y_max) of the events the robot subscribes to: its
+        assigned zone widened by the notify_radius of the model, or None (whole grid) without notify_radius.
+        """
+        radius = self.model.notify_radius
+        if radius is None:
+            return None
+        x_min, x_max, y_min, y_max = self.assigned_zone
+        return (max(x_min - radius, 0), min(x_max + radius, self.model.width - 1),
+                max(y_min - radius, 0), min(y_max + radius, self.model.height - 1))
+
+    def route_to(self, destinations):
+        """ Return a move_to action on a shortest path to the closest destination cell, through the
+        allowed zones of the robot. While the path is blocked by other robots, return None for
+        ROUTE_PATIENCE steps, then detour around them. Return None as well if the model is not
+        created with routing or if no step is possible.
+        """
+        if self.model.router is None or not destinations:
+            return None
+        # Attendre avant de contourner : deux robots qui s'évitent en même temps peuvent se bloquer indéfiniment
+        step = self.model.router.next_step(self.pos, destinations, avoid=self.model.grid.has_robot,
+                                           zones=tuple(self.allowed_zones),
+                                           detour=self.route_blocked_steps >= ROUTE_PATIENCE)
+        if step is None and self.pos not in destinations:
+            self.route_blocked_steps += 1
+            return None
+        self.route_blocked_steps = 0
+        return None if step is None else {"action": "move_to", "target": step}
+
+    def route_to_drop(self, column):
+        """ Same as route_to, towards the cells of the column where a waste can be dropped.
+        """
+        if self.model.router is None:
+            return None
+        return self.route_to(self.model.router.drop_cells(column))
+
+    def default_move(self):
+        """ Return the action of a robot with nothing else to do: go towards the nearest waste
+        (seek_move), or sweep its zone with move.
+        """
+        return self.seek_move() or {"action": "move"}
     
-    def step_agent(self):
+    def decide(self):
+        """ First phase of a two_phase step: process the messages and deliberate on the current
+        state of the grid. Return the chosen action without applying it.
+        """
+        self.process_messages()
+        self.update_knowledge()
+        return self.deliberate(self.knowledge)
+
+    def update_knowledge(self):
         # Mise à jour knowledge avec les percepts, l'inventaire et la position
         percepts = self.get_percepts()
         zone_width = self.model.width // 3
@@ -114,7 +212,10 @@ class RobotAgent(CommunicatingAgent):
         # Restaurer les waste_locations
         if waste_locations:
             self.knowledge["waste_locations"] = waste_locations
-            
+
+    def step_agent(self):
+        self.update_knowledge()
+
         # Délibération et action après avoir traité les messages (déjà fait dans step)
         action = self.deliberate(self.knowledge)
         new_percepts = self.model.do(self, action)
@@ -133,23 +234,11 @@ class RobotAgent(CommunicatingAgent):
         
         self._last_notified_target = waste_pos
         
-        content = {
-            "waste_pos": waste_pos,
-            "waste_type": waste_type,
-            "agent_pos": self.pos
-        }
+        content = WasteNotification(waste_pos, WasteType(waste_type), self.model.step_count, self.pos)
         
-        # Envoie le message à tous les robots du même type, sauf lui-même
-        for agent in self.model.robots:
-            if hasattr(agent, 'type') and agent.type == self.type and agent != self:
-                message = Message(
-                    self.get_name(),
-                    agent.get_name(),
-                    MessagePerformative.DOING,
-                    content
-                )
-                self.send_message(message)
-                print(f"[DOING] {self.get_name()} is targeting {waste_type} waste at {waste_pos}")
+        # Envoie un seul message aux robots du même type abonnés aux cibles proches de waste_pos, sauf lui-même
+        self.publish_message(MessagePerformative.DOING, f"doing/{self.type}", content, waste_pos)
+        messaging_log.info("[DOING] %s is targeting %s waste at %s", self.get_name(), waste_type, waste_pos)
 
 class GreenRobot(RobotAgent):
     def __init__(self, unique_id, model, pos, assigned_zone=None):
@@ -171,18 +260,21 @@ class GreenRobot(RobotAgent):
             self.hasAWaste = True
             if pos[0] == zone_width - 1:  # À l'extrémité de z1
                 # Vérifier s'il y a des déchets dans la cellule actuelle
-                cell_has_waste = any(hasattr(obj, "waste_type") for obj in current_cell)
+                cell_has_waste = not self.model.grid.is_free_for_drop(pos)
                 if not cell_has_waste:
                     self.hasAWaste = False
                     return {"action": "drop", "waste": "green"}
                 else:
-                    return {"action": "move_vertical"}
+                    return self.route_to_drop(zone_width - 1) or {"action": "move_vertical"}
             else:
+                # Plus court chemin vers une case libre de la colonne de dépôt (option routing)
+                route = self.route_to_drop(zone_width - 1)
+                if route:
+                    return route
                 # Vérifier si on peut se déplacer vers l'est
                 east_pos = (pos[0] + 1, pos[1])
                 if east_pos[0] < self.model.width:
-                    east_cell = self.model.grid.get_cell_list_contents(east_pos)
-                    if any(isinstance(obj, RobotAgent) for obj in east_cell):
+                    if self.model.grid.has_robot(east_pos):
                         return {"action": "move_vertical"}  # Alternative si bloqué
                 return {"action": "move_east"}
         
@@ -204,15 +296,10 @@ class GreenRobot(RobotAgent):
             if nearby_pos != pos:
                 for agent in agents:
                     if hasattr(agent, "waste_type") and agent.waste_type == "green":
-                        cell_contents = self.model.grid.get_cell_list_contents(nearby_pos)
-                        allowed = False
-                        for obj in cell_contents:
-                            if hasattr(obj, "zone") and obj.zone in self.allowed_zones:
-                                allowed = True
-                        if allowed:
+                        if self.model.zones.zone_at(nearby_pos) in self.allowed_zones:
                             return {"action": "move", "target": nearby_pos}
 
-        return {"action": "move"}
+        return self.default_move()
 
     # Surcharger pour les robots verts pour ne pas traiter les messages
     def process_messages(self):
@@ -262,14 +349,12 @@ class GreenRobot(RobotAgent):
         # Vérification supplémentaire que la position est dans la zone assignée
         if not (x_min <= new_x <= x_max and y_min <= new_y <= y_max):
             new_x, new_y = x, y  # Rester sur place si hors zone
-            print(f"[WARNING] {self.get_name()} tente de sortir de sa zone: pos={new_x,new_y}, zone={x_min,x_max,y_min,y_max}")
+            movement_log.warning("[WARNING] %s tente de sortir de sa zone: pos=%s, zone=%s", self.get_name(), (new_x, new_y), (x_min, x_max, y_min, y_max))
             self.direction_x *= -1
             self.direction_y *= -1
 
         new_pos = (new_x, new_y)
-        cell_contents = self.model.grid.get_cell_list_contents(new_pos)
-        
-        if not any(isinstance(obj, RobotAgent) for obj in cell_contents):
+        if not self.model.grid.has_robot(new_pos):
             # Déplacement effectif, réinitialiser le compteur de blocage
             self.model.grid.move_agent(self, new_pos)
             self.distance += 1
@@ -277,11 +362,11 @@ class GreenRobot(RobotAgent):
         else:
             # Blocage détecté, incrémenter le compteur
             self.blocked_steps += 1
-            print(f"[INFO] {self.get_name()} bloqué depuis {self.blocked_steps} steps à {self.pos}.")
+            movement_log.info("[INFO] %s bloqué depuis %s steps à %s.", self.get_name(), self.blocked_steps, self.pos)
 
             # Si bloqué depuis plus de 5 steps, tenter un mouvement alternatif
             if self.blocked_steps > 5:
-                print(f"[INFO] {self.get_name()} tente un mouvement alternatif.")
+                movement_log.info("[INFO] %s tente un mouvement alternatif.", self.get_name())
                 
                 # Essayer plusieurs directions alternatives
                 alternatives = []
@@ -303,9 +388,8 @@ class GreenRobot(RobotAgent):
                     # Vérifier que la position est valide (dans la grille et dans la zone)
                     if (0 <= alt_pos[0] < grid_width and 0 <= alt_pos[1] < grid_height and
                         x_min <= alt_pos[0] <= x_max and y_min <= alt_pos[1] <= y_max):
-                        alt_cell_contents = self.model.grid.get_cell_list_contents(alt_pos)
-                        if not any(isinstance(obj, RobotAgent) for obj in alt_cell_contents):
-                            print(f"[INFO] {self.get_name()} se déplace en position alternative {alt_pos}.")
+                        if not self.model.grid.has_robot(alt_pos):
+                            movement_log.info("[INFO] %s se déplace en position alternative %s.", self.get_name(), alt_pos)
                             self.model.grid.move_agent(self, alt_pos)
                             self.distance += 1
                             self.blocked_steps = 0
@@ -341,18 +425,24 @@ class GreenGather(GreenRobot):
                 return {"action": "transform", "from": "green", "to": "yellow"}
 
         # Vérifier s'il y a des déchets dans la cellule actuelle
-        cell_has_waste = any(hasattr(obj, "waste_type") for obj in current_cell)
+        cell_has_waste = not self.model.grid.is_free_for_drop(pos)
         
         if self.hasTransformed or len([w for w in inventory if w == "yellow"]) == 1:
             if pos[0] == zone_width - 1:  # À l'extrémité de z1
                 if not cell_has_waste:
                     return {"action": "drop", "waste": "yellow"}
                 else:
-                    return {"action": "move_vertical"}
+                    return self.route_to_drop(zone_width - 1) or {"action": "move_vertical"}
             else:
-                return {"action": "move_east"}
+                return self.route_to_drop(zone_width - 1) or {"action": "move_east"}
 
-        return {"action": "move"}  
+        return self.default_move()
+
+    def seek_area(self):
+        """ Return the column of the gather robot, the only one it sweeps.
+        """
+        x_min, x_max, y_min, y_max = self.assigned_zone
+        return (x_max, x_max, y_min, y_max)
 
     def move(self):
         if not self.assigned_zone:
@@ -384,25 +474,23 @@ class GreenGather(GreenRobot):
             
         # Vérification supplémentaire que la position reste dans la colonne assignée
         if x < x_min or x > x_max:
-            print(f"[CRITICAL] {self.get_name()} hors de sa colonne assignée: x={x}, zone={x_min}-{x_max}")
+            movement_log.critical("[CRITICAL] %s hors de sa colonne assignée: x=%s, zone=%s-%s", self.get_name(), x, x_min, x_max)
             # Corriger la position pour revenir dans la zone
             x = max(x_min, min(x_max, x))
 
         new_pos = (x, new_y)
-        cell_contents = self.model.grid.get_cell_list_contents(new_pos)
-        
-        if not any(isinstance(obj, RobotAgent) for obj in cell_contents):
+        if not self.model.grid.has_robot(new_pos):
             self.model.grid.move_agent(self, new_pos)
             self.distance += 1
             self.blocked_steps = 0
         else:
             # Blocage détecté, incrémenter le compteur
             self.blocked_steps += 1
-            print(f"[INFO] {self.get_name()} bloqué depuis {self.blocked_steps} steps.")
+            movement_log.info("[INFO] %s bloqué depuis %s steps.", self.get_name(), self.blocked_steps)
 
             # Si bloqué depuis plus de 5 steps, tenter un mouvement alternatif
             if self.blocked_steps > 5:
-                print(f"[INFO] {self.get_name()} tente un mouvement alternatif.")
+                movement_log.info("[INFO] %s tente un mouvement alternatif.", self.get_name())
                 
                 # Inverser complètement la direction verticale et essayer de se déplacer
                 self.direction_y *= -1
@@ -411,20 +499,24 @@ class GreenGather(GreenRobot):
                 # Vérifier que la position alternative est valide (dans la zone et la grille)
                 if y_min <= alt_y <= y_max and 0 <= alt_y < grid_height:
                     alt_pos = (x, alt_y)
-                    alt_cell_contents = self.model.grid.get_cell_list_contents(alt_pos)
-                    if not any(isinstance(obj, RobotAgent) for obj in alt_cell_contents):
-                        print(f"[INFO] {self.get_name()} se déplace en position alternative {alt_pos}.")
+                    if not self.model.grid.has_robot(alt_pos):
+                        movement_log.info("[INFO] %s se déplace en position alternative %s.", self.get_name(), alt_pos)
                         self.model.grid.move_agent(self, alt_pos)
                         self.distance += 1
                         self.blocked_steps = 0
                     else:
                         # Si la première alternative échoue, essayer de s'arrêter temporairement
-                        print(f"[INFO] {self.get_name()} reste sur place et attend.")
+                        movement_log.info("[INFO] %s reste sur place et attend.", self.get_name())
                         # Ne rien faire pendant ce tour pour laisser les autres se déplacer
                         # Le compteur continue d'augmenter pour une nouvelle tentative au prochain tour
 
 
 class AloneGreen(GreenGather):
+    def seek_area(self):
+        """ Return the whole assigned zone, swept by the robot alone of its colour.
+        """
+        return self.assigned_zone
+
     def move(self):
         if not self.assigned_zone:
             raise ValueError(f"Robot {self.unique_id} n'a pas de zone assignée.")
@@ -464,25 +556,23 @@ class AloneGreen(GreenGather):
             
         if not (x_min <= new_x <= x_max and y_min <= new_y <= y_max):
             new_x, new_y = x, y  # Rester sur place si hors zone
-            print(f"[WARNING] {self.get_name()} tente de sortir de sa zone: pos={new_x,new_y}, zone={x_min,x_max,y_min,y_max}")
+            movement_log.warning("[WARNING] %s tente de sortir de sa zone: pos=%s, zone=%s", self.get_name(), (new_x, new_y), (x_min, x_max, y_min, y_max))
             self.direction_x *= -1
             self.direction_y *= -1
 
         new_pos = (new_x, new_y)
-        cell_contents = self.model.grid.get_cell_list_contents(new_pos)
-        
-        if not any(isinstance(obj, RobotAgent) for obj in cell_contents):
+        if not self.model.grid.has_robot(new_pos):
             self.model.grid.move_agent(self, new_pos)
             self.distance += 1
             self.blocked_steps = 0
         else:
             # Blocage détecté, incrémenter le compteur
             self.blocked_steps += 1
-            print(f"[INFO] {self.get_name()} bloqué depuis {self.blocked_steps} steps.")
+            movement_log.info("[INFO] %s bloqué depuis %s steps.", self.get_name(), self.blocked_steps)
 
             # Si bloqué depuis plus de 5 steps, tenter un mouvement alternatif
             if self.blocked_steps > 5:
-                print(f"[INFO] {self.get_name()} tente un mouvement alternatif.")
+                movement_log.info("[INFO] %s tente un mouvement alternatif.", self.get_name())
                 
                 # Essayer plusieurs directions alternatives
                 alternatives = []
@@ -504,9 +594,8 @@ class AloneGreen(GreenGather):
                     # Vérifier que la position est valide (dans la grille et dans la zone)
                     if (0 <= alt_pos[0] < grid_width and 0 <= alt_pos[1] < grid_height and
                         x_min <= alt_pos[0] <= x_max and y_min <= alt_pos[1] <= y_max):
-                        alt_cell_contents = self.model.grid.get_cell_list_contents(alt_pos)
-                        if not any(isinstance(obj, RobotAgent) for obj in alt_cell_contents):
-                            print(f"[INFO] {self.get_name()} se déplace en position alternative {alt_pos}.")
+                        if not self.model.grid.has_robot(alt_pos):
+                            movement_log.info("[INFO] %s se déplace en position alternative %s.", self.get_name(), alt_pos)
                             self.model.grid.move_agent(self, alt_pos)
                             self.distance += 1
                             self.blocked_steps = 0
@@ -515,7 +604,7 @@ class AloneGreen(GreenGather):
 class YellowRobot(RobotAgent):
     def __init__(self, unique_id, model, pos, assigned_zone=None):
         super().__init__(unique_id, model, pos, assigned_zone)
-        self._CommunicatingAgent__name = f"YellowRobot_{unique_id}"
+        self.set_name(f"YellowRobot_{unique_id}")
         self.type = "yellow"
         self.allowed_zones = ["z2"]
         self.hasAWaste = False
@@ -524,7 +613,7 @@ class YellowRobot(RobotAgent):
         if assigned_zone:
             x_min, x_max, y_min, y_max = assigned_zone
             if not (x_min <= pos[0] <= x_max and y_min <= pos[1] <= y_max):
-                print(f"[ERROR] YellowRobot_{unique_id} initialisé hors de sa zone: pos={pos}, zone={assigned_zone}")
+                lifecycle_log.error("[ERROR] YellowRobot_%s initialisé hors de sa zone: pos=%s, zone=%s", unique_id, pos, assigned_zone)
 
     def deliberate(self, knowledge):
         percepts = knowledge["percepts"]
@@ -537,13 +626,17 @@ class YellowRobot(RobotAgent):
         if len([w for w in inventory if w == "yellow"]) > 0:
             self.hasAWaste = True
             if pos[0] >= zone_width * 2 - 1:  # À l'extrémité de z2
-                cell_has_waste = any(hasattr(obj, "waste_type") for obj in current_cell)
+                cell_has_waste = not self.model.grid.is_free_for_drop(pos)
                 if not cell_has_waste:
                     self.hasAWaste = False
                     return {"action": "drop", "waste": "yellow"}
                 else:
-                    return {"action": "move_vertical"}
+                    return self.route_to_drop(zone_width * 2 - 1) or {"action": "move_vertical"}
             else:
+                # Plus court chemin vers une case libre de la colonne de dépôt (option routing)
+                route = self.route_to_drop(zone_width * 2 - 1)
+                if route:
+                    return route
                 # Vérifier si on peut se déplacer vers l'est
                 east_pos = (pos[0] + 1, pos[1])
                 # Vérifier que east_pos est dans ma zone assignée
@@ -553,8 +646,7 @@ class YellowRobot(RobotAgent):
                         return {"action": "move_vertical"}  # Si hors zone, déplacement vertical
 
                 if east_pos[0] < self.model.width:
-                    east_cell = self.model.grid.get_cell_list_contents(east_pos)
-                    if any(isinstance(obj, RobotAgent) for obj in east_cell):
+                    if self.model.grid.has_robot(east_pos):
                         return {"action": "move_vertical"}  # Alternative si bloqué
                 return {"action": "move_east"}
         
@@ -582,15 +674,10 @@ class YellowRobot(RobotAgent):
             if nearby_pos != pos:
                 for agent in agents:
                     if hasattr(agent, "waste_type") and agent.waste_type == "yellow":
-                        cell_contents = self.model.grid.get_cell_list_contents(nearby_pos)
-                        allowed = False
-                        for obj in cell_contents:
-                            if hasattr(obj, "zone") and obj.zone in self.allowed_zones:
-                                allowed = True
-                        if allowed:
+                        if self.model.zones.zone_at(nearby_pos) in self.allowed_zones:
                             return {"action": "move", "target": nearby_pos}
 
-        return {"action": "move"}
+        return self.default_move()
 
     # Override la méthode move de RobotAgent pour gérer les blocages
     def move(self):
@@ -602,12 +689,12 @@ class YellowRobot(RobotAgent):
 
         # Vérifier que la position actuelle est dans la zone assignée
         if not (x_min <= x <= x_max and y_min <= y <= y_max):
-            print(f"[ERROR] {self.get_name()} est hors de sa zone: pos={x,y}, zone={x_min,x_max,y_min,y_max}")
+            movement_log.error("[ERROR] %s est hors de sa zone: pos=%s, zone=%s", self.get_name(), (x, y), (x_min, x_max, y_min, y_max))
             # Tenter de corriger la position
             corrected_x = max(x_min, min(x_max, x))
             corrected_y = max(y_min, min(y_max, y))
             if (corrected_x, corrected_y) != (x, y):
-                print(f"[CORRECTION] {self.get_name()} repositionné à {corrected_x, corrected_y}")
+                movement_log.warning("[CORRECTION] %s repositionné à %s", self.get_name(), (corrected_x, corrected_y))
                 self.model.grid.move_agent(self, (corrected_x, corrected_y))
                 return  # Arrêter ici après correction
 
@@ -645,7 +732,7 @@ class YellowRobot(RobotAgent):
             
         # Vérification FINALE de sécurité pour éviter toute sortie de zone
         if not (x_min <= new_x <= x_max and y_min <= new_y <= y_max):
-            print(f"[WARNING] {self.get_name()} tente de sortir de sa zone: pos={new_x,new_y}, zone={x_min,x_max,y_min,y_max}")
+            movement_log.warning("[WARNING] %s tente de sortir de sa zone: pos=%s, zone=%s", self.get_name(), (new_x, new_y), (x_min, x_max, y_min, y_max))
             new_x = max(x_min, min(x_max, x))  # Forcer à rester dans la plage x
             new_y = max(y_min, min(y_max, y))  # Forcer à rester dans la plage y
             self.direction_x *= -1
@@ -663,9 +750,7 @@ class YellowRobot(RobotAgent):
                     break
 
         new_pos = (new_x, new_y)
-        cell_contents = self.model.grid.get_cell_list_contents(new_pos)
-        
-        if not any(isinstance(obj, RobotAgent) for obj in cell_contents):
+        if not self.model.grid.has_robot(new_pos):
             # Déplacement effectif, réinitialiser le compteur de blocage
             self.model.grid.move_agent(self, new_pos)
             self.distance += 1
@@ -673,11 +758,11 @@ class YellowRobot(RobotAgent):
         else:
             # Blocage détecté, incrémenter le compteur
             self.blocked_steps += 1
-            print(f"[INFO] {self.get_name()} bloqué depuis {self.blocked_steps} steps à {self.pos}.")
+            movement_log.info("[INFO] %s bloqué depuis %s steps à %s.", self.get_name(), self.blocked_steps, self.pos)
 
             # Si bloqué depuis plus de 5 steps, tenter un mouvement alternatif
             if self.blocked_steps > 5:
-                print(f"[INFO] {self.get_name()} tente un mouvement alternatif.")
+                movement_log.info("[INFO] %s tente un mouvement alternatif.", self.get_name())
                 
                 # Essayer plusieurs directions alternatives
                 alternatives = []
@@ -699,9 +784,8 @@ class YellowRobot(RobotAgent):
                     # Vérification rigoureuse que la position est valide
                     if (0 <= alt_pos[0] < grid_width and 0 <= alt_pos[1] < grid_height and
                         x_min <= alt_pos[0] <= x_max and y_min <= alt_pos[1] <= y_max):
-                        alt_cell_contents = self.model.grid.get_cell_list_contents(alt_pos)
-                        if not any(isinstance(obj, RobotAgent) for obj in alt_cell_contents):
-                            print(f"[INFO] {self.get_name()} se déplace en position alternative {alt_pos}.")
+                        if not self.model.grid.has_robot(alt_pos):
+                            movement_log.info("[INFO] %s se déplace en position alternative %s.", self.get_name(), alt_pos)
                             self.model.grid.move_agent(self, alt_pos)
                             self.distance += 1
                             self.blocked_steps = 0
@@ -711,13 +795,13 @@ class YellowRobot(RobotAgent):
 class YellowGather(YellowRobot):
     def __init__(self, unique_id, model, pos, assigned_zone=None):
         super().__init__(unique_id, model, pos, assigned_zone)
-        self._CommunicatingAgent__name = f"YellowGather_{unique_id}"
+        self.set_name(f"YellowGather_{unique_id}")
         self.hasTransformed = False
         # Vérifier que la position initiale est correcte pour un YellowGather (doit être sur une colonne fixe)
         if assigned_zone:
             x_min, x_max, _, _ = assigned_zone
             if x_min != x_max:
-                print(f"[WARNING] YellowGather devrait être sur une colonne fixe, mais la zone est {assigned_zone}")
+                lifecycle_log.warning("[WARNING] YellowGather devrait être sur une colonne fixe, mais la zone est %s", assigned_zone)
     
     def deliberate(self, knowledge):
         current_cell = knowledge["percepts"][knowledge["pos"]]
@@ -743,19 +827,25 @@ class YellowGather(YellowRobot):
                 return {"action": "transform", "from": "yellow", "to": "red"}
 
         # Vérifier s'il y a des déchets dans la cellule actuelle
-        cell_has_waste = any(hasattr(obj, "waste_type") for obj in current_cell)
+        cell_has_waste = not self.model.grid.is_free_for_drop(pos)
 
         if self.hasTransformed or len([w for w in inventory if w == "red"]) == 1:
             if pos[0] == zone_width*2 - 1:  # À l'extrémité de z1
                 if not cell_has_waste:
                     return {"action": "drop", "waste": "red"}
                 else:
-                    return {"action": "move_vertical"}
+                    return self.route_to_drop(zone_width*2 - 1) or {"action": "move_vertical"}
             else:
-                return {"action": "move_east"}
+                return self.route_to_drop(zone_width*2 - 1) or {"action": "move_east"}
+
+        return self.default_move()  # Si rien d'autre à faire, continuer à bouger
+
+    def seek_area(self):
+        """ Return the column of the gather robot, the only one it sweeps.
+        """
+        x_min, x_max, y_min, y_max = self.assigned_zone
+        return (x_max, x_max, y_min, y_max)
 
-        return {"action": "move"}  # Si rien d'autre à faire, continuer à bouger
-    
     def move(self):
         if not self.assigned_zone:
             raise ValueError(f"Robot {self.unique_id} n'a pas de zone assignée.")
@@ -765,18 +855,18 @@ class YellowGather(YellowRobot):
         
         # Vérifier que la position actuelle est dans la zone assignée
         if not (x_min <= x <= x_max and y_min <= y <= y_max):
-            print(f"[ERROR] {self.get_name()} est hors de sa zone: pos={x,y}, zone={x_min,x_max,y_min,y_max}")
+            movement_log.error("[ERROR] %s est hors de sa zone: pos=%s, zone=%s", self.get_name(), (x, y), (x_min, x_max, y_min, y_max))
             # Tenter de corriger la position
             corrected_x = max(x_min, min(x_max, x))
             corrected_y = max(y_min, min(y_max, y))
             if (corrected_x, corrected_y) != (x, y):
-                print(f"[CORRECTION] {self.get_name()} repositionné à {corrected_x, corrected_y}")
+                movement_log.warning("[CORRECTION] %s repositionné à %s", self.get_name(), (corrected_x, corrected_y))
                 self.model.grid.move_agent(self, (corrected_x, corrected_y))
                 return
 
         # Pour YellowGather, x est fixe (colonne assignée)
         if x < x_min or x > x_max:
-            print(f"[CRITICAL] {self.get_name()} hors de sa colonne assignée: x={x}, zone={x_min}-{x_max}")
+            movement_log.critical("[CRITICAL] %s hors de sa colonne assignée: x=%s, zone=%s-%s", self.get_name(), x, x_min, x_max)
             # Corriger la position pour revenir dans la colonne correcte
             x = max(x_min, min(x_max, x))
             self.model.grid.move_agent(self, (x, y))
@@ -801,25 +891,23 @@ class YellowGather(YellowRobot):
             self.direction_y *= -1
             
         if new_y < y_min or new_y > y_max:
-            print(f"[WARNING] {self.get_name()} tente de sortir des limites verticales: new_y={new_y}, limites={y_min}-{y_max}")
+            movement_log.warning("[WARNING] %s tente de sortir des limites verticales: new_y=%s, limites=%s-%s", self.get_name(), new_y, y_min, y_max)
             new_y = max(y_min, min(y_max, y))
             self.direction_y *= -1
 
         new_pos = (x, new_y)
-        cell_contents = self.model.grid.get_cell_list_contents(new_pos)
-        
-        if not any(isinstance(obj, RobotAgent) for obj in cell_contents):
+        if not self.model.grid.has_robot(new_pos):
             self.model.grid.move_agent(self, new_pos)
             self.distance += 1
             self.blocked_steps = 0
         else:
             # Blocage détecté, incrémenter le compteur
             self.blocked_steps += 1
-            print(f"[INFO] {self.get_name()} bloqué depuis {self.blocked_steps} steps.")
+            movement_log.info("[INFO] %s bloqué depuis %s steps.", self.get_name(), self.blocked_steps)
 
             # Si bloqué depuis plus de 5 steps, tenter un mouvement alternatif
             if self.blocked_steps > 5:
-                print(f"[INFO] {self.get_name()} tente un mouvement alternatif.")
+                movement_log.info("[INFO] %s tente un mouvement alternatif.", self.get_name())
                 
                 # Inverser complètement la direction verticale et essayer de se déplacer
                 self.direction_y *= -1
@@ -828,15 +916,14 @@ class YellowGather(YellowRobot):
                 # Vérifier que la position alternative est valide (dans la zone et la grille)
                 if y_min <= alt_y <= y_max and 0 <= alt_y < grid_height:
                     alt_pos = (x, alt_y)
-                    alt_cell_contents = self.model.grid.get_cell_list_contents(alt_pos)
-                    if not any(isinstance(obj, RobotAgent) for obj in alt_cell_contents):
-                        print(f"[INFO] {self.get_name()} se déplace en position alternative {alt_pos}.")
+                    if not self.model.grid.has_robot(alt_pos):
+                        movement_log.info("[INFO] %s se déplace en position alternative %s.", self.get_name(), alt_pos)
                         self.model.grid.move_agent(self, alt_pos)
                         self.distance += 1
                         self.blocked_steps = 0
                     else:
                         # Si la première alternative échoue, essayer de s'arrêter temporairement
-                        print(f"[INFO] {self.get_name()} reste sur place et attend.")
+                        movement_log.info("[INFO] %s reste sur place et attend.", self.get_name())
                         # Ne rien faire pendant ce tour pour laisser les autres se déplacer
                         # Le compteur continue d'augmenter pour une nouvelle tentative au prochain tour
 
@@ -844,7 +931,7 @@ class YellowGather(YellowRobot):
 class AloneYellow(YellowGather):
     def __init__(self, unique_id, model, pos, assigned_zone=None):
         super().__init__(unique_id, model, pos, assigned_zone)
-        self._CommunicatingAgent__name = f"AloneYellow_{unique_id}"
+        self.set_name(f"AloneYellow_{unique_id}")
     
     def deliberate(self, knowledge):
         current_cell = knowledge["percepts"][knowledge["pos"]]
@@ -869,19 +956,24 @@ class AloneYellow(YellowGather):
                 return {"action": "transform", "from": "yellow", "to": "red"}
 
         # Vérifier s'il y a des déchets dans la cellule actuelle
-        cell_has_waste = any(hasattr(obj, "waste_type") for obj in current_cell)
+        cell_has_waste = not self.model.grid.is_free_for_drop(pos)
 
         if self.hasTransformed or len([w for w in inventory if w == "red"]) == 1:
             if pos[0] == zone_width*2 - 1:  # À l'extrémité de z1
                 if not cell_has_waste:
                     return {"action": "drop", "waste": "red"}
                 else:
-                    return {"action": "move_vertical"}
+                    return self.route_to_drop(zone_width*2 - 1) or {"action": "move_vertical"}
             else:
-                return {"action": "move_east"}
+                return self.route_to_drop(zone_width*2 - 1) or {"action": "move_east"}
+
+        return self.default_move()
+
+    def seek_area(self):
+        """ Return the whole assigned zone, swept by the robot alone of its colour.
+        """
+        return self.assigned_zone
 
-        return {"action": "move"}
-     
     def move(self):
         if not self.assigned_zone:
             raise ValueError(f"Robot {self.unique_id} n'a pas de zone assignée.")
@@ -891,12 +983,12 @@ class AloneYellow(YellowGather):
 
         # Vérifier que la position actuelle est dans la zone assignée
         if not (x_min <= x <= x_max and y_min <= y <= y_max):
-            print(f"[ERROR] {self.get_name()} est hors de sa zone: pos={x,y}, zone={x_min,x_max,y_min,y_max}")
+            movement_log.error("[ERROR] %s est hors de sa zone: pos=%s, zone=%s", self.get_name(), (x, y), (x_min, x_max, y_min, y_max))
             # Tenter de corriger la position
             corrected_x = max(x_min, min(x_max, x))
             corrected_y = max(y_min, min(y_max, y))
             if (corrected_x, corrected_y) != (x, y):
-                print(f"[CORRECTION] {self.get_name()} repositionné à {corrected_x, corrected_y}")
+                movement_log.warning("[CORRECTION] %s repositionné à %s", self.get_name(), (corrected_x, corrected_y))
                 self.model.grid.move_agent(self, (corrected_x, corrected_y))
                 return  
 
@@ -929,7 +1021,7 @@ class AloneYellow(YellowGather):
             self.direction_y *= -1
 
         if not (x_min <= new_x <= x_max and y_min <= new_y <= y_max):
-            print(f"[WARNING] {self.get_name()} tente de sortir de sa zone: pos={new_x,new_y}, zone={x_min,x_max,y_min,y_max}")
+            movement_log.warning("[WARNING] %s tente de sortir de sa zone: pos=%s, zone=%s", self.get_name(), (new_x, new_y), (x_min, x_max, y_min, y_max))
             new_x = max(x_min, min(x_max, x))  # Forcer à rester dans la plage x
             new_y = max(y_min, min(y_max, y))  # Forcer à rester dans la plage y
             self.direction_x *= -1
@@ -947,20 +1039,18 @@ class AloneYellow(YellowGather):
                     break
 
         new_pos = (new_x, new_y)
-        cell_contents = self.model.grid.get_cell_list_contents(new_pos)
-        
-        if not any(isinstance(obj, RobotAgent) for obj in cell_contents):
+        if not self.model.grid.has_robot(new_pos):
             self.model.grid.move_agent(self, new_pos)
             self.distance += 1
             self.blocked_steps = 0
         else:
             # Blocage détecté, incrémenter le compteur
             self.blocked_steps += 1
-            print(f"[INFO] {self.get_name()} bloqué depuis {self.blocked_steps} steps à {self.pos}.")
+            movement_log.info("[INFO] %s bloqué depuis %s steps à %s.", self.get_name(), self.blocked_steps, self.pos)
 
             # Si bloqué depuis plus de 5 steps, tenter un mouvement alternatif
             if self.blocked_steps > 5:
-                print(f"[INFO] {self.get_name()} tente un mouvement alternatif.")
+                movement_log.info("[INFO] %s tente un mouvement alternatif.", self.get_name())
                 
                 # Essayer plusieurs directions alternatives, toutes strictement dans la zone
                 alternatives = []
@@ -990,9 +1080,8 @@ class AloneYellow(YellowGather):
                     if (alt_pos != (x, y) and  # Différent de la position actuelle
                         0 <= alt_pos[0] < grid_width and 0 <= alt_pos[1] < grid_height and
                         x_min <= alt_pos[0] <= x_max and y_min <= alt_pos[1] <= y_max):
-                        alt_cell_contents = self.model.grid.get_cell_list_contents(alt_pos)
-                        if not any(isinstance(obj, RobotAgent) for obj in alt_cell_contents):
-                            print(f"[INFO] {self.get_name()} se déplace en position alternative {alt_pos}.")
+                        if not self.model.grid.has_robot(alt_pos):
+                            movement_log.info("[INFO] %s se déplace en position alternative %s.", self.get_name(), alt_pos)
                             self.model.grid.move_agent(self, alt_pos)
                             self.distance += 1
                             self.blocked_steps = 0
@@ -1001,7 +1090,7 @@ class AloneYellow(YellowGather):
 class RedRobot(RobotAgent):
     def __init__(self, unique_id, model, pos, assigned_zone=None):
         super().__init__(unique_id, model, pos, assigned_zone)
-        self._CommunicatingAgent__name = f"RedRobot_{unique_id}"
+        self.set_name(f"RedRobot_{unique_id}")
         self.type = "red"  
         self.allowed_zones = ["z1", "z2", "z3"]
         self.target_waste = None
@@ -1022,19 +1111,19 @@ class RedRobot(RobotAgent):
             
             # Ne considérer qu'il y a un déchet valide que si la liste filtrée n'est pas vide
             if red_wastes:
-                if self.target_waste and self.target_waste["waste_pos"] == pos:
-                    print(f"[INFO] {self.get_name()} picking up target waste at {pos}")
+                if self.target_waste and self.target_waste.waste_pos == pos:
+                    movement_log.info("[INFO] %s picking up target waste at %s", self.get_name(), pos)
                 self.target_waste = None  # Clear any target as we're picking up waste here
                 return {"action": "pickup", "waste": "red"}
 
         # PRIORITÉ 2: Suivre un déchet ciblé si on en a un
         if self.target_waste and len([w for w in inventory if w == "red"]) < 1:
-            waste_pos = self.target_waste["waste_pos"]
+            waste_pos = self.target_waste.waste_pos
             
             # Si nous sommes sur la position du déchet mais qu'il n'y a pas de déchet, annuler la cible
             if pos == waste_pos:
-                if not any(hasattr(obj, "waste_type") and obj.waste_type == "red" for obj in current_cell):
-                    print(f"[INFO] {self.get_name()} at target position {waste_pos} but no waste found")
+                if not self.model.grid.waste_at(pos, "red"):
+                    movement_log.info("[INFO] %s at target position %s but no waste found", self.get_name(), waste_pos)
                     self.target_waste = None
                     self._last_notified_target = None  # Réinitialiser pour permettre de nouvelles notifications
                 else:
@@ -1046,6 +1135,12 @@ class RedRobot(RobotAgent):
                 if self._last_notified_target != waste_pos:
                     self.send_doing_notification(waste_pos, "red")
                 
+                # Plus court chemin en contournant les robots (option routing)
+                route = self.route_to({waste_pos})
+                if route:
+                    movement_log.info("[INFO] %s routing toward target waste at %s, next step: %s", self.get_name(), waste_pos, route["target"])
+                    return route
+
                 # Pathfinding simple vers le déchet
                 dx = waste_pos[0] - pos[0]
                 dy = waste_pos[1] - pos[1]
@@ -1062,21 +1157,24 @@ class RedRobot(RobotAgent):
                 
                 # Vérifier si la position est valide
                 if 0 <= target_pos[0] < self.model.width and 0 <= target_pos[1] < self.model.height:
-                    cell_contents = self.model.grid.get_cell_list_contents(target_pos)
-                    if not any(isinstance(obj, RobotAgent) for obj in cell_contents):
-                        print(f"[INFO] {self.get_name()} moving toward target waste at {waste_pos}, next step: {target_pos}")
+                    if not self.model.grid.has_robot(target_pos):
+                        movement_log.info("[INFO] %s moving toward target waste at %s, next step: %s", self.get_name(), waste_pos, target_pos)
                         return {"action": "move", "target": target_pos}
 
         # PRIORITÉ 2.5: Vérifier waste_locations
         if not self.target_waste and "waste_locations" in knowledge and knowledge["waste_locations"] and len([w for w in inventory if w == "red"]) < 1:
             for waste_info in knowledge["waste_locations"][:]:
-                waste_pos = waste_info["waste_pos"]
-                waste_type = waste_info["waste_type"]
+                waste_pos = waste_info.waste_pos
+                waste_type = waste_info.waste_type
                 if waste_type == "red":
                     # Set as target and send notification
                     self.target_waste = waste_info
                     self.send_doing_notification(waste_pos, waste_type)
                     
+                    route = self.route_to({waste_pos})
+                    if route:
+                        return route
+
                     # Calculate path to waste
                     dx = waste_pos[0] - pos[0]
                     dy = waste_pos[1] - pos[1]
@@ -1088,7 +1186,7 @@ class RedRobot(RobotAgent):
                         step_y = 1 if dy > 0 else -1
                         target_pos = (pos[0], pos[1] + step_y)
                     
-                    print(f"[DEBUG] {self.get_name()} moving toward waste at {waste_pos}, next step: {target_pos}")
+                    movement_log.debug("[DEBUG] %s moving toward waste at %s, next step: %s", self.get_name(), waste_pos, target_pos)
                     return {"action": "move", "target": target_pos}
 
         # PRIORITÉ 3: Vérifier les cases voisines s'il n'y a pas de cible
@@ -1098,41 +1196,40 @@ class RedRobot(RobotAgent):
                     for agent in agents:
                         if hasattr(agent, "waste_type") and agent.waste_type == "red":
                             # On vérifie si la position est dans une zone autorisée
-                            cell_contents = self.model.grid.get_cell_list_contents(nearby_pos)
-                            allowed = False
-                            for obj in cell_contents:
-                                if hasattr(obj, "zone") and obj.zone in self.allowed_zones:
-                                    allowed = True
-                            if allowed:
+                            if self.model.zones.zone_at(nearby_pos) in self.allowed_zones:
                                 # Définir comme cible et envoyer une notification
-                                self.target_waste = {"waste_pos": nearby_pos, "waste_type": "red"}
+                                self.target_waste = WasteNotification(nearby_pos, WasteType.RED, self.model.step_count)
                                 self.send_doing_notification(nearby_pos, "red")
                                 return {"action": "move", "target": nearby_pos}
 
         # PRIORITÉ 4: Déposer un déchet si on en a un
         if len([w for w in inventory if w == "red"]) > 0:
             # Vérifier s'il y a des déchets dans la cellule actuelle
-            cell_has_waste = any(hasattr(obj, "waste_type") for obj in current_cell)
-            disposal_present = any(hasattr(obj, "zone") and obj.zone == "waste_zone" for obj in current_cell)
+            cell_has_waste = not self.model.grid.is_free_for_drop(pos)
+            disposal_present = self.model.zones.is_disposal(pos)
             if disposal_present and not cell_has_waste:
                 # Effacer complètement les informations de cible lors du dépôt
                 self.target_waste = None
                 self._last_notified_target = None  # Réinitialiser
                 if "waste_locations" in self.knowledge:
                     self.knowledge["waste_locations"] = []
-                print(f"[INFO] {self.get_name()} depositing waste and clearing target")
+                movement_log.info("[INFO] %s depositing waste and clearing target", self.get_name())
                 return {"action": "drop", "waste": "red"}
             else:
-                return {"action": "move_east"}  # Aller vers la zone de dépôt
+                return self.route_to_drop(self.model.width - 1) or {"action": "move_east"}  # Aller vers la zone de dépôt
 
         # PRIORITÉ 5: Déplacement par défaut - MODIFICATION POUR DÉPLACEMENT ALÉATOIRE
+        # Aller directement vers le déchet rouge connu le plus proche (option seek_nearest)
+        seek = self.seek_move()
+        if seek:
+            return seek
+
         # Vérifier s'il y a plusieurs robots rouges
         red_robots = [agent for agent in self.model.robots 
                      if isinstance(agent, RedRobot)]
         
         if len(red_robots) > 1:
-            # Mouvement aléatoire quand il y a plusieurs robots rouges
-            import random
+            # Mouvement aléatoire quand il y a plusieurs robots rouges (générateur seedé, reproductible)
             possible_moves = []
             x, y = pos
             zone_width = self.model.width // 3
@@ -1147,26 +1244,39 @@ class RedRobot(RobotAgent):
             
             # Choisir une position aléatoire parmi celles disponibles
             if possible_moves:
-                target_pos = random.choice(possible_moves)
-                cell_contents = self.model.grid.get_cell_list_contents(target_pos)
-                
+                target_pos = self.walk_random.choice(possible_moves)
+
                 # Vérifier que la position n'est pas occupée par un autre robot
-                if not any(isinstance(obj, RobotAgent) for obj in cell_contents):
+                if not self.model.grid.has_robot(target_pos):
                     return {"action": "move", "target": target_pos}
         
         # Fallback: mouvement standard si le mouvement aléatoire échoue
         return {"action": "move"}
 
+    def seek_area(self):
+        """ Return the rows of the robot, up to the last column before the waste disposal zone:
+        the red robots may go in every zone.
+        """
+        x_min, x_max, y_min, y_max = self.assigned_zone
+        return (x_min, self.model.width - 2, y_min, y_max)
+
     def process_messages(self):
         """Process all new messages in the mailbox - seule implémentation spécifique conservée"""
         new_messages = self.get_new_messages()
         waste_claimed = False  # Pour savoir si un déchet a été revendiqué
+
+        # Oublier les dépôts signalés depuis plus de message_ttl ticks (option message_ttl)
+        if self.model.message_ttl is not None and self.knowledge.get("waste_locations"):
+            self.knowledge["waste_locations"] = [
+                loc for loc in self.knowledge["waste_locations"]
+                if self.model.step_count - loc.tick <= self.model.message_ttl
+            ]
         
         # 1. Traiter d'abord les messages DOING pour éviter les conflits
         for message in [m for m in new_messages if m.get_performative() == MessagePerformative.DOING]:
             content = message.get_content()
-            if isinstance(content, dict) and "waste_pos" in content:
-                waste_pos = content["waste_pos"]
+            if isinstance(content, WasteNotification):
+                waste_pos = content.waste_pos
                 
                 # Génère un identifiant unique pour ce message pour éviter les doublons
                 msg_id = f"{message.get_exp()}:{waste_pos}"
@@ -1175,13 +1285,13 @@ class RedRobot(RobotAgent):
                 self._processed_notifications.add(msg_id)
                 
                 # Si ce robot a la même cible, comparer les distances
-                if hasattr(self, "target_waste") and self.target_waste and self.target_waste["waste_pos"] == waste_pos:
+                if hasattr(self, "target_waste") and self.target_waste and self.target_waste.waste_pos == waste_pos:
                     # Calculer ma distance à la cible
                     my_pos = self.pos
                     my_distance = abs(my_pos[0] - waste_pos[0]) + abs(my_pos[1] - waste_pos[1])
                     
                     # Obtenir la position de l'expéditeur et calculer sa distance
-                    sender_pos = content.get("agent_pos")
+                    sender_pos = content.agent_pos
                     if sender_pos:
                         sender_distance = abs(sender_pos[0] - waste_pos[0]) + abs(sender_pos[1] - waste_pos[1])
                         
@@ -1195,20 +1305,20 @@ class RedRobot(RobotAgent):
                         # 1. Je suis plus loin, OU
                         # 2. Distances égales mais mon ID est plus grand (priorité au plus petit ID)
                         if my_distance > sender_distance or (my_distance == sender_distance and self.unique_id > sender_id):
-                            print(f"[INFO] {self.get_name()} abandoning target at {waste_pos} - distance:{my_distance} vs {message.get_exp()}:{sender_distance}")
+                            messaging_log.info("[INFO] %s abandoning target at %s - distance:%s vs %s:%s", self.get_name(), waste_pos, my_distance, message.get_exp(), sender_distance)
                             self.target_waste = None
                             waste_claimed = True
                         else:
-                            print(f"[INFO] {self.get_name()} keeping target at {waste_pos} - distance:{my_distance} vs {message.get_exp()}:{sender_distance}")
+                            messaging_log.info("[INFO] %s keeping target at %s - distance:%s vs %s:%s", self.get_name(), waste_pos, my_distance, message.get_exp(), sender_distance)
                     else:
                         # Si pas de position d'expéditeur, utiliser l'ancien comportement
-                        print(f"[INFO] {self.get_name()} received DOING notification for waste at {waste_pos}")
+                        messaging_log.info("[INFO] %s received DOING notification for waste at %s", self.get_name(), waste_pos)
                 
                 # Supprimer de waste_locations si présent, qu'on abandonne ou non
                 if "waste_locations" in self.knowledge:
                     self.knowledge["waste_locations"] = [
                         loc for loc in self.knowledge["waste_locations"] 
-                        if loc["waste_pos"] != waste_pos
+                        if loc.waste_pos != waste_pos
                     ]
         
         # Limiter la taille de l'ensemble des messages traités
@@ -1219,15 +1329,15 @@ class RedRobot(RobotAgent):
         if not self.target_waste:
             for message in [m for m in new_messages if m.get_performative() == MessagePerformative.REQUEST]:
                 content = message.get_content()
-                if isinstance(content, dict) and "waste_pos" in content:
-                    waste_pos = content["waste_pos"]
-                    waste_type = content["waste_type"]
-                    print(f"[REQUEST] Agent {self.get_name()} received info about {waste_type} waste at {waste_pos}")
+                if isinstance(content, WasteNotification):
+                    waste_pos = content.waste_pos
+                    waste_type = content.waste_type
+                    messaging_log.info("[REQUEST] Agent %s received info about %s waste at %s", self.get_name(), waste_type, waste_pos)
                     
                     # Stocker l'info seulement si on n'a pas déjà une cible et que l'inventaire est vide
                     if waste_type == "red" and len(self.inventory) == 0:
                         self.target_waste = content
-                        print(f"[INFO] {self.get_name()} setting target to {waste_pos}")
+                        messaging_log.info("[INFO] %s setting target to %s", self.get_name(), waste_pos)
                         
                         # Informer les autres robots rouges qu'on s'occupe de ce déchet
                         self.send_doing_notification(waste_pos, waste_type)
@@ -1235,5 +1345,5 @@ class RedRobot(RobotAgent):
                         # Si on n'est pas disponible, on stocke quand même l'info pour plus tard
                         if "waste_locations" not in self.knowledge:
                             self.knowledge["waste_locations"] = []
-                        if not any(loc.get("waste_pos") == waste_pos for loc in self.knowledge["waste_locations"]):
+                        if not any(loc.waste_pos == waste_pos for loc in self.knowledge["waste_locations"]):
                             self.knowledge["waste_locations"].append(content)
\ No newline at end of file
@@ -0,0 +1,145 @@
+'''
+@authors
+Rayane Bouaita
+Gabriel Trier
+Pierre El Anati
+
+Groupe 21
+
+@date 11/03/2025
+'''
+
+import argparse
+import csv
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import logs
+from model import RobotModel
+
+#Paramètres du modèle balayés par le batch, avec leur valeur par défaut
+DEFAULT_PARAMS = {
+    "width": 15,
+    "height": 9,
+    "green_waste": 4,
+    "yellow_waste": 4,
+    "red_waste": 4,
+    "n_green": 1,
+    "n_yellow": 1,
+    "n_red": 1,
+}
+PARAM_NAMES = list(DEFAULT_PARAMS)
+
+#Colonnes propres à l'exécution, suivies de la dernière ligne du DataCollector
+RUN_COLUMNS = ["seed", "steps", "completed", "deposition_step", "wall_time", "steps_per_sec"]
+
+
+def result_columns():
+    """ Return the columns of the result rows: the parameters, the run columns and the reporters of
+    the DataCollector of RobotModel (read from a model, so that a new reporter gets its column).
+    """
+    reporters = RobotModel(**DEFAULT_PARAMS, seed=0).datacollector.model_reporters
+    return PARAM_NAMES + RUN_COLUMNS + list(reporters)
+
+
+def run_config(params, seed, max_steps):
+    """ Run one RobotModel until every waste is disposed of or max_steps is reached.
+    Return the result row as a dict.
+    """
+    start = time.perf_counter()
+    model = RobotModel(**params, seed=seed)
+    try:
+        while model.running and model.step_count < max_steps:
+            model.step()
+    finally:
+        model.close()
+    wall_time = time.perf_counter() - start
+
+    row = dict(params)
+    row.update({
+        "seed": seed,
+        "steps": model.step_count,
+        "completed": not model.running,
+        "deposition_step": model.deposition_step,
+        "wall_time": round(wall_time, 6),
+        "steps_per_sec": round(model.step_count / wall_time, 2) if wall_time > 0 else None,
+    })
+    row.update({name: values[-1] for name, values in model.datacollector.model_vars.items()})
+    return row
+
+
+def _run_key(params, seed):
+    return tuple(str(params[name]) for name in PARAM_NAMES) + (str(seed),)
+
+
+def completed_runs(output):
+    """ Return the keys of the runs already written in the output CSV file.
+    """
+    if not os.path.exists(output):
+        return set()
+    with open(output, newline="") as f:
+        return {_run_key(row, row["seed"]) for row in csv.DictReader(f)}
+
+
+def expand_grid(param_grid, seeds):
+    """ Return the (params, seed) pairs of the cartesian product of the parameter grid and the seeds.
+    """
+    names = list(param_grid)
+    runs = []
+    for values in itertools.product(*(param_grid[name] for name in names)):
+        params = dict(DEFAULT_PARAMS)
+        params.update(zip(names, values))
+        for seed in seeds:
+            runs.append((params, seed))
+    return runs
+
+
+def sweep(param_grid, seeds, output, max_steps=5000, workers=None):
+    """ Run every configuration of the grid for every seed on a process pool.
+    Rows are appended to the output CSV file as runs finish; runs already present are skipped.
+    Return the number of runs executed.
+    """
+    done = completed_runs(output)
+    todo = [(params, seed) for params, seed in expand_grid(param_grid, seeds)
+            if _run_key(params, seed) not in done]
+
+    write_header = not os.path.exists(output) or os.path.getsize(output) == 0
+    if write_header:
+        columns = result_columns()
+    else:
+        #Fichier existant : ses colonnes sont gardées, les colonnes ajoutées depuis sont ignorées
+        with open(output, newline="") as f:
+            columns = next(csv.reader(f))
+    with open(output, "a", newline="") as f, ProcessPoolExecutor(max_workers=workers) as pool:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        if write_header:
+            writer.writeheader()
+        futures = [pool.submit(run_config, params, seed, max_steps) for params, seed in todo]
+        for future in as_completed(futures):
+            writer.writerow(future.result())
+            f.flush()
+    return len(todo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Balayage parallèle des paramètres de RobotModel.")
+    for name in PARAM_NAMES:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, nargs="+",
+                            default=[DEFAULT_PARAMS[name]])
+    parser.add_argument("--seeds", type=int, default=10, help="nombre de graines par configuration")
+    parser.add_argument("--max-steps", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default="sweep.csv")
+    args = parser.parse_args()
+    #Journalisation configurée une fois pour le processus : les modèles ne font que lire les loggers
+    logs.configure(quiet=True)
+
+    param_grid = {name: getattr(args, name) for name in PARAM_NAMES}
+    n_runs = sweep(param_grid, range(args.seeds), args.output, args.max_steps, args.workers)
+    print(f"{n_runs} exécutions ajoutées à {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+'''
+@authors
+Rayane Bouaita
+Gabriel Trier
+Pierre El Anati
+
+Groupe 21
+
+@date 11/03/2025
+'''
+
+import argparse
+import functools
+import json
+import logging
+import multiprocessing
+import platform
+import resource
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import mesa
+import numpy as np
+
+import logs
+from model import FREE_THREADED, RobotModel
+from replay import ReplayModel
+
+SEED = 42
+
+#Scénarios de référence : de la grille par défaut jusqu'aux grandes cartes
+SCENARIOS = {
+    "default": dict(width=15, height=9, green_waste=4, yellow_waste=4, red_waste=4,
+                    n_green=1, n_yellow=1, n_red=1, steps=300),
+    "crowded": dict(width=15, height=9, green_waste=8, yellow_waste=10, red_waste=10,
+                    n_green=4, n_yellow=4, n_red=4, steps=300),
+    "medium": dict(width=300, height=180, green_waste=1000, yellow_waste=1000, red_waste=1000,
+                   n_green=50, n_yellow=50, n_red=50, steps=100),
+    "medium_dense": dict(width=300, height=180, green_waste=10000, yellow_waste=5000, red_waste=5000,
+                         n_green=150, n_yellow=150, n_red=150, steps=50),
+    "large": dict(width=1500, height=900, green_waste=40000, yellow_waste=30000, red_waste=30000,
+                  n_green=200, n_yellow=200, n_red=200, steps=20),
+}
+
+
+def _percentiles(values):
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {"p50_ms": p50 * 1e3, "p90_ms": p90 * 1e3, "p99_ms": p99 * 1e3,
+            "max_ms": float(np.max(values)) * 1e3}
+
+
+def _silenced(function):
+    #Aucune trace, même les erreurs : on mesure la simulation, pas les écritures sur stdout.
+    #La journalisation est rétablie au retour, pour l'appelant
+    @functools.wraps(function)
+    def silenced(*args, **kwargs):
+        logging.disable(logging.CRITICAL)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            logging.disable(logging.NOTSET)
+
+    return silenced
+
+
+@_silenced
+def run_scenario(name, params, steps, seed=SEED, alloc_steps=10):
+    """ Time RobotModel.step on one scenario. Meant to run in a fresh process so that
+    the peak RSS only accounts for this scenario.
+    """
+    start = time.perf_counter()
+    model = RobotModel(**params, seed=seed)
+    init_time = time.perf_counter() - start
+
+    latencies = []
+    while model.running and len(latencies) < steps:
+        t0 = time.perf_counter()
+        model.step()
+        latencies.append(time.perf_counter() - t0)
+    total = sum(latencies)
+
+    # Passe séparée sous tracemalloc (qui ralentit l'exécution) pour mesurer les allocations,
+    # sur un nouveau modèle de même graine pour ne pas dépendre de la fin de la simulation
+    model = RobotModel(**params, seed=seed)
+    alloc_peaks = []
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    for _ in range(alloc_steps):
+        if not model.running:
+            break
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        model.step()
+        alloc_peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    blocks_after = sys.getallocatedblocks()
+
+    result = {
+        "scenario": name,
+        "params": params,
+        "seed": seed,
+        "init_s": init_time,
+        "steps": len(latencies),
+        "steps_per_sec": len(latencies) / total if total > 0 else None,
+        "latency": _percentiles(latencies) if latencies else None,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "alloc_peak_kb_per_step": float(np.mean(alloc_peaks)) / 1024 if alloc_peaks else None,
+        "net_blocks_per_step": (blocks_after - blocks_before) / len(alloc_peaks) if alloc_peaks else None,
+    }
+    return result
+
+
+def _final_state(model):
+    return [(robot.unique_id, robot.pos, tuple(robot.inventory), robot.distance) for robot in model.robots]
+
+
+@_silenced
+def run_deliberation_scaling(name, params, steps, workers, seed=SEED):
+    """ Time the two_phase steps of one scenario with each deliberation pool size (1 = no pool)
+    and check that every pool size ends in the same state as the run without pool. Pools need a
+    free-threaded interpreter (model.FREE_THREADED).
+    """
+    results, reference = [], None
+    for n_workers in workers:
+        model = RobotModel(**params, seed=seed, step_mode="two_phase",
+                           deliberation_workers=n_workers if n_workers > 1 else None)
+        start = time.perf_counter()
+        try:
+            while model.running and model.step_count < steps:
+                model.step()
+            elapsed = time.perf_counter() - start
+        finally:
+            model.close()
+        state = _final_state(model)
+        reference = reference if reference is not None else state
+        results.append({
+            "scenario": name,
+            "workers": n_workers,
+            "robots": len(model.robots),
+            "steps": model.step_count,
+            "steps_per_sec": model.step_count / elapsed if elapsed > 0 else None,
+            "identical": state == reference,
+        })
+    for result in results:
+        result["speedup"] = result["steps_per_sec"] / results[0]["steps_per_sec"]
+    return results
+
+
+def _run_to_state(params, steps, seed):
+    model = RobotModel(**params, seed=seed)
+    while model.running and model.step_count < steps:
+        model.step()
+    return _final_state(model), model.step_count
+
+
+@_silenced
+def run_concurrent_models(name, params, steps, n_models, seed=SEED):
+    """ Run n_models models (seeds seed, seed + 1, ...) one after the other, then at the same time on a
+    thread pool, and check that every model ends in the same state in both cases: the models of a
+    process share no state.
+    """
+    seeds = [seed + i for i in range(n_models)]
+    start = time.perf_counter()
+    serial = [_run_to_state(params, steps, s) for s in seeds]
+    serial_time = time.perf_counter() - start
+    start = time.perf_counter()
+    with ThreadPoolExecutor(n_models) as pool:
+        concurrent = list(pool.map(lambda s: _run_to_state(params, steps, s), seeds))
+    concurrent_time = time.perf_counter() - start
+    return {
+        "scenario": name,
+        "models": n_models,
+        "serial_sec": serial_time,
+        "concurrent_sec": concurrent_time,
+        "identical": serial == concurrent,
+    }
+
+
+@_silenced
+def run_checkpoint(name, params, steps, seed=SEED):
+    """ Save a checkpoint of one scenario halfway through, time its restore, and check that the
+    restored model ends in the same state (robots and DataCollector history) as the uninterrupted one.
+    """
+    model = RobotModel(**params, seed=seed)
+    while model.running and model.step_count < steps // 2:
+        model.step()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "checkpoint.npz")
+        start = time.perf_counter()
+        model.save_checkpoint(path)
+        save_time = time.perf_counter() - start
+        agents = len(model.robots) + int(model.grid.waste_total.sum())
+        size = os.path.getsize(path)
+        start = time.perf_counter()
+        restored = RobotModel.load_checkpoint(path)
+        load_time = time.perf_counter() - start
+    for m in (model, restored):
+        while m.running and m.step_count < steps:
+            m.step()
+    return {
+        "scenario": name,
+        "agents": agents,
+        "save_sec": save_time,
+        "load_sec": load_time,
+        "load_agents_per_sec": agents / load_time if load_time > 0 else None,
+        "size_kb": size / 1024,
+        "identical": (_final_state(model) == _final_state(restored)
+                      and model.datacollector.model_vars == restored.datacollector.model_vars),
+    }
+
+
+@_silenced
+def run_replay(name, params, steps, seed=SEED):
+    """ Record the actions of one scenario, replay the trace, and compare the durations of the run and
+    of the replay and their DataCollector output.
+    """
+    model = RobotModel(**params, seed=seed, record_actions=True)
+    start = time.perf_counter()
+    while model.running and model.step_count < steps:
+        model.step()
+    run_time = time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "trace.npz")
+        model.save_trace(path)
+        size = os.path.getsize(path)
+        replay = ReplayModel.from_trace(path)
+    start = time.perf_counter()
+    while replay.running:
+        replay.step()
+    replay_time = time.perf_counter() - start
+    return {
+        "scenario": name,
+        "steps": model.step_count,
+        "run_sec": run_time,
+        "replay_sec": replay_time,
+        "speedup": run_time / replay_time if replay_time > 0 else None,
+        "size_kb": size / 1024,
+        "identical": model.datacollector.model_vars == replay.datacollector.model_vars,
+    }
+
+
+def _metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "mesa": mesa.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpu_count": multiprocessing.cpu_count(),
+    }
+
+
+def run_benchmarks(names, steps=None, seed=SEED):
+    """ Run the given scenarios, each one in its own process, and return the report.
+    """
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for name in names:
+        params = dict(SCENARIOS[name])
+        n_steps = steps or params.pop("steps")
+        params.pop("steps", None)
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(run_scenario, name, params, n_steps, seed).result()
+        results.append(result)
+        print(f"{name:>14}: {result['steps_per_sec']:10.1f} steps/s | "
+              f"p50 {result['latency']['p50_ms']:8.2f} ms | p99 {result['latency']['p99_ms']:8.2f} ms | "
+              f"RSS {result['peak_rss_mb']:7.1f} MB")
+    return {"meta": _metadata(), "results": results}
+
+
+def compare(report, reference):
+    """ Print the steps/sec ratio of each scenario against a previous report.
+    """
+    previous = {r["scenario"]: r for r in reference["results"]}
+    for result in report["results"]:
+        old = previous.get(result["scenario"])
+        if old and old["steps_per_sec"] and result["steps_per_sec"]:
+            ratio = result["steps_per_sec"] / old["steps_per_sec"]
+            print(f"{result['scenario']:>14}: x{ratio:.2f} steps/s (référence {reference['meta'].get('commit')})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de RobotModel.step à plusieurs échelles.")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--steps", type=int, default=None, help="remplace le nombre de steps des scénarios")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--output", default="bench.json")
+    parser.add_argument("--compare", default=None, help="rapport JSON de référence")
+    parser.add_argument("--deliberation-workers", type=int, nargs="+", default=None,
+                        help="tailles de pool à comparer en mode two_phase (1 = sans pool)")
+    parser.add_argument("--deliberation-scenario", choices=list(SCENARIOS), default="medium_dense")
+    parser.add_argument("--concurrent-models", type=int, default=None,
+                        help="nombre de modèles exécutés en même temps sur un pool de threads")
+    parser.add_argument("--concurrent-scenario", choices=list(SCENARIOS), default="crowded")
+    parser.add_argument("--replay", choices=list(SCENARIOS), nargs="+", default=None,
+                        help="scénarios dont la trace d'actions est enregistrée puis rejouée")
+    parser.add_argument("--checkpoint", choices=list(SCENARIOS), nargs="+", default=None,
+                        help="scénarios sur lesquels mesurer la sauvegarde et la reprise d'un point de sauvegarde")
+    args = parser.parse_args()
+    #Journalisation configurée une fois pour le processus : les modèles ne font que lire les loggers
+    logs.configure(quiet=True)
+
+    report = run_benchmarks(args.scenarios, args.steps, args.seed)
+    if args.deliberation_workers and not FREE_THREADED:
+        print("--deliberation-workers ignoré : les pools de délibération nécessitent un interpréteur sans GIL.")
+    elif args.deliberation_workers:
+        params = dict(SCENARIOS[args.deliberation_scenario])
+        n_steps = args.steps or params.pop("steps")
+        params.pop("steps", None)
+        report["deliberation"] = run_deliberation_scaling(args.deliberation_scenario, params, n_steps,
+                                                          args.deliberation_workers, args.seed)
+        for result in report["deliberation"]:
+            print(f"{result['workers']:>3} workers: {result['steps_per_sec']:8.2f} steps/s | "
+                  f"x{result['speedup']:.2f} | identique : {result['identical']}")
+    if args.concurrent_models:
+        params = dict(SCENARIOS[args.concurrent_scenario])
+        n_steps = args.steps or params.pop("steps")
+        params.pop("steps", None)
+        result = run_concurrent_models(args.concurrent_scenario, params, n_steps, args.concurrent_models, args.seed)
+        report["concurrent"] = result
+        print(f"{result['models']} modèles : {result['serial_sec']:.2f} s en série | "
+              f"{result['concurrent_sec']:.2f} s sur threads | identique : {result['identical']}")
+    if args.replay:
+        report["replay"] = []
+        for name in args.replay:
+            params = dict(SCENARIOS[name])
+            n_steps = args.steps or params.pop("steps")
+            params.pop("steps", None)
+            result = run_replay(name, params, n_steps, args.seed)
+            report["replay"].append(result)
+            print(f"{name:>14}: {result['steps']} steps | exécution {result['run_sec']:.2f} s | "
+                  f"replay {result['replay_sec']:.2f} s | x{result['speedup']:.1f} | identique : {result['identical']}")
+    if args.checkpoint:
+        report["checkpoint"] = []
+        for name in args.checkpoint:
+            params = dict(SCENARIOS[name])
+            n_steps = args.steps or params.pop("steps")
+            params.pop("steps", None)
+            result = run_checkpoint(name, params, n_steps, args.seed)
+            report["checkpoint"].append(result)
+            print(f"{name:>14}: {result['agents']} agents | sauvegarde {result['save_sec']:.2f} s | "
+                  f"reprise {result['load_sec']:.2f} s | {result['size_kb']:.0f} Ko | identique : {result['identical']}")
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+'''
+@authors
+Rayane Bouaita
+Gabriel Trier
+Pierre El Anati
+
+Groupe 21
+
+@date 11/03/2025
+'''
+
+import gc
+import json
+
+import numpy as np
+
+from collector import StreamingCollector
+from objects import Waste, WasteType, WASTE_TYPES
+from Message import Message, WasteNotification
+from MessagePerformative import MessagePerformative
+
+CHECKPOINT_FORMAT = "robotmodel-checkpoint"
+CHECKPOINT_VERSION = 1
+
+#Attributs des robots modifiés pendant la simulation (ceux fixés à la création sont recréés par le modèle)
+ROBOT_FIELDS = ("_distance", "blocked_steps", "route_blocked_steps", "direction_x", "direction_y",
+                "hasAWaste", "hasTransformed", "last_dropped_waste_id")
+
+
+def _encode_notification(notification):
+    if notification is None:
+        return None
+    return [list(notification.waste_pos), notification.waste_type.value, notification.tick,
+            None if notification.agent_pos is None else list(notification.agent_pos)]
+
+
+def _decode_notification(data):
+    if data is None:
+        return None
+    waste_pos, waste_type, tick, agent_pos = data
+    return WasteNotification(tuple(waste_pos), WasteType(waste_type), tick,
+                             None if agent_pos is None else tuple(agent_pos))
+
+
+class _MessageTable:
+    #Messages sérialisés une seule fois, même partagés par plusieurs boîtes aux lettres (broadcast)
+    def __init__(self):
+        self.rows = []
+        self._index = {}
+
+    def add(self, message):
+        key = id(message)
+        if key not in self._index:
+            content = message.get_content()
+            if content is not None and not isinstance(content, WasteNotification):
+                raise ValueError(f"Contenu de message non sérialisable : {type(content).__name__}.")
+            dest = message.get_dest()
+            self._index[key] = len(self.rows)
+            self.rows.append([message.get_exp(), list(dest) if isinstance(dest, tuple) else dest,
+                              message.get_performative().name, _encode_notification(content),
+                              message.get_ttl()])
+        return self._index[key]
+
+
+def _decode_messages(rows):
+    return [Message(exp, tuple(dest) if isinstance(dest, list) else dest, MessagePerformative[performative],
+                    _decode_notification(content), ttl)
+            for exp, dest, performative, content, ttl in rows]
+
+
+def _encode_field(robots, name, encode=lambda value: value):
+    #Valeurs d'un attribut pour chaque robot, et indices des robots qui ne l'ont pas (hasattr)
+    values, missing = [], []
+    for i, robot in enumerate(robots):
+        if hasattr(robot, name):
+            values.append(encode(getattr(robot, name)))
+        else:
+            values.append(None)
+            missing.append(i)
+    return {"values": values, "missing": missing}
+
+
+def _decode_field(robots, name, field, decode=lambda value: value):
+    missing = set(field["missing"])
+    for i, (robot, value) in enumerate(zip(robots, field["values"])):
+        if i in missing:
+            if hasattr(robot, name):
+                delattr(robot, name)
+        else:
+            setattr(robot, name, decode(value))
+
+
+def _column_arrays(name, values):
+    #Colonne du DataCollector : valeurs (None remplacé par 0) et masque des None
+    none = np.array([v is None for v in values], dtype=bool)
+    arrays = {f"collector/{name}": np.array([0 if v is None else v for v in values])}
+    if none.any():
+        arrays[f"collector_none/{name}"] = none
+    return arrays
+
+
+def _random_state(generator):
+    version, state, gauss_next = generator.getstate()
+    return np.array(state, dtype=np.uint32), [version, gauss_next]
+
+
+def snapshot(model):
+    """ Return the state of the model between two steps as a dict of numpy arrays (no object array):
+    the parameters and counters of the model, the contents of each cell in order, the state of each
+    robot, the messages waiting in the message service and in the mailboxes, the random generators
+    and the DataCollector history.
+    """
+    robots = model.robots
+    grid = model.grid
+    robot_index = {id(robot): i for i, robot in enumerate(robots)}
+
+    #Contenu des cellules occupées, dans l'ordre des listes de la grille
+    cells = np.argwhere((grid.robot_count > 0) | (grid.waste_total > 0))
+    entry_x, entry_y, entry_robot, entry_type, entry_id = [], [], [], [], []
+    for x, y in cells.tolist():
+        for agent in grid._grid[x][y]:
+            entry_x.append(x)
+            entry_y.append(y)
+            if isinstance(agent, Waste):
+                entry_robot.append(-1)
+                entry_type.append(WASTE_TYPES.index(agent.waste_type))
+                entry_id.append(agent.unique_id)
+            else:
+                entry_robot.append(robot_index[id(agent)])
+                entry_type.append(-1)
+                entry_id.append(-1)
+
+    messages = _MessageTable()
+    pending = [[tick, messages.add(message)] for tick, message in model.message_service.get_pending_messages()]
+    mailboxes = []
+    for robot in robots:
+        read, unread, evicted = robot.get_mailbox_state()
+        mailboxes.append([[messages.add(m) for m in read], [messages.add(m) for m in unread], evicted])
+
+    fields = {name: _encode_field(robots, name) for name in ROBOT_FIELDS}
+    fields["_last_notified_target"] = _encode_field(
+        robots, "_last_notified_target", lambda v: None if v is None else list(v))
+    fields["target_waste"] = _encode_field(robots, "target_waste", _encode_notification)
+    fields["_processed_notifications"] = _encode_field(robots, "_processed_notifications", sorted)
+
+    random_state, random_meta = _random_state(model.random)
+    meta = {
+        "format": CHECKPOINT_FORMAT,
+        "version": CHECKPOINT_VERSION,
+        "params": {
+            "width": model.width, "height": model.height, "green_waste": model.green_waste,
+            "yellow_waste": model.yellow_waste, "red_waste": model.red_waste, "n_green": model.n_green,
+            "n_yellow": model.n_yellow, "n_red": model.n_red, "seed": model._seed,
+            "profile": model.profiler is not None, "step_mode": model.step_mode,
+            "deliberation_workers": model.deliberation_workers, "seek_nearest": model.seek_nearest,
+            "routing": model.router is not None, "notify_radius": model.notify_radius,
+            "mailbox_history": model.mailbox_history, "coalesce_messages": model.coalesce_messages,
+            "message_ttl": model.message_ttl, "stream_data": isinstance(model.datacollector, StreamingCollector),
+            "metrics_window": getattr(model.datacollector, "window", None),
+        },
+        "model": {
+            "step_count": model.step_count, "steps": model.steps, "running": model.running,
+            "deposition_step": model.deposition_step, "waste_on_grid": model.waste_on_grid,
+            "waste_in_inventories": model.waste_in_inventories, "distance_by_type": model.distance_by_type,
+            "next_waste_id": getattr(model, "next_waste_id", None),
+            "random": random_meta, "rng": model.rng.bit_generator.state,
+            "walk_random": [_random_state(robot.walk_random)[1] for robot in robots]
+                           if model.step_mode == "two_phase" else None,
+        },
+        "robots": {
+            "classes": [type(robot).__name__ for robot in robots],
+            "inventory": [robot.inventory for robot in robots],
+            "fields": fields,
+            #None : connaissances jamais mises à jour ; sinon les clés présentes et les dépôts connus
+            "knowledge": [sorted(robot.knowledge) if robot.knowledge else None for robot in robots],
+            "waste_locations": [[_encode_notification(n) for n in robot.knowledge["waste_locations"]]
+                                if "waste_locations" in robot.knowledge else None for robot in robots],
+        },
+        "messages": messages.rows,
+        "pending": pending,
+        "mailboxes": mailboxes,
+        "message_stats": model.message_service.stats,
+        "collector": list(model.datacollector.model_vars),
+    }
+
+    arrays = {
+        "meta": np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+        "cell_x": np.array(entry_x, dtype=np.int32),
+        "cell_y": np.array(entry_y, dtype=np.int32),
+        "cell_robot": np.array(entry_robot, dtype=np.int32),
+        "cell_waste_type": np.array(entry_type, dtype=np.int8),
+        "cell_waste_id": np.array(entry_id, dtype=np.int64),
+        "radioactivity": model.zones.radioactivity.data,
+        "random": random_state,
+    }
+    if model.step_mode == "two_phase":
+        arrays["walk_random"] = np.array([_random_state(robot.walk_random)[0] for robot in robots],
+                                         dtype=np.uint32).reshape(len(robots), -1)
+    for name, values in model.datacollector.model_vars.items():
+        arrays.update(_column_arrays(name, values))
+    return arrays
+
+
+def save(model, path):
+    """ Write the state of the model between two steps (see snapshot) to path, as a compressed npz archive.
+    """
+    with open(path, "wb") as f:
+        np.savez_compressed(f, **snapshot(model))
+
+
+def read(path):
+    """ Return the arrays of the npz archive written to path, refusing the object arrays (pickle).
+    """
+    with np.load(path, allow_pickle=False) as archive:
+        return {name: archive[name] for name in archive.files}
+
+
+def restore(model_cls, data, **params):
+    """ Create a model of class model_cls in the state given by the arrays of snapshot. Running it
+    gives the same steps as the model which was saved. The keyword arguments replace the saved
+    parameters of the model (for instance profile=False).
+    """
+    #Le ramasse-miettes cyclique se déclenche sans cesse pendant la création des millions de listes de
+    #cellules et des agents (aucun cycle à libérer) : suspendu le temps de la reprise, environ 2x plus rapide
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _restore(model_cls, data, **params)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _restore(model_cls, data, **params):
+    meta = json.loads(data["meta"].tobytes())
+    if meta.get("format") != CHECKPOINT_FORMAT:
+        raise ValueError("Ces données ne sont pas un point de sauvegarde de RobotModel.")
+    if meta.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Version de point de sauvegarde non prise en charge : {meta.get('version')} "
+                         f"(attendue : {CHECKPOINT_VERSION}).")
+
+    #Robots recréés par le constructeur (classes, zones, noms, abonnements), déchets replacés ensuite
+    params = dict(meta["params"], **params)
+    #quiet : ancien paramètre de RobotModel, présent dans les points de sauvegarde plus anciens
+    params.pop("quiet", None)
+    model = model_cls(**dict(params, green_waste=0, yellow_waste=0, red_waste=0))
+    model.green_waste, model.yellow_waste, model.red_waste = (params["green_waste"], params["yellow_waste"],
+                                                              params["red_waste"])
+    robots = model.robots
+    saved = meta["robots"]
+    if [type(robot).__name__ for robot in robots] != saved["classes"]:
+        raise ValueError("Les robots recréés ne correspondent pas à ceux du point de sauvegarde.")
+
+    grid = model.grid
+    for robot in robots:
+        grid.remove_agent(robot)
+    #Déchets créés sans Agent.__init__ (le compteur d'identifiants de mesa est inutile : unique_id est
+    #repris du point de sauvegarde), puis enregistrés auprès du modèle comme le ferait Agent.__init__
+    agents = []
+    register = model.register_agent
+    new_waste = Waste.__new__
+    for r, t, waste_id in zip(data["cell_robot"].tolist(), data["cell_waste_type"].tolist(),
+                              data["cell_waste_id"].tolist()):
+        if r >= 0:
+            agents.append(robots[r])
+        else:
+            waste = new_waste(Waste)
+            waste.model = model
+            waste.pos = None
+            waste.waste_type = WASTE_TYPES[t]
+            waste.unique_id = waste_id
+            register(waste)
+            agents.append(waste)
+    grid.place_agents(agents, list(zip(data["cell_x"].tolist(), data["cell_y"].tolist())))
+    model.zones.radioactivity.data[:] = data["radioactivity"]
+
+    fields = saved["fields"]
+    for name in ROBOT_FIELDS:
+        _decode_field(robots, name, fields[name])
+    _decode_field(robots, "_last_notified_target", fields["_last_notified_target"],
+                  lambda v: None if v is None else tuple(v))
+    _decode_field(robots, "target_waste", fields["target_waste"], _decode_notification)
+    _decode_field(robots, "_processed_notifications", fields["_processed_notifications"], set)
+
+    messages = _decode_messages(meta["messages"])
+    model.message_service.set_pending_messages([(tick, messages[i]) for tick, i in meta["pending"]])
+    model.message_service.stats = dict(meta["message_stats"])
+    for robot, inventory, keys, locations, (read, unread, evicted) in zip(
+            robots, saved["inventory"], saved["knowledge"], saved["waste_locations"], meta["mailboxes"]):
+        robot.inventory = list(inventory)
+        robot.set_mailbox_state([messages[i] for i in read], [messages[i] for i in unread], evicted)
+        #Percepts recalculés sur la grille restaurée : ils sont de toute façon remis à jour avant d'être lus
+        robot.knowledge = {}
+        if keys is not None:
+            robot.update_knowledge()
+            if "last_percepts" in keys:
+                robot.knowledge["last_percepts"] = grid.get_cell_list_contents(robot.pos)
+        if locations is not None:
+            robot.knowledge["waste_locations"] = [_decode_notification(n) for n in locations]
+
+    state = meta["model"]
+    model.step_count = state["step_count"]
+    model.steps = state["steps"]
+    model.running = state["running"]
+    model.deposition_step = state["deposition_step"]
+    model.waste_on_grid = dict(state["waste_on_grid"])
+    model.waste_in_inventories = state["waste_in_inventories"]
+    model.distance_by_type = dict(state["distance_by_type"])
+    if state["next_waste_id"] is not None:
+        model.next_waste_id = state["next_waste_id"]
+    version, gauss_next = state["random"]
+    model.random.setstate((version, tuple(data["random"].tolist()), gauss_next))
+    model.rng.bit_generator.state = state["rng"]
+    if state["walk_random"] is not None:
+        for robot, words, (version, gauss_next) in zip(robots, data["walk_random"].tolist(), state["walk_random"]):
+            robot.walk_random.setstate((version, tuple(words), gauss_next))
+
+    #Colonnes des reporters du modèle recréé seulement (sans profile, pas de durées des phases)
+    model_vars = {}
+    for name in [n for n in meta["collector"] if n in model.datacollector.model_reporters]:
+        values = data[f"collector/{name}"].tolist()
+        none = data.get(f"collector_none/{name}")
+        if none is not None:
+            for i in np.flatnonzero(none).tolist():
+                values[i] = None
+        model_vars[name] = values
+    model.datacollector.model_vars = model_vars
+    return model
+
+
+def load(model_cls, path):
+    """ Create a model of class model_cls in the state saved to path by save.
+    """
+    try:
+        return restore(model_cls, read(path))
+    except ValueError as error:
+        raise ValueError(f"{path} : {error}") from error
@@ -0,0 +1,357 @@
+'''
+@authors
+Rayane Bouaita
+Gabriel Trier
+Pierre El Anati
+
+Groupe 21
+
+@date 11/03/2025
+'''
+
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+#Nombre de lignes gardées en mémoire par colonne avant écriture sur le disque
+CHUNK_SIZE = 4096
+
+
+class StreamingCollector:
+    """StreamingCollector class.
+    Replacement of mesa's DataCollector (model reporters only) keeping a flat memory footprint on long
+    runs. The rows are buffered in preallocated NumPy columns of chunk_size rows, and each full chunk
+    is appended to one raw binary file per column in directory (columns.json gives their dtypes).
+
+    The dtype of a column is set by its first value: int64 for an integer (or bool), float64 otherwise,
+    None being stored as NaN. latest reads the last row in O(1), and column returns the whole history
+    of a column as a read-only memory map, without building any list or DataFrame.
+
+    attr:
+        model_reporters: the reporters, by column name, called with the model on each collect (dict)
+        directory: the directory of the column files, a temporary one if None is given (str)
+        chunk_size: the number of rows buffered in memory per column (int)
+        rows: the number of rows collected so far (int)
+    """
+
+    def __init__(self, model_reporters, directory=None, chunk_size=CHUNK_SIZE):
+        """ Create an empty collector writing its columns to directory.
+        """
+        self.model_reporters = dict(model_reporters)
+        if directory is None:
+            #Supprimé avec le collecteur
+            self._tmp = tempfile.TemporaryDirectory(prefix="robotmodel-data-")
+            directory = self._tmp.name
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.rows = 0
+        self._flushed = 0
+        self._buffers = {}
+        self._last = {}
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.bin")
+
+    def _create_columns(self, row):
+        #Types fixés par la première ligne ; fichiers vides (une exécution précédente est écrasée)
+        for name, value in row.items():
+            dtype = np.int64 if isinstance(value, (bool, int, np.integer)) else np.float64
+            self._buffers[name] = np.empty(self.chunk_size, dtype=dtype)
+            open(self._path(name), "wb").close()
+        with open(os.path.join(self.directory, "columns.json"), "w") as f:
+            json.dump({name: buffer.dtype.str for name, buffer in self._buffers.items()}, f)
+
+    def collect(self, model):
+        """ Compute every reporter on the model and append the row.
+        """
+        self.append({name: reporter(model) for name, reporter in self.model_reporters.items()})
+
+    def append(self, row):
+        """ Append a row (value of each column, None for a missing value).
+        """
+        if not self._buffers:
+            self._create_columns(row)
+        i = self.rows - self._flushed
+        for name, buffer in self._buffers.items():
+            value = row[name]
+            if value is None:
+                if buffer.dtype.kind != "f":
+                    raise ValueError(f"Colonne entière {name!r} : valeur manquante impossible à stocker.")
+                value = np.nan
+            buffer[i] = value
+        self._last = row
+        self.rows += 1
+        if self.rows - self._flushed == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """ Append the buffered rows to the column files.
+        """
+        pending = self.rows - self._flushed
+        if not pending:
+            return
+        for name, buffer in self._buffers.items():
+            with open(self._path(name), "ab") as f:
+                buffer[:pending].tofile(f)
+        self._flushed = self.rows
+
+    def latest(self, name=None):
+        """ Return the value of the column in the last row (the whole row as a dict if name is None).
+        """
+        if not self.rows:
+            raise ValueError("Aucune ligne collectée.")
+        return dict(self._last) if name is None else self._last[name]
+
+    def column(self, name, start=0):
+        """ Return the values of the column from row start as a read-only NumPy array mapped on its file
+        (NaN for None). Rows still buffered are copied without touching the file.
+        """
+        if self._buffers and start >= self._flushed:
+            buffer = self._buffers[name]
+            return buffer[start - self._flushed:self.rows - self._flushed].copy()
+        self.flush()
+        buffer = self._buffers.get(name)
+        if buffer is None or not self.rows:
+            if name not in self.model_reporters:
+                raise KeyError(name)
+            return np.empty(0)
+        return np.memmap(self._path(name), dtype=buffer.dtype, mode="r", shape=(self.rows,))[start:]
+
+    def __len__(self):
+        return self.rows
+
+    def get_model_vars_dataframe(self):
+        """ Return the collected rows as a DataFrame (same columns as mesa's DataCollector).
+        """
+        return pd.DataFrame({name: self.column(name) for name in self.model_reporters})
+
+    @property
+    def model_vars(self):
+        """ The collected values of each column as lists, None for the missing values (as with mesa's
+        DataCollector). Builds the lists: prefer latest and column on long runs.
+        """
+        model_vars = {}
+        for name in self.model_reporters:
+            values = self.column(name).tolist()
+            #NaN (différent de lui-même) : valeur manquante
+            values = [None if v != v else v for v in values]
+            model_vars[name] = values
+        return model_vars
+
+    @model_vars.setter
+    def model_vars(self, model_vars):
+        #Remplace tout l'historique (reprise d'un point de sauvegarde)
+        self.rows = self._flushed = 0
+        self._buffers = {}
+        self._last = {}
+        names = [name for name in self.model_reporters if name in model_vars]
+        for values in zip(*(model_vars[name] for name in names)):
+            self.append(dict(zip(names, values)))
+
+
+class _Level:
+    #Agrégats (min, somme, nombre de valeurs, max) d'une résolution, par blocs de size lignes.
+    #Les blocs fermés sont dans un anneau de capacity blocs ; le niveau le plus grossier ne perd
+    #aucun bloc : quand il est plein, ses blocs sont fusionnés deux à deux (size double)
+    def __init__(self, n_columns, size, capacity, keep_all):
+        self.size = size
+        self.capacity = capacity
+        self.keep_all = keep_all
+        self.starts = np.zeros(capacity, dtype=np.int64)
+        self.widths = np.zeros(capacity, dtype=np.int64)
+        self.mins = np.zeros((capacity, n_columns))
+        self.maxs = np.zeros((capacity, n_columns))
+        self.sums = np.zeros((capacity, n_columns))
+        self.counts = np.zeros((capacity, n_columns), dtype=np.int64)
+        self.n = 0
+        self.head = 0
+        self.open_start = 0
+        self.open_rows = 0
+        self.open_min = np.full(n_columns, np.nan)
+        self.open_max = np.full(n_columns, np.nan)
+        self.open_sum = np.zeros(n_columns)
+        self.open_count = np.zeros(n_columns, dtype=np.int64)
+
+    def add(self, start, rows, mins, maxs, sums, counts):
+        #Ajoute une ligne ou un bloc fermé du niveau plus fin ; renvoie le bloc fermé, ou None
+        if not self.open_rows:
+            self.open_start = start
+        np.fmin(self.open_min, mins, out=self.open_min)
+        np.fmax(self.open_max, maxs, out=self.open_max)
+        self.open_sum += sums
+        self.open_count += counts
+        self.open_rows += rows
+        if self.open_rows < self.size:
+            return None
+        block = (self.open_start, self.open_rows, self.open_min.copy(), self.open_max.copy(),
+                 self.open_sum.copy(), self.open_count.copy())
+        self._store(*block)
+        self.open_rows = 0
+        self.open_min.fill(np.nan)
+        self.open_max.fill(np.nan)
+        self.open_sum.fill(0)
+        self.open_count.fill(0)
+        return block
+
+    def _store(self, start, rows, mins, maxs, sums, counts):
+        if self.keep_all and self.n == self.capacity:
+            self._compact()
+        i = self.head
+        self.starts[i], self.widths[i] = start, rows
+        self.mins[i], self.maxs[i], self.sums[i], self.counts[i] = mins, maxs, sums, counts
+        self.head = (self.head + 1) % self.capacity
+        self.n = min(self.n + 1, self.capacity)
+
+    def _compact(self):
+        #Niveau plein sans perte : blocs fusionnés deux à deux (l'anneau n'a jamais tourné)
+        half = self.n // 2
+        self.widths[:half] = self.widths[0:2 * half:2] + self.widths[1:2 * half:2]
+        self.starts[:half] = self.starts[0:2 * half:2]
+        self.mins[:half] = np.fmin(self.mins[0:2 * half:2], self.mins[1:2 * half:2])
+        self.maxs[:half] = np.fmax(self.maxs[0:2 * half:2], self.maxs[1:2 * half:2])
+        self.sums[:half] = self.sums[0:2 * half:2] + self.sums[1:2 * half:2]
+        self.counts[:half] = self.counts[0:2 * half:2] + self.counts[1:2 * half:2]
+        if self.n % 2:
+            #Dernier bloc sans voisin : conservé tel quel
+            last = self.n - 1
+            self.starts[half], self.widths[half] = self.starts[last], self.widths[last]
+            self.mins[half], self.maxs[half] = self.mins[last], self.maxs[last]
+            self.sums[half], self.counts[half] = self.sums[last], self.counts[last]
+            half += 1
+        self.n = self.head = half
+        self.size *= 2
+
+    def blocks(self, column):
+        #Blocs (fermés puis ouvert) dans l'ordre chronologique : débuts, largeurs, min, moyenne, max
+        order = (self.head - self.n + np.arange(self.n)) % self.capacity
+        starts, widths = self.starts[order], self.widths[order]
+        mins, maxs = self.mins[order, column], self.maxs[order, column]
+        sums, counts = self.sums[order, column], self.counts[order, column]
+        if self.open_rows:
+            starts, widths = np.append(starts, self.open_start), np.append(widths, self.open_rows)
+            mins, maxs = np.append(mins, self.open_min[column]), np.append(maxs, self.open_max[column])
+            sums, counts = np.append(sums, self.open_sum[column]), np.append(counts, self.open_count[column])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+        return starts, widths, mins, means, maxs
+
+
+class RollingCollector:
+    """RollingCollector class.
+    Replacement of mesa's DataCollector (model reporters only) with a memory bounded whatever the
+    length of the run: the values of the last window rows are kept exactly, and the older rows as
+    min/mean/max aggregates per block of rows, for each resolution (10, 100 and 1000 rows by default).
+    Each resolution keeps its last capacity blocks, except the coarsest one, which merges its blocks
+    two by two when it is full so that it always covers the whole run.
+
+    history returns the whole run of a column at the finest resolution available for each period
+    (two consecutive resolutions may overlap by one block at their boundary). None values are stored
+    as NaN and ignored by the aggregates.
+
+    attr:
+        model_reporters: the reporters, by column name, called with the model on each collect (dict)
+        window: the number of last rows kept exactly (int)
+        resolutions: the sizes of the blocks of each resolution, each one a multiple of the previous one (tuple)
+        capacity: the number of blocks kept by each resolution (int)
+        rows: the number of rows collected so far (int)
+    """
+
+    def __init__(self, model_reporters, window=1000, resolutions=(10, 100, 1000), capacity=1000):
+        """ Create an empty collector.
+        """
+        if any(b % a for a, b in zip(resolutions, resolutions[1:])):
+            raise ValueError("Chaque résolution doit être un multiple de la précédente.")
+        self.model_reporters = dict(model_reporters)
+        self.window = window
+        self.resolutions = tuple(resolutions)
+        self.capacity = capacity
+        self._reset()
+
+    def _reset(self):
+        self.rows = 0
+        self._names = list(self.model_reporters)
+        self._index = {name: i for i, name in enumerate(self._names)}
+        self._values = np.full((self.window, len(self._names)), np.nan)
+        self._levels = [_Level(len(self._names), size, self.capacity, keep_all=(i == len(self.resolutions) - 1))
+                        for i, size in enumerate(self.resolutions)]
+        self._last = {}
+        self._ones = np.ones(len(self._names), dtype=np.int64)
+
+    def collect(self, model):
+        """ Compute every reporter on the model and append the row.
+        """
+        self.append({name: reporter(model) for name, reporter in self.model_reporters.items()})
+
+    def append(self, row):
+        """ Append a row (value of each column, None for a missing value).
+        """
+        values = np.array([np.nan if row.get(name) is None else row[name] for name in self._names], dtype=float)
+        self._values[self.rows % self.window] = values
+        self._last = row
+        missing = np.isnan(values)
+        block = (self.rows, 1, values, values, np.where(missing, 0.0, values), self._ones - missing)
+        self.rows += 1
+        #Un bloc fermé d'une résolution alimente la suivante
+        for level in self._levels:
+            block = level.add(*block)
+            if block is None:
+                break
+
+    def latest(self, name=None):
+        """ Return the value of the column in the last row (the whole row as a dict if name is None).
+        """
+        if not self.rows:
+            raise ValueError("Aucune ligne collectée.")
+        return dict(self._last) if name is None else self._last[name]
+
+    def column(self, name):
+        """ Return the exact values of the column in the last window rows (NaN for None).
+        """
+        n = min(self.rows, self.window)
+        order = (self.rows - n + np.arange(n)) % self.window
+        return self._values[order, self._index[name]]
+
+    def history(self, name):
+        """ Return the whole run of the column as arrays (first row, number of rows, min, mean, max):
+        the blocks of the coarsest resolutions for the oldest rows, then of the finer ones, then
+        the exact values (blocks of one row) of the last window rows.
+        """
+        column = self._index[name]
+        values = self.column(name)
+        covered_from = self.rows - len(values)
+        parts = [(np.arange(covered_from, self.rows), np.ones(len(values), dtype=np.int64), values, values, values)]
+        for level in self._levels:
+            starts, widths, mins, means, maxs = level.blocks(column)
+            keep = starts < covered_from
+            if keep.any():
+                parts.append((starts[keep], widths[keep], mins[keep], means[keep], maxs[keep]))
+                covered_from = int(starts[keep][0])
+        return tuple(np.concatenate(arrays) for arrays in zip(*reversed(parts)))
+
+    def __len__(self):
+        return self.rows
+
+    def get_model_vars_dataframe(self):
+        """ Return the last window rows as a DataFrame indexed by row number.
+        """
+        n = min(self.rows, self.window)
+        return pd.DataFrame({name: self.column(name) for name in self._names},
+                            index=pd.RangeIndex(self.rows - n, self.rows))
+
+    @property
+    def model_vars(self):
+        """ The exact values of each column in the last window rows as lists, None for the missing values.
+        """
+        return {name: [None if v != v else v for v in self.column(name).tolist()] for name in self._names}
+
+    @model_vars.setter
+    def model_vars(self, model_vars):
+        #Remplace tout l'historique (reprise d'un point de sauvegarde) : seules les lignes données sont connues
+        self._reset()
+        names = [name for name in self._names if name in model_vars]
+        for values in zip(*(model_vars[name] for name in names)):
+            self.append(dict(zip(names, values)))
@@ -0,0 +1,339 @@
+'''
+@authors
+Rayane Bouaita
+Gabriel Trier
+Pierre El Anati
+
+Groupe 21
+
+@date 11/03/2025
+'''
+
+import weakref
+
+import numpy as np
+from mesa.space import MultiGrid, PropertyLayer
+from objects import Waste, WASTE_TYPES
+
+ZONES = ("z1", "z2", "z3")
+
+# Bornes du tirage de radioactivité pour chaque zone
+RADIOACTIVITY_RANGES = ((0, 0.33), (0.33, 0.66), (0.66, 1))
+
+
+class ZoneLayer:
+    """ZoneLayer class.
+    Dense description of the static environment: zone, radioactivity level and
+    waste disposal flag of every cell, stored as NumPy-backed property layers of the grid.
+
+    attr:
+        zone: the zone index of each cell, see ZONES (PropertyLayer)
+        radioactivity: the radioactivity level of each cell (PropertyLayer)
+        disposal: True for the cells of the waste disposal column (PropertyLayer)
+    """
+
+    def __init__(self, grid, rng):
+        """ Create the layers for the given grid and register them on it.
+        """
+        width, height = grid.width, grid.height
+        zone_width = width // 3
+
+        self.zone = PropertyLayer("zone", width, height, 0, dtype=np.int8)
+        self.zone.data[zone_width:2 * zone_width, :] = 1
+        self.zone.data[2 * zone_width:, :] = 2
+
+        low = np.array([r[0] for r in RADIOACTIVITY_RANGES])[self.zone.data]
+        high = np.array([r[1] for r in RADIOACTIVITY_RANGES])[self.zone.data]
+        self.radioactivity = PropertyLayer("radioactivity", width, height, 0.0)
+        self.radioactivity.data[:] = rng.uniform(low, high)
+
+        # Zone de dépôt : dernière colonne de la grille
+        self.disposal = PropertyLayer("disposal", width, height, False, dtype=bool)
+        self.disposal.data[width - 1, :] = True
+        self.radioactivity.data[width - 1, :] = 1.0
+
+        for layer in (self.zone, self.radioactivity, self.disposal):
+            grid.add_property_layer(layer)
+
+    def zone_at(self, pos):
+        """ Return the zone name ("z1", "z2" or "z3") of the cell.
+        """
+        return ZONES[self.zone.data[pos]]
+
+    def radioactivity_at(self, pos):
+        """ Return the radioactivity level of the cell.
+        """
+        return float(self.radioactivity.data[pos])
+
+    def is_disposal(self, pos):
+        """ Return True if the cell belongs to the waste disposal zone.
+        """
+        return bool(self.disposal.data[pos])
+
+
+class DirtyCells:
+    """DirtyCells class.
+    Cells whose content changed, fed by the grid which created it (RobotGrid.track_dirty_cells).
+
+    attr:
+        cells: the cells added since the last pop_all (set)
+    """
+
+    __slots__ = ("cells", "__weakref__")
+
+    def __init__(self):
+        self.cells = set()
+
+    def __len__(self):
+        return len(self.cells)
+
+    def pop_all(self):
+        """ Return the cells added since the previous call and start a new set.
+        """
+        cells, self.cells = self.cells, set()
+        return cells
+
+
+class RobotGrid(MultiGrid):
+    """RobotGrid class.
+    MultiGrid keeping per-cell occupancy counts of robots and of each waste type, updated on
+    every place_agent/remove_agent (and therefore move_agent), so that occupancy checks
+    do not have to scan the cell contents.
+
+    Every agent placed on the grid which is not a Waste is counted as a robot.
+
+    The wastes are also indexed by square buckets of bucket_size cells: nearest_waste only scans
+    the cells of the non-empty buckets close enough to hold the answer.
+
+    attr:
+        robot_count: number of robots in each cell (numpy array)
+        waste_count: number of wastes of each type in each cell, indexed by WASTE_TYPES (numpy array)
+        waste_total: number of wastes of any type in each cell (numpy array)
+        bucket_size: side of the buckets of the waste index, in cells (int)
+        waste_buckets: number of wastes of each type in each bucket, indexed by WASTE_TYPES (numpy array)
+        occupancy_listeners: functions called with the position of a cell a robot enters or leaves (list)
+        dirty_cells: the DirtyCells sets fed by the grid, one per consumer (see track_dirty_cells),
+            dropped with their consumer (WeakSet)
+    """
+
+    #Contenu initial de chaque cellule (une liste vide, comme MultiGrid) : list est appelé directement,
+    #sans passer par une fonction Python, pour chacune des width x height cellules
+    default_val = staticmethod(list)
+
+    def __init__(self, width, height, torus, bucket_size=8):
+        """ Create a new grid with empty occupancy counts.
+        """
+        super().__init__(width, height, torus)
+        self.robot_count = np.zeros((width, height), dtype=np.int32)
+        self.waste_count = np.zeros((len(WASTE_TYPES), width, height), dtype=np.int32)
+        self.waste_total = np.zeros((width, height), dtype=np.int32)
+        self.bucket_size = bucket_size
+        self.waste_buckets = np.zeros((len(WASTE_TYPES), -(-width // bucket_size), -(-height // bucket_size)),
+                                      dtype=np.int32)
+        self._waste_index = {waste_type: i for i, waste_type in enumerate(WASTE_TYPES)}
+        self._frozen_robots = None
+        self.occupancy_listeners = []
+        self.dirty_cells = weakref.WeakSet()
+
+    def _update_counts(self, agent, pos, delta):
+        x, y = pos
+        if self.dirty_cells:
+            for dirty in self.dirty_cells:
+                dirty.cells.add(pos)
+        if isinstance(agent, Waste):
+            t = self._waste_index[agent.waste_type]
+            self.waste_count[t, x, y] += delta
+            self.waste_total[x, y] += delta
+            self.waste_buckets[t, x // self.bucket_size, y // self.bucket_size] += delta
+        else:
+            self.robot_count[x, y] += delta
+            for listener in self.occupancy_listeners:
+                listener(pos)
+
+    def place_agent(self, agent, pos):
+        """ Place the agent at the given position and update the occupancy counts.
+        """
+        x, y = pos
+        already_placed = agent in self._grid[x][y]
+        super().place_agent(agent, pos)
+        if not already_placed:
+            self._update_counts(agent, pos, 1)
+
+    def place_agents(self, agents, positions):
+        """ Place each agent at its position, in order, as place_agent would for agents not on the grid
+        yet, and update the occupancy counts once for all of them.
+        """
+        is_waste = np.zeros(len(agents), dtype=bool)
+        types = np.zeros(len(agents), dtype=np.int64)
+        for i, (agent, pos) in enumerate(zip(agents, positions)):
+            self._grid[pos[0]][pos[1]].append(agent)
+            agent.pos = pos
+            if isinstance(agent, Waste):
+                is_waste[i] = True
+                types[i] = self._waste_index[agent.waste_type]
+        if self._empties_built:
+            for pos in positions:
+                self._empties.discard(pos)
+                self._empty_mask[pos] = True
+        if not agents:
+            return
+        if self.dirty_cells:
+            for dirty in self.dirty_cells:
+                dirty.cells.update(positions)
+        xs, ys = np.array(positions, dtype=np.int64).reshape(-1, 2).T
+        t, wx, wy = types[is_waste], xs[is_waste], ys[is_waste]
+        np.add.at(self.waste_count, (t, wx, wy), 1)
+        np.add.at(self.waste_total, (wx, wy), 1)
+        np.add.at(self.waste_buckets, (t, wx // self.bucket_size, wy // self.bucket_size), 1)
+        np.add.at(self.robot_count, (xs[~is_waste], ys[~is_waste]), 1)
+        for agent, pos in zip(agents, positions):
+            if not isinstance(agent, Waste):
+                for listener in self.occupancy_listeners:
+                    listener(pos)
+
+    def remove_agent(self, agent):
+        """ Remove the agent from the grid and update the occupancy counts.
+        """
+        pos = agent.pos
+        super().remove_agent(agent)
+        self._update_counts(agent, pos, -1)
+
+    def relocate_robot(self, agent, pos):
+        """ Move a robot already on the grid to pos (inside the grid), as move_agent would, without the
+        checks of mesa: used to apply known moves quickly (replay).
+        """
+        x, y = agent.pos
+        nx, ny = pos
+        self._grid[x][y].remove(agent)
+        self._grid[nx][ny].append(agent)
+        if self._empties_built:
+            if not self._grid[x][y]:
+                self._empties.add((x, y))
+                self._empty_mask[x, y] = False
+            self._empties.discard(pos)
+            self._empty_mask[pos] = True
+        agent.pos = pos
+        self.robot_count[x, y] -= 1
+        self.robot_count[nx, ny] += 1
+        if self.dirty_cells:
+            for dirty in self.dirty_cells:
+                dirty.cells.add((x, y))
+                dirty.cells.add(pos)
+        for listener in self.occupancy_listeners:
+            listener((x, y))
+            listener(pos)
+
+    def track_dirty_cells(self):
+        """ Return a new DirtyCells set, to which the grid adds every cell where an agent is placed or
+        removed. Each consumer (view of the grid) has its own set, emptied by its pop_all only: two
+        consumers never take each other's cells. The grid stops feeding a set once it is released.
+        """
+        dirty = DirtyCells()
+        self.dirty_cells.add(dirty)
+        return dirty
+
+    def has_robot(self, pos):
+        """ Return True if at least one robot is in the cell (or was when freeze_robots was called).
+        """
+        if self._frozen_robots is not None and self._frozen_robots[pos]:
+            return True
+        return bool(self.robot_count[pos])
+
+    def freeze_robots(self):
+        """ Keep the cells occupied now reported as occupied by has_robot until unfreeze_robots,
+        even once their robots have left.
+        """
+        self._frozen_robots = self.robot_count.copy()
+
+    def unfreeze_robots(self):
+        """ Go back to reporting the current occupancy only.
+        """
+        self._frozen_robots = None
+
+    def waste_at(self, pos, waste_type=None):
+        """ Return the number of wastes of the given type (any type if None) in the cell.
+        """
+        if waste_type is None:
+            return int(self.waste_total[pos])
+        return int(self.waste_count[self._waste_index[waste_type], pos[0], pos[1]])
+
+    def is_free_for_drop(self, pos):
+        """ Return True if no waste lies in the cell.
+        """
+        return not self.waste_total[pos]
+
+    def _search_bounds(self, zone, area):
+        #Rectangle (x_min, x_max, y_min, y_max) de la recherche : grille entière, restreinte à la zone et à l'aire
+        x_min, x_max, y_min, y_max = 0, self.width - 1, 0, self.height - 1
+        if zone is not None:
+            columns = np.flatnonzero(self.properties["zone"].data[:, 0] == ZONES.index(zone))
+            x_min, x_max = int(columns[0]), int(columns[-1])
+        if area is not None:
+            x_min, x_max = max(x_min, area[0]), min(x_max, area[1])
+            y_min, y_max = max(y_min, area[2]), min(y_max, area[3])
+        return x_min, x_max, y_min, y_max
+
+    def _ring_buckets(self, t, center, r, bounds):
+        #Buckets non vides de type t à distance (Tchebychev, en buckets) exactement r du bucket center
+        cx, cy = center
+        bx_min, bx_max, by_min, by_max = bounds
+        if r == 0:
+            strips = [(cx, cx, cy, cy)]
+        else:
+            strips = [(cx - r, cx + r, cy - r, cy - r), (cx - r, cx + r, cy + r, cy + r),
+                      (cx - r, cx - r, cy - r + 1, cy + r - 1), (cx + r, cx + r, cy - r + 1, cy + r - 1)]
+        for x0, x1, y0, y1 in strips:
+            x0, x1, y0, y1 = max(x0, bx_min), min(x1, bx_max), max(y0, by_min), min(y1, by_max)
+            if x0 > x1 or y0 > y1:
+                continue
+            for i, j in zip(*np.nonzero(self.waste_buckets[t, x0:x1 + 1, y0:y1 + 1])):
+                yield x0 + int(i), y0 + int(j)
+
+    def nearest_waste(self, pos, waste_type, zone=None, area=None):
+        """ Return the position of the nearest waste of the given type (Manhattan distance, ties broken
+        by the smallest (x, y)), or None if there is none. The search can be restricted to a zone
+        ("z1", "z2" or "z3") and/or to an area (x_min, x_max, y_min, y_max).
+        The buckets are visited by rings around the bucket of pos, and the search stops as soon as
+        the next ring can no longer hold a closer waste.
+        """
+        t = self._waste_index[waste_type]
+        x_min, x_max, y_min, y_max = self._search_bounds(zone, area)
+        if x_min > x_max or y_min > y_max:
+            return None
+        size = self.bucket_size
+        x, y = pos
+        bounds = (x_min // size, x_max // size, y_min // size, y_max // size)
+        center = (x // size, y // size)
+        last_ring = max(center[0] - bounds[0], bounds[1] - center[0], center[1] - bounds[2], bounds[3] - center[1])
+
+        best = None
+        for r in range(last_ring + 1):
+            for bx, by in self._ring_buckets(t, center, r, bounds):
+                x0, x1 = max(bx * size, x_min), min((bx + 1) * size - 1, x_max)
+                y0, y1 = max(by * size, y_min), min((by + 1) * size - 1, y_max)
+                for i, j in zip(*np.nonzero(self.waste_count[t, x0:x1 + 1, y0:y1 + 1])):
+                    wx, wy = x0 + int(i), y0 + int(j)
+                    candidate = (abs(wx - x) + abs(wy - y), wx, wy)
+                    if best is None or candidate < best:
+                        best = candidate
+            #Toute case d'un bucket de l'anneau r + 1 est à une distance d'au moins r * size + 1
+            if best is not None and best[0] <= r * size:
+                break
+        return None if best is None else (best[1], best[2])
+
+    def waste_within(self, pos, radius, waste_type=None):
+        """ Return the positions of the cells holding a waste of the given type (any type if None)
+        at a Manhattan distance of at most radius from pos, sorted by distance then by (x, y).
+        Only the square of side 2 * radius + 1 around pos is scanned.
+        """
+        x, y = pos
+        x0, x1 = max(x - radius, 0), min(x + radius, self.width - 1)
+        y0, y1 = max(y - radius, 0), min(y + radius, self.height - 1)
+        counts = self.waste_total if waste_type is None else self.waste_count[self._waste_index[waste_type]]
+        found = []
+        for i, j in zip(*np.nonzero(counts[x0:x1 + 1, y0:y1 + 1])):
+            wx, wy = x0 + int(i), y0 + int(j)
+            distance = abs(wx - x) + abs(wy - y)
+            if distance <= radius:
+                found.append((distance, wx, wy))
+        return [(wx, wy) for _, wx, wy in sorted(found)]
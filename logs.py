@@ -0,0 +1,55 @@
+'''
+@authors
+Rayane Bouaita
+Gabriel Trier
+Pierre El Anati
+
+Groupe 21
+
+@date 11/03/2025
+'''
+
+import logging
+import sys
+
+# Une catégorie = un logger enfant de "robots", activable indépendamment des autres.
+# Les messages utilisent le formatage différé de logging ("%s", args) : quand une
+# catégorie est désactivée, aucun message n'est construit.
+movement_log = logging.getLogger("robots.movement")
+messaging_log = logging.getLogger("robots.messaging")
+lifecycle_log = logging.getLogger("robots.lifecycle")
+
+CATEGORIES = {
+    "movement": movement_log,
+    "messaging": messaging_log,
+    "lifecycle": lifecycle_log,
+}
+
+# Niveau appliqué en mode silencieux : seules les erreurs restent visibles
+QUIET_LEVEL = logging.ERROR
+
+# Rien n'est configuré à l'import : sans appel à configure (fait par les points d'entrée : server.py,
+# batch_run.py, benchmark.py), les traces suivent la configuration de logging de l'appelant
+_root = logging.getLogger("robots")
+# Convention des bibliothèques : pas de sortie par défaut (logging.lastResort) tant que rien n'est configuré
+_root.addHandler(logging.NullHandler())
+_handler = logging.StreamHandler(sys.stdout)
+_handler.setFormatter(logging.Formatter("%(message)s"))
+
+
+def configure(quiet=True, level=logging.DEBUG):
+    """ Send the traces to stdout and configure every category at once: QUIET_LEVEL if quiet, the
+    given level otherwise. Called once by the entry points: the levels are global to the process.
+    """
+    if _handler not in _root.handlers:
+        _root.addHandler(_handler)
+        _root.propagate = False
+    for logger in CATEGORIES.values():
+        logger.setLevel(QUIET_LEVEL if quiet else level)
+
+
+def set_category(name, enabled=True, level=logging.DEBUG):
+    """ Enable (at the given level) or disable (down to QUIET_LEVEL) a single category.
+    """
+    CATEGORIES[name].setLevel(level if enabled else QUIET_LEVEL)
+
@@ -9,19 +9,75 @@ Groupe 21
 @date 11/03/2025
 '''
 
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
 import mesa 
-from agents import RobotAgent
 from mesa.datacollection import DataCollector
-from objects import Radioactivity, WasteDisposal, Waste
+from objects import Waste, WasteType, WASTE_TYPES
+from environment import ZoneLayer, RobotGrid
 from agents import GreenRobot, YellowRobot, RedRobot, GreenGather, YellowGather, AloneGreen, AloneYellow
 from MessageService import MessageService
-from Message import Message
+from Message import WasteNotification
 from MessagePerformative import MessagePerformative
+from profiling import StepProfiler
+from routing import Router
+from recording import ActionRecorder
+from collector import StreamingCollector, RollingCollector
+import checkpoint
+from logs import messaging_log, lifecycle_log
+
+STEP_MODES = ("sequential", "two_phase")
+
+#Interpréteur sans GIL (free-threaded) : seul cas où un pool de threads délibère en parallèle
+FREE_THREADED = not getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+def _action_phase(action):
+    #Ordre d'application en mode two_phase : actions sur place, déplacements vers une case connue,
+    #puis déplacements calculés par le robot (move sans cible, move_vertical)
+    if action["action"] in ("move_east", "move_to") or (action["action"] == "move" and "target" in action):
+        return 1
+    if action["action"] in ("move", "move_vertical"):
+        return 2
+    return 0
+
+
+def _decide_chunk(robots):
+    return [(robot.unique_id, robot.decide()) for robot in robots]
+
 
 class RobotModel(mesa.Model):
     def __init__(self, width=15, height=9, green_waste=4, yellow_waste=4, red_waste=4,
-                 n_green=1, n_yellow=1, n_red=1):
-        super().__init__()
+                 n_green=1, n_yellow=1, n_red=1, seed=None, profile=False,
+                 step_mode="sequential", deliberation_workers=None, seek_nearest=False,
+                 routing=False, notify_radius=None, mailbox_history=None, coalesce_messages=False,
+                 message_ttl=None, record_actions=False, stream_data=False, stream_dir=None,
+                 metrics_window=None):
+        #Toute décision aléatoire (placement, radioactivité, marche des robots rouges) passe
+        #par self.random / self.rng, initialisés à partir de la graine : runs reproductibles
+        super().__init__(seed=seed)
+        if step_mode not in STEP_MODES:
+            raise ValueError(f"step_mode doit valoir {' ou '.join(STEP_MODES)}, pas {step_mode!r}.")
+        #sequential : chaque robot perçoit puis agit à son tour ; two_phase : tous délibèrent sur le
+        #même état de la grille, puis les actions sont appliquées ensemble (apply_actions)
+        self.step_mode = step_mode
+        if deliberation_workers and step_mode != "two_phase":
+            raise ValueError("deliberation_workers n'est utilisable qu'avec step_mode=\"two_phase\".")
+        #Délibération des robots sur un pool de threads (phase 1 du mode two_phase) : avec le GIL, les threads
+        #n'exécutent pas le Python en parallèle (mesuré : x0.85 à x1.13 de 2 à 8 threads), l'option est
+        #donc réservée aux interpréteurs sans GIL
+        if deliberation_workers and not FREE_THREADED:
+            raise ValueError("deliberation_workers nécessite un interpréteur sans GIL (Python 3.13t ou plus).")
+        self.deliberation_workers = deliberation_workers
+        self._deliberation_pool = ThreadPoolExecutor(deliberation_workers) if deliberation_workers else None
+        #Robots sans rien à faire : vers le déchet le plus proche (index de la grille) au lieu de balayer
+        self.seek_nearest = seek_nearest
+        #Robots notifiés des seuls événements à moins de notify_radius cellules de leur zone (None : toute la grille)
+        self.notify_radius = notify_radius
+        #Nombre de messages lus conservés par boîte aux lettres (None : tous, 0 : aucun)
+        self.mailbox_history = mailbox_history
         self.width = width
         self.height = height
         self.green_waste = green_waste
@@ -30,51 +86,112 @@ class RobotModel(mesa.Model):
         self.n_green = n_green
         self.n_yellow = n_yellow
         self.n_red = n_red
-        self.grid = mesa.space.MultiGrid(width, height, False)
+        self.grid = RobotGrid(width, height, False)
         self.robots = []  
         self.step_count = 0  #Add step counter 
         self.deposition_step = None
         self.running = True  #Attribut standard de Mesa pour contrôler l'exécution
+
+        #Compteurs incrémentaux (déchets sur la grille, en inventaire, distances par couleur)
+        self.waste_on_grid = {waste_type: 0 for waste_type in WASTE_TYPES}
+        self.waste_in_inventories = 0
+        self.distance_by_type = {"green": 0, "yellow": 0, "red": 0}
         
-        self.message_service = MessageService(self, instant_delivery=False) #Communication 
+        #Communication : messages distribués au début du step suivant, éventuellement regroupés par
+        #destinataire (coalesce_messages) et abandonnés après message_ttl ticks
+        self.message_ttl = message_ttl
+        self.coalesce_messages = coalesce_messages
+        self.message_service = MessageService(self, instant_delivery=False, coalesce=coalesce_messages, ttl=message_ttl)
+
+        #Table de dispatch des actions renvoyées par deliberate
+        self._actions = {
+            "move": self._do_move,
+            "move_east": self._do_move_east,
+            "move_vertical": self._do_move_vertical,
+            "move_to": self._do_move_to,
+            "pickup": self._do_pickup,
+            "transform": self._do_transform,
+            "drop": self._do_drop,
+        }
 
         self.setup_zones()
+        #Plus courts chemins (colonnes de dépôt, déchets ciblés) par champs de distance en cache
+        self.router = Router(self.grid) if routing else None
         self.add_initial_waste()
         self.create_robots()
+        self.setup_subscriptions()
+
+        if step_mode == "two_phase":
+            #Un générateur par robot pour les marches aléatoires : les tirages ne dépendent pas de
+            #l'ordre dans lequel les robots délibèrent
+            for robot in self.robots:
+                robot.walk_random = random.Random(self.random.getrandbits(64))
+
+        #Profilage optionnel des phases du step : sans profiler, aucune méthode n'est enveloppée
+        self.profiler = StepProfiler(self) if profile else None
 
-        self.datacollector = DataCollector(
-            model_reporters={
-                "Step": lambda m: m.step_count,
-                "GreenDistance": lambda m: sum(r.distance for r in m.robots if r.type == "green"),
-                "YellowDistance": lambda m: sum(r.distance for r in m.robots if r.type == "yellow"),
-                "RedDistance": lambda m: sum(r.distance for r in m.robots if r.type == "red"),
-                "RedDepositionStep": lambda m: m.deposition_step if m.deposition_step is not None else None,
-                "GreenWasteCount": lambda m: sum(1 for a in m.grid.agents if isinstance(a, Waste) and a.waste_type == "green"),
-                "YellowWasteCount": lambda m: sum(1 for a in m.grid.agents if isinstance(a, Waste) and a.waste_type == "yellow"),
-                "RedWasteCount": lambda m: sum(1 for a in m.grid.agents if isinstance(a, Waste) and a.waste_type == "red")
-            }
-        )
+        model_reporters = {
+            "Step": lambda m: m.step_count,
+            "GreenDistance": lambda m: m.distance_by_type["green"],
+            "YellowDistance": lambda m: m.distance_by_type["yellow"],
+            "RedDistance": lambda m: m.distance_by_type["red"],
+            "RedDepositionStep": lambda m: m.deposition_step if m.deposition_step is not None else None,
+            "GreenWasteCount": lambda m: m.waste_on_grid["green"],
+            "YellowWasteCount": lambda m: m.waste_on_grid["yellow"],
+            "RedWasteCount": lambda m: m.waste_on_grid["red"],
+            "MailboxSize": lambda m: sum(r.get_mailbox_stats()["size"] for r in m.robots),
+            "MailboxEvicted": lambda m: sum(r.get_mailbox_stats()["evicted"] for r in m.robots),
+        }
+        if self.profiler is not None:
+            model_reporters.update(self.profiler.reporters())
+        if stream_data and metrics_window:
+            raise ValueError("stream_data et metrics_window ne peuvent pas être utilisés ensemble.")
+        if record_actions and metrics_window:
+            #La trace relit toutes les lignes enregistrées, la fenêtre n'en garde que les dernières
+            raise ValueError("record_actions et metrics_window ne peuvent pas être utilisés ensemble.")
+        if stream_data:
+            #Colonnes NumPy écrites par blocs dans stream_dir (répertoire temporaire si None) : mémoire constante
+            self.datacollector = StreamingCollector(model_reporters, stream_dir)
+        elif metrics_window:
+            #metrics_window dernières lignes exactes, agrégats min/moyenne/max pour les plus anciennes
+            self.datacollector = RollingCollector(model_reporters, window=metrics_window)
+        else:
+            self.datacollector = DataCollector(model_reporters=model_reporters)
         # Initial data collection
         self.datacollector.collect(self)
+
+        #Enregistrement optionnel des actions pour un replay (replay.py) : sans recorder, do n'est pas enveloppé
+        self.recorder = ActionRecorder(self) if record_actions else None
     
-    def setup_zones(self):
-        zone_width = self.width // 3
+    def profile_report(self):
+        """ Return the profiling report of the steps run so far (see StepProfiler.report).
+        """
+        if self.profiler is None:
+            raise ValueError("Profilage désactivé : créer le modèle avec profile=True.")
+        return self.profiler.report()
+
+    def save_trace(self, path):
+        """ Save the initial layout and the actions applied since the model was created (see ActionRecorder.save).
+        """
+        if self.recorder is None:
+            raise ValueError("Enregistrement désactivé : créer le modèle avec record_actions=True.")
+        self.recorder.save(path)
+
+    def save_checkpoint(self, path):
+        """ Save the state of the model to path (see checkpoint.save), between two steps.
+        """
+        checkpoint.save(self, path)
+
+    @classmethod
+    def load_checkpoint(cls, path):
+        """ Return a new model in the state saved to path by save_checkpoint: it continues the run
+        step for step as the saved model would have.
+        """
+        return checkpoint.load(cls, path)
 
-        #Place Radioactivity agents in every cell with the proper zone assignment.
-        for x in range(self.width):
-            for y in range(self.height):
-                if x < zone_width:
-                    zone = "z1"
-                elif x < 2 * zone_width:
-                    zone = "z2"
-                else:
-                    zone = "z3"
-                radioactivity = Radioactivity(self, zone)
-                self.grid.place_agent(radioactivity, (x, y))
-
-        for y in range(self.height):
-            disposal = WasteDisposal(self)
-            self.grid.place_agent(disposal, (self.width - 1, y))
+    def setup_zones(self):
+        #Couche dense (zone, radioactivité, dépôt) attachée à la grille : aucune entité par cellule
+        self.zones = ZoneLayer(self.grid, self.rng)
 
     def create_robots(self):
         robot_id = 0
@@ -117,7 +234,7 @@ class RobotModel(mesa.Model):
                     robot.deposit_column = x_max
                     self.grid.place_agent(robot, (x, y))
                     self.robots.append(robot)
-                    print(f"[DEBUG] {color.capitalize()}Robot créé à ({x}, {y}) | ID : {robot_id} | Zone : ({x_min}, {x_max}, {y_min}, {y_max})")
+                    lifecycle_log.debug("[DEBUG] %sRobot créé à (%s, %s) | ID : %s | Zone : (%s, %s, %s, %s)", color.capitalize(), x, y, robot_id, x_min, x_max, y_min, y_max)
                     robot_id += 1
 
                 if color != 'red':
@@ -134,7 +251,7 @@ class RobotModel(mesa.Model):
                     )
                     self.grid.place_agent(robot, (x, y))
                     self.robots.append(robot)
-                    print(f"[DEBUG] {color.capitalize()}Gather créé à ({x}, {y}) | ID : {robot_id} | Zone : ({x_min}, {x_max}, {y_min}, {y_max})")
+                    lifecycle_log.debug("[DEBUG] %sGather créé à (%s, %s) | ID : %s | Zone : (%s, %s, %s, %s)", color.capitalize(), x, y, robot_id, x_min, x_max, y_min, y_max)
                     robot_id += 1
 
             elif not ((color == 'red') and (count == 1)):  # un seul robot
@@ -150,9 +267,17 @@ class RobotModel(mesa.Model):
                 )
                 self.grid.place_agent(robot, (x, y))
                 self.robots.append(robot)
-                print(f"[DEBUG] {color.capitalize()}Robot (unique) créé à ({x}, {y}) | ID : {robot_id} | Zone : ({x_min}, {x_max}, {y_min}, {y_max})")
+                lifecycle_log.debug("[DEBUG] %sRobot (unique) créé à (%s, %s) | ID : %s | Zone : (%s, %s, %s, %s)", color.capitalize(), x, y, robot_id, x_min, x_max, y_min, y_max)
                 robot_id += 1
 
+    def setup_subscriptions(self):
+        #Cibles (DOING) des robots de même type, dépôts de déchets rouges (REQUEST) pour les robots rouges
+        for robot in self.robots:
+            region = robot.notify_region()
+            robot.subscribe(f"doing/{robot.type}", region)
+            if robot.type == "red":
+                robot.subscribe("drop/red", region)
+
     def add_initial_waste(self):
         zone_width = self.width // 3
         waste_id = 0  # ID unique pour chaque déchet
@@ -165,6 +290,7 @@ class RobotModel(mesa.Model):
             waste.unique_id = waste_id  # Assigner un ID unique
             waste_id += 1
             self.grid.place_agent(waste, (x, y))
+            self.waste_on_grid[waste.waste_type] += 1
         
         #Zone 2: waste jaunes
         for _ in range(self.yellow_waste):
@@ -174,6 +300,7 @@ class RobotModel(mesa.Model):
             waste.unique_id = waste_id  # Assigner un ID unique
             waste_id += 1
             self.grid.place_agent(waste, (x, y))
+            self.waste_on_grid[waste.waste_type] += 1
         
         #Zone 3: waste rouges (en évitant la dernière colonne pour le waste disposal)
         for _ in range(self.red_waste):
@@ -183,154 +310,222 @@ class RobotModel(mesa.Model):
             waste.unique_id = waste_id  # Assigner un ID unique
             waste_id += 1
             self.grid.place_agent(waste, (x, y))
+            self.waste_on_grid[waste.waste_type] += 1
 
     def do(self, agent, action):
-        if action["action"] == "move":
-            agent.distance += 1
-            if "target" in action:
-                # Move agent directly to target position if provided
-                target_pos = action["target"]
-                cell_contents = self.grid.get_cell_list_contents(target_pos)
-                zone = None
-                for obj in cell_contents:
-                    if hasattr(obj, "zone") and obj.__class__.__name__ == "Radioactivity":
-                        zone = obj.zone
-                        break
-                if zone in agent.allowed_zones:
-                    self.grid.move_agent(agent, target_pos)
-            else:
-                agent.move()
+        """ Apply the action chosen by the agent and return the contents of its cell.
+        """
+        handler = self._actions.get(action["action"])
+        if handler is not None:
+            handler(agent, action)
+        return self.grid.get_cell_list_contents(agent.pos)
+
+    def _do_move(self, agent, action):
+        agent.distance += 1
+        if "target" in action:
+            # Move agent directly to target position if provided
+            target_pos = action["target"]
+            if self.zones.zone_at(target_pos) in agent.allowed_zones:
+                self.grid.move_agent(agent, target_pos)
+        else:
+            agent.move()
+
+    def _do_move_east(self, agent, action):
+        x, y = agent.pos
+        new_pos = (x + 1, y)
+        if new_pos[0] < self.width:
+            if self.zones.zone_at(new_pos) in agent.allowed_zones:
+                agent.distance += 1
+                self.grid.move_agent(agent, new_pos)
 
+    def _do_move_vertical(self, agent, action):
+        x, y = agent.pos
+        possible_positions = []
+        if y - 1 >= 0:
+            possible_positions.append((x, y - 1))
+        if y + 1 < self.height:
+            possible_positions.append((x, y + 1))
+        for new_pos in possible_positions:
+            if self.grid.is_free_for_drop(new_pos) and not self.grid.has_robot(new_pos):
+                agent.distance += 1
+                self.grid.move_agent(agent, new_pos)
+                break
+
+    def _do_move_to(self, agent, action):
+        #Case voisine choisie par seek_move ou par le Router, dans une zone praticable pour le robot
+        agent.distance += 1
+        self.grid.move_agent(agent, action["target"])
+
+    def _do_pickup(self, agent, action):
+        current_cell = self.grid.get_cell_list_contents(agent.pos)
+        for obj in current_cell:
+            if hasattr(obj, "waste_type") and obj.waste_type == action["waste"]:
+                agent.inventory.append(obj.waste_type)
+                self.grid.remove_agent(obj)
+                self.waste_on_grid[obj.waste_type] -= 1
+                self.waste_in_inventories += 1
+                break
+
+    def _do_transform(self, agent, action):
+        # 2 green -> 1 yellow
+        if action["from"] == "green" and action["to"] == "yellow":
+            green_waste = [w for w in agent.inventory if w == "green"]
+            if len(green_waste) >= 2:
+                for _ in range(2):
+                    agent.inventory.remove("green")
+                agent.inventory.append("yellow")
+                self.waste_in_inventories -= 1
+                agent.hasTransformed = True # Empeche de recolter d'autres dechets
+
+        # 2 yellow -> 1 red
+        elif action["from"] == "yellow" and action["to"] == "red":
+            yellow_waste = [w for w in agent.inventory if w == "yellow"]
+            if len(yellow_waste) >= 2:
+                for _ in range(2):
+                    agent.inventory.remove("yellow")
+                agent.inventory.append("red")
+                self.waste_in_inventories -= 1
+                agent.hasTransformed = True
+
+    def _do_drop(self, agent, action):
+        if not self.grid.is_free_for_drop(agent.pos):
+            return
+
+        #si dépot dans zone de déchets
+        if self.zones.is_disposal(agent.pos):
+            agent.inventory.remove(action["waste"])
+            self.waste_in_inventories -= 1
+            if hasattr(agent, "target_waste"):
+                agent.target_waste = None
+                if hasattr(agent, "_last_notified_target"):
+                    agent._last_notified_target = None
+        else:
+            waste = Waste(self, action["waste"])
+            waste.unique_id = self.next_waste_id if hasattr(self, "next_waste_id") else 1000 # Assigner un ID unique au déchet
+            self.next_waste_id = waste.unique_id + 1 if hasattr(self, "next_waste_id") else 1001
+
+            # Marquer ce déchet comme "à ignorer" par l'agent qui l'a déposé
+            agent.last_dropped_waste_id = waste.unique_id
+
+            self.grid.place_agent(waste, agent.pos)
+            agent.inventory.remove(action["waste"])
+            self.waste_on_grid[waste.waste_type] += 1
+            self.waste_in_inventories -= 1
+
+            self.notify_waste_drop(agent, action["waste"], agent.pos)
+
+        agent.hasTransformed = False
+
+    def _destination(self, agent, action):
+        #Case d'arrivée d'un déplacement explicite (cible ou est), None sinon
+        if action["action"] == "move_to":
+            return action["target"]
+        if action["action"] == "move" and "target" in action:
+            if self.zones.zone_at(action["target"]) in agent.allowed_zones:
+                return action["target"]
         elif action["action"] == "move_east":
             x, y = agent.pos
-            new_pos = (x + 1, y)
-            if new_pos[0] < self.width:
-                cell_contents = self.grid.get_cell_list_contents(new_pos)
-                zone = None
-                for obj in cell_contents:
-                    if hasattr(obj, "zone") and obj.__class__.__name__ == "Radioactivity":
-                        zone = obj.zone
-                        break
-                if zone in agent.allowed_zones:
-                    agent.distance += 1
-                    self.grid.move_agent(agent, new_pos)
-
-        elif action["action"] == "move_vertical":
-            x, y = agent.pos
-            possible_positions = []
-            if y - 1 >= 0:
-                possible_positions.append((x, y - 1))
-            if y + 1 < self.height:
-                possible_positions.append((x, y + 1))
-            for new_pos in possible_positions:
-                cell_contents = self.grid.get_cell_list_contents(new_pos)
-                if not any(hasattr(obj, "waste_type") for obj in cell_contents) and not any(isinstance(obj, RobotAgent) for obj in cell_contents):
-                    agent.distance += 1
-                    self.grid.move_agent(agent, new_pos)
-                    break
-
-        elif action["action"] == "pickup":
-            current_cell = self.grid.get_cell_list_contents(agent.pos)
-            for obj in current_cell:
-                if hasattr(obj, "waste_type") and obj.waste_type == action["waste"]:
-                    agent.inventory.append(obj.waste_type)
-                    self.grid.remove_agent(obj)
-                    break
-
-        elif action["action"] == "transform":
-            # 2 green -> 1 yellow
-            if action["from"] == "green" and action["to"] == "yellow":
-                green_waste = [w for w in agent.inventory if w == "green"]
-                if len(green_waste) >= 2:
-                    for _ in range(2):
-                        agent.inventory.remove("green")
-                    agent.inventory.append("yellow")
-                    agent.hasTransformed = True # Empeche de recolter d'autres dechets
-
-            # 2 yellow -> 1 red
-            elif action["from"] == "yellow" and action["to"] == "red":
-                yellow_waste = [w for w in agent.inventory if w == "yellow"]
-                if len(yellow_waste) >= 2:
-                    for _ in range(2):
-                        agent.inventory.remove("yellow")
-                    agent.inventory.append("red")
-                    agent.hasTransformed = True
-
-        elif action["action"] == "drop":
-            cell_contents = self.grid.get_cell_list_contents(agent.pos)
-            if any(hasattr(obj, "waste_type") for obj in cell_contents):
-                return cell_contents
-            
-            #si dépot dans zone de déchets
-            if any(hasattr(obj, "zone") and obj.zone == "waste_zone" for obj in cell_contents):
-                agent.inventory.remove(action["waste"])
-                if hasattr(agent, "target_waste"):
-                    agent.target_waste = None
-                    if hasattr(agent, "_last_notified_target"):
-                        agent._last_notified_target = None
-            else:
-                waste = Waste(self, action["waste"])
-                waste.unique_id = self.next_waste_id if hasattr(self, "next_waste_id") else 1000 # Assigner un ID unique au déchet
-                self.next_waste_id = waste.unique_id + 1 if hasattr(self, "next_waste_id") else 1001
-                
-                # Marquer ce déchet comme "à ignorer" par l'agent qui l'a déposé
-                agent.last_dropped_waste_id = waste.unique_id
-                
-                self.grid.place_agent(waste, agent.pos)
-                agent.inventory.remove(action["waste"])
-
-                self.notify_waste_drop(agent, action["waste"], agent.pos)
-            
-            agent.hasTransformed = False
+            if x + 1 < self.width and self.zones.zone_at((x + 1, y)) in agent.allowed_zones:
+                return (x + 1, y)
+        return None
 
-        return self.grid.get_cell_list_contents(agent.pos)
+    def close(self):
+        """ Shut down the deliberation pool (deliberation_workers), waiting for its threads: the next
+        steps deliberate without pool. Does nothing for a model without pool.
+        """
+        if self._deliberation_pool is not None:
+            self._deliberation_pool.shutdown(wait=True)
+            self._deliberation_pool = None
+
+    def _deliberation_chunks(self):
+        #Robots regroupés par zone d'origine puis par bande horizontale, un bloc par worker
+        ordered = sorted(self.robots, key=lambda r: (WASTE_TYPES.index(r.type), r.pos[1], r.unique_id))
+        size = -(-len(ordered) // self.deliberation_workers)
+        return [ordered[i:i + size] for i in range(0, len(ordered), size)]
+
+    def decide_all(self):
+        """ First phase of a two_phase step: return the (robot, action) decisions of every robot.
+        With deliberation_workers, the robots deliberate on a thread pool, by chunks of the same zone
+        and horizontal stripe. Their messages are buffered and sent in robot order once every robot
+        has decided, so the result is the same as without workers.
+        """
+        if self._deliberation_pool is None:
+            return [(robot, robot.decide()) for robot in self.robots]
+        self.message_service.start_buffering()
+        try:
+            actions = {}
+            futures = [self._deliberation_pool.submit(_decide_chunk, chunk) for chunk in self._deliberation_chunks()]
+            for future in futures:
+                actions.update(future.result())
+        finally:
+            self.message_service.flush_outboxes([robot.get_name() for robot in self.robots])
+        return [(robot, actions[robot.unique_id]) for robot in self.robots]
 
+    def apply_actions(self, decisions):
+        """ Second phase of a two_phase step: apply the (robot, action) decisions taken on the same state.
+        Actions are applied by kind (in place, move to a known cell, move computed by the robot), then by
+        unique_id, so that a waste or a drop cell wanted by several robots goes to the lowest unique_id.
+        A known cell (target, east) is entered by at most one robot per step, the others stay in place.
+        Moves computed by the robot (move, move_vertical) see the cells occupied at the beginning of
+        the step as still occupied, as well as the cells entered during this step.
+        """
+        claimed = set()
+        self.grid.freeze_robots()
+        try:
+            for robot, action in sorted(decisions, key=lambda d: (_action_phase(d[1]), d[0].unique_id)):
+                destination = self._destination(robot, action)
+                if destination is not None:
+                    if destination in claimed:
+                        continue
+                    claimed.add(destination)
+                robot.knowledge["last_percepts"] = self.do(robot, action)
+        finally:
+            self.grid.unfreeze_robots()
 
     def notify_waste_drop(self, sender_agent, waste_type, position):
         if waste_type == "red" and sender_agent.type == "yellow":
             target_type = "red"
             
-            content = {
-                "waste_pos": position,
-                "waste_type": waste_type,
-                "drop_time": self.step_count
-            }
+            content = WasteNotification(position, WasteType(waste_type), self.step_count)
             
-            for agent in self.robots:
-                if hasattr(agent, 'type') and agent.type == target_type:
-                    try:
-                        # Have the sender agent send the message directly
-                        message = Message(
-                            sender_agent.get_name(),
-                            agent.get_name(),
-                            MessagePerformative.REQUEST,
-                            content
-                        )
-                        sender_agent.send_message(message)
-                        print(f"[NOTIFY] Agent {sender_agent.get_name()} notified {agent.get_name()} about {waste_type} waste at {position}")
-                    except Exception as e:
-                        print(f"Error sending message: {e}")
+            try:
+                # Un seul message, distribué aux robots rouges abonnés aux dépôts proches de position
+                sender_agent.publish_message(MessagePerformative.REQUEST, f"drop/{target_type}", content, position)
+                messaging_log.info("[NOTIFY] Agent %s notified %s robots about %s waste at %s", sender_agent.get_name(), target_type, waste_type, position)
+            except Exception as e:
+                messaging_log.error("Error sending message: %s", e)
 
-    def step(self):
-        # STOp si tous les déchets ont été éliminés (grille et inventaire)
-        no_waste_on_grid = all(not isinstance(a, Waste) for a in self.grid.agents)
-        no_waste_in_inventory = all(len(robot.inventory) == 0 for robot in self.robots)
+    def finish_if_clean(self):
+        """ Stop the simulation if every waste has been disposed of (none on the grid nor in an
+        inventory), collecting the data of the step where it happened. Return True if stopped.
+        """
+        no_waste_on_grid = not any(self.waste_on_grid.values())
+        no_waste_in_inventory = self.waste_in_inventories == 0
         
         if no_waste_on_grid and no_waste_in_inventory:
             if self.deposition_step is None:  
                 self.deposition_step = self.step_count  
-                print(f"Tous les déchets ont été définitivement éliminés à l'étape {self.deposition_step}")
+                lifecycle_log.info("Tous les déchets ont été définitivement éliminés à l'étape %s", self.deposition_step)
                 self.datacollector.collect(self)
             self.running = False  #Stop la simulation       
+            return True
+        return False
+
+    def step(self):
+        # STOp si tous les déchets ont été éliminés (grille et inventaire)
+        if self.finish_if_clean():
             return  
 
         #Distribution des messages entre les agents
         self.message_service.dispatch_messages()
     
-        for robot in self.robots:        
-            robot.step()
+        if self.step_mode == "two_phase":
+            self.apply_actions(self.decide_all())
+        else:
+            for robot in self.robots:        
+                robot.step()
 
         # Increment step counter and collect data
         self.step_count += 1
         self.datacollector.collect(self)
-        print(f"Step {self.step_count} completed")
\ No newline at end of file
+        lifecycle_log.debug("Step %s completed", self.step_count)
\ No newline at end of file
@@ -9,25 +9,24 @@ Groupe 21
 @date 11/03/2025
 '''
 
-import random
+from enum import Enum
+
 import mesa
 
-class Radioactivity(mesa.Agent):
-    def __init__(self, model, zone):
-        super().__init__(model)
-        self.zone = zone
-        if zone == 'z1':
-            self.radioactivity_level = random.uniform(0, 0.33)
-        elif zone == 'z2':
-            self.radioactivity_level = random.uniform(0.33, 0.66)
-        else:  # zone == 'z3'
-            self.radioactivity_level = random.uniform(0.66, 1)
-
-class WasteDisposal(mesa.Agent):
-    def __init__(self, model):
-        super().__init__(model)
-        self.radioactivity_level = 1.0 
-        self.zone = 'waste_zone'  
+WASTE_TYPES = ("green", "yellow", "red")
+
+
+class WasteType(str, Enum):
+    """WasteType class.
+    Type of a waste. A WasteType is equal to its name ("green", "yellow" or "red"), so it can be
+    compared with the waste_type of a Waste.
+    """
+    GREEN = "green"
+    YELLOW = "yellow"
+    RED = "red"
+
+    def __str__(self):
+        return self.value
 
 class Waste(mesa.Agent):
     """Agent representing waste objects"""
@@ -0,0 +1,154 @@
+'''
+@authors
+Rayane Bouaita
+Gabriel Trier
+Pierre El Anati
+
+Groupe 21
+
+@date 11/03/2025
+'''
+
+import math
+import threading
+from collections import defaultdict
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+#Phases d'un step, dans l'ordre d'exécution
+PHASES = ("dispatch_messages", "process_messages", "get_percepts", "deliberate", "do")
+
+#Reporters du DataCollector : durée (ms) de chaque phase pendant le step
+REPORTERS = {
+    "DispatchTime": "dispatch_messages",
+    "ProcessMessagesTime": "process_messages",
+    "PerceptsTime": "get_percepts",
+    "DeliberateTime": "deliberate",
+    "DoTime": "do",
+}
+
+#Histogramme des durées : classes logarithmiques de 100 ns à 100 s, 20 par décade (percentiles à ~6 % près)
+HISTOGRAM_MIN = 1e-7
+BINS_PER_DECADE = 20
+HISTOGRAM_BINS = 9 * BINS_PER_DECADE
+
+
+class Timing:
+    """Timing class.
+    Summary of the durations of the calls of one (phase, robot class, action), in constant memory:
+    number of calls, total, maximum and a histogram with logarithmic bins for the percentiles.
+
+    attr:
+        count: number of calls (int)
+        total: cumulative duration (s) (float)
+        max: longest duration (s) (float)
+        bins: number of calls in each bin of the histogram, see HISTOGRAM_MIN (numpy array)
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.bins = np.zeros(HISTOGRAM_BINS, dtype=np.int64)
+
+    def add(self, elapsed):
+        """ Count a call of the given duration (s).
+        """
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+        i = int(math.log10(elapsed / HISTOGRAM_MIN) * BINS_PER_DECADE) if elapsed > HISTOGRAM_MIN else 0
+        self.bins[min(i, HISTOGRAM_BINS - 1)] += 1
+
+    def percentiles(self, qs):
+        """ Return the estimated durations (s) at the given percentiles: geometric centre of the bin
+        holding the percentile, at most the longest duration.
+        """
+        ranks = np.cumsum(self.bins)
+        i = np.searchsorted(ranks, np.asarray(qs) / 100 * self.count)
+        centres = HISTOGRAM_MIN * 10 ** ((np.minimum(i, HISTOGRAM_BINS - 1) + 0.5) / BINS_PER_DECADE)
+        return np.minimum(centres, self.max)
+
+
+class StepProfiler:
+    """StepProfiler class.
+    Opt-in instrumentation of RobotModel.step. The timed methods (model.step,
+    message_service.dispatch_messages, model.do and the process_messages, get_percepts and
+    deliberate methods of each robot) are wrapped on the instances only: a model created without
+    profiler runs the original code, with no overhead.
+
+    attr:
+        timings: the durations of the calls of each (phase, robot class, action) (dict of Timing)
+        last_step: the total duration (s) of each phase during the current or last step (dict)
+    """
+
+    def __init__(self, model):
+        """ Create a new profiler and instrument the given model and its robots.
+        """
+        self.timings = defaultdict(Timing)
+        self.last_step = dict.fromkeys(PHASES, 0.0)
+        #Les robots peuvent délibérer sur plusieurs threads (deliberation_workers)
+        self._lock = threading.Lock()
+
+        self._wrap(model, "step", "step", lambda args: ("RobotModel", None))
+        self._wrap(model.message_service, "dispatch_messages", "dispatch_messages",
+                   lambda args: ("MessageService", None))
+        self._wrap(model, "do", "do", lambda args: (type(args[0]).__name__, args[1]["action"]))
+        for robot in model.robots:
+            robot_class = type(robot).__name__
+            for phase in ("process_messages", "get_percepts", "deliberate"):
+                self._wrap(robot, phase, phase, lambda args, name=robot_class: (name, None))
+
+    def _wrap(self, obj, name, phase, describe):
+        method = getattr(obj, name)
+        timings, last_step, lock = self.timings, self.last_step, self._lock
+
+        def timed(*args, **kwargs):
+            if phase == "step":
+                for key in last_step:
+                    last_step[key] = 0.0
+            start = perf_counter()
+            result = method(*args, **kwargs)
+            elapsed = perf_counter() - start
+            with lock:
+                timings[(phase,) + describe(args)].add(elapsed)
+                if phase in last_step:
+                    last_step[phase] += elapsed
+            return result
+
+        setattr(obj, name, timed)
+
+    def reporters(self):
+        """ Return the model reporters giving the duration (ms) of each phase during the step.
+        """
+        return {name: (lambda m, phase=phase: self.last_step[phase] * 1e3) for name, phase in REPORTERS.items()}
+
+    def report(self):
+        """ Return a DataFrame with the number of calls and the cumulative, mean, maximum and percentile
+        durations (ms) of each (phase, robot class, action), sorted by cumulative duration. The
+        percentiles are read from the histograms of the Timing objects.
+        """
+        step = self.timings.get(("step", "RobotModel", None))
+        step_total = step.total if step is not None else 0.0
+        rows = []
+        for (phase, agent_class, action), timing in list(self.timings.items()):
+            p50, p90, p99 = timing.percentiles([50, 90, 99]) * 1e3
+            rows.append({
+                "phase": phase,
+                "agent_class": agent_class,
+                "action": action or "",
+                "count": timing.count,
+                "total_ms": timing.total * 1e3,
+                "mean_ms": timing.total / timing.count * 1e3,
+                "p50_ms": p50,
+                "p90_ms": p90,
+                "p99_ms": p99,
+                "max_ms": timing.max * 1e3,
+                "share": timing.total / step_total if step_total else np.nan,
+            })
+        columns = ["phase", "agent_class", "action", "count", "total_ms", "mean_ms",
+                   "p50_ms", "p90_ms", "p99_ms", "max_ms", "share"]
+        return pd.DataFrame(rows, columns=columns).sort_values("total_ms", ascending=False, ignore_index=True)
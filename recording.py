@@ -0,0 +1,93 @@
+'''
+@authors
+Rayane Bouaita
+Gabriel Trier
+Pierre El Anati
+
+Groupe 21
+
+@date 11/03/2025
+'''
+
+import numpy as np
+
+import checkpoint
+from objects import WASTE_TYPES
+
+TRACE_VERSION = 1
+
+#Codes des actions dans la trace (indice dans ACTIONS, -1 pour une action inconnue de RobotModel.do)
+ACTIONS = ("move", "move_east", "move_vertical", "move_to", "pickup", "transform", "drop")
+
+#Colonnes du DataCollector qui dépendent des messages : enregistrées telles quelles, non recalculées au replay
+RECORDED_COLUMNS = ("MailboxSize", "MailboxEvicted")
+
+#Colonnes de la trace, une valeur par appel à do
+TRACE_COLUMNS = {
+    "tick": np.int32,
+    "robot": np.int32,
+    "code": np.int8,
+    "x": np.int32,
+    "y": np.int32,
+    "waste": np.int8,
+    "distance": np.int16,
+}
+
+
+class ActionRecorder:
+    """ActionRecorder class.
+    Opt-in recording of the actions applied by RobotModel.do, to replay a run without its agents
+    (replay.ReplayModel). The do method is wrapped on the model instance only: a model created
+    without recorder runs the original code.
+
+    For each action, the trace keeps the step, the unique_id of the robot, the action code, the
+    position of the robot after the action (the cell reached by a move, whichever way the robot chose
+    it), the waste type (picked up, dropped, or transformed from) and the distance it added. The state
+    of the model when the recording starts is taken with checkpoint.snapshot.
+
+    attr:
+        layout: the arrays of the model state when the recording started (dict)
+        columns: the values of each trace column, see TRACE_COLUMNS (dict of lists)
+    """
+
+    def __init__(self, model):
+        """ Take the layout of the model and start recording the actions it applies.
+        """
+        self.model = model
+        self.layout = checkpoint.snapshot(model)
+        self.columns = {name: [] for name in TRACE_COLUMNS}
+        self._start_row = len(model.datacollector.model_vars["Step"])
+        self._codes = {action: i for i, action in enumerate(ACTIONS)}
+
+        do = model.do
+        columns = self.columns
+
+        def recorded(agent, action):
+            distance = agent.distance
+            cell = do(agent, action)
+            waste = action.get("waste", action.get("from"))
+            columns["tick"].append(model.step_count)
+            columns["robot"].append(agent.unique_id)
+            columns["code"].append(self._codes.get(action["action"], -1))
+            columns["x"].append(agent.pos[0])
+            columns["y"].append(agent.pos[1])
+            columns["waste"].append(WASTE_TYPES.index(waste) if waste is not None else -1)
+            columns["distance"].append(agent.distance - distance)
+            return cell
+
+        model.do = recorded
+
+    def save(self, path):
+        """ Write the layout, the trace columns and the recorded DataCollector columns (see
+        RECORDED_COLUMNS) to path, as a compressed npz archive.
+        """
+        model_vars = self.model.datacollector.model_vars
+        arrays = dict(self.layout)
+        arrays["trace/version"] = np.array(TRACE_VERSION)
+        arrays["trace/rows"] = np.array(len(model_vars["Step"]) - self._start_row)
+        for name, dtype in TRACE_COLUMNS.items():
+            arrays[f"trace/{name}"] = np.array(self.columns[name], dtype=dtype)
+        for name in RECORDED_COLUMNS:
+            arrays[f"trace/column/{name}"] = np.array(model_vars[name][self._start_row:], dtype=np.int64)
+        with open(path, "wb") as f:
+            np.savez_compressed(f, **arrays)
@@ -0,0 +1,95 @@
+'''
+@authors
+Rayane Bouaita
+Gabriel Trier
+Pierre El Anati
+
+Groupe 21
+
+@date 11/03/2025
+'''
+
+import checkpoint
+from model import RobotModel
+from objects import WASTE_TYPES
+from recording import ACTIONS, RECORDED_COLUMNS, TRACE_COLUMNS, TRACE_VERSION
+
+
+class ReplayModel(RobotModel):
+    """ReplayModel class.
+    RobotModel replaying a trace saved by RobotModel.save_trace: each step applies the actions
+    recorded for that step, without any perception, deliberation or message, and collects the same
+    DataCollector rows as the recorded run (the columns depending on the messages, RECORDED_COLUMNS,
+    are read from the trace). The replay stops where the recording stopped.
+
+    Create it with ReplayModel.from_trace(path).
+    """
+
+    @classmethod
+    def from_trace(cls, path):
+        """ Return a model in the layout of the trace saved to path, ready to replay it.
+        """
+        data = checkpoint.read(path)
+        if "trace/version" not in data:
+            raise ValueError(f"{path} ne contient pas de trace d'actions.")
+        if int(data["trace/version"]) != TRACE_VERSION:
+            raise ValueError(f"Version de trace non prise en charge : {int(data['trace/version'])} "
+                             f"(attendue : {TRACE_VERSION}).")
+        #Ni profilage, ni routage, ni pool de délibération : aucun robot ne délibère pendant le replay
+        model = checkpoint.restore(cls, data, profile=False, routing=False, deliberation_workers=None)
+        model._load_trace(data)
+        return model
+
+    def _load_trace(self, data):
+        self._trace = [data[f"trace/{name}"].tolist() for name in TRACE_COLUMNS]
+        self._cursor = 0
+        self._rows = int(data["trace/rows"])
+        self._row = 0
+        self._robots_by_id = {robot.unique_id: robot for robot in self.robots}
+        recorded = {name: data[f"trace/column/{name}"].tolist() for name in RECORDED_COLUMNS}
+        for name in RECORDED_COLUMNS:
+            self.datacollector.model_reporters[name] = lambda m, name=name: recorded[name][m._row]
+
+        #Numéro de la ligne en cours de collecte, lu par les reporters des colonnes enregistrées
+        collect = self.datacollector.collect
+
+        def counted(model):
+            collect(model)
+            self._row += 1
+
+        self.datacollector.collect = counted
+
+    def notify_waste_drop(self, sender_agent, waste_type, position):
+        """ No message is sent during a replay.
+        """
+        return
+
+    def _replay(self, robot, code, x, y, waste, distance):
+        action = ACTIONS[code] if code >= 0 else None
+        if action == "pickup":
+            self._do_pickup(robot, {"action": action, "waste": WASTE_TYPES[waste]})
+        elif action == "transform":
+            self._do_transform(robot, {"action": action, "from": WASTE_TYPES[waste], "to": WASTE_TYPES[waste + 1]})
+        elif action == "drop":
+            self._do_drop(robot, {"action": action, "waste": WASTE_TYPES[waste]})
+        elif robot.pos != (x, y):
+            self.grid.relocate_robot(robot, (x, y))
+        if distance:
+            robot.distance += distance
+
+    def step(self):
+        if self._row >= self._rows:
+            self.running = False
+            return
+        if self.finish_if_clean():
+            return
+
+        ticks, robots, codes, xs, ys, wastes, distances = self._trace
+        i = self._cursor
+        while i < len(ticks) and ticks[i] == self.step_count:
+            self._replay(self._robots_by_id[robots[i]], codes[i], xs[i], ys[i], wastes[i], distances[i])
+            i += 1
+        self._cursor = i
+
+        self.step_count += 1
+        self.datacollector.collect(self)
@@ -0,0 +1,168 @@
+'''
+@authors
+Rayane Bouaita
+Gabriel Trier
+Pierre El Anati
+
+Groupe 21
+
+@date 11/03/2025
+'''
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from environment import ZONES
+
+#Voisinage de von Neumann, dans l'ordre de préférence en cas d'égalité
+NEIGHBOR_OFFSETS = ((1, 0), (0, -1), (0, 1), (-1, 0))
+
+
+class Router:
+    """Router class.
+    Shortest-path routing on the grid with cached BFS distance fields. A distance field gives, for
+    every cell of the allowed zones, the number of moves to the closest cell of a destination set
+    (handoff column, waste disposal column, targeted waste). The zones never change, so the fields
+    are computed once per (zones, destinations) and kept in a bounded cache.
+
+    The robots are not part of the fields: next_step avoids the occupied cells when it is queried.
+    When every cell closer to the destination is occupied, a detour field treating these cells as
+    obstacles is computed and cached, and dropped by the grid as soon as a robot enters or leaves
+    one of them (invalidate_cell).
+
+    attr:
+        grid: the grid of the model, with its zone layer (RobotGrid)
+        max_fields: the maximum number of distance fields kept in the cache (int)
+    """
+
+    def __init__(self, grid, max_fields=128):
+        """ Create a router for the given grid and register it for the occupancy changes.
+        """
+        self.grid = grid
+        self.max_fields = max_fields
+        self._fields = OrderedDict()
+        self._detours = {}
+        self._detours_by_cell = {}
+        self._masks = {}
+        #Les robots peuvent délibérer sur plusieurs threads (deliberation_workers) : caches modifiés sous verrou,
+        #les BFS sont calculés hors verrou
+        self._lock = threading.Lock()
+        grid.occupancy_listeners.append(self.invalidate_cell)
+
+    def _mask(self, zones):
+        #Cellules praticables : celles des zones autorisées (toute la grille si zones vaut None)
+        mask = self._masks.get(zones)
+        if mask is None:
+            if zones is None:
+                mask = np.ones((self.grid.width, self.grid.height), dtype=bool)
+            else:
+                mask = np.isin(self.grid.properties["zone"].data, [ZONES.index(z) for z in zones])
+            with self._lock:
+                mask = self._masks.setdefault(zones, mask)
+        return mask
+
+    def _bfs(self, destinations, mask):
+        #Propagation par fronts successifs : -1 pour les cellules inaccessibles
+        distance = np.full(mask.shape, -1, dtype=np.int32)
+        frontier = np.zeros(mask.shape, dtype=bool)
+        for pos in destinations:
+            if mask[pos]:
+                frontier[pos] = True
+        d = 0
+        while frontier.any():
+            distance[frontier] = d
+            reached = np.zeros_like(frontier)
+            reached[1:, :] |= frontier[:-1, :]
+            reached[:-1, :] |= frontier[1:, :]
+            reached[:, 1:] |= frontier[:, :-1]
+            reached[:, :-1] |= frontier[:, 1:]
+            frontier = reached & mask & (distance < 0)
+            d += 1
+        return distance
+
+    def distance_field(self, destinations, zones=None):
+        """ Return the distance field (numpy array, -1 where unreachable) to the given destination cells,
+        moving only through the given zones (tuple of zone names, the whole grid if None).
+        """
+        key = (zones, frozenset(destinations))
+        with self._lock:
+            field = self._fields.get(key)
+            if field is not None:
+                self._fields.move_to_end(key)
+                return field
+        field = self._bfs(key[1], self._mask(zones))
+        with self._lock:
+            #Un autre thread a pu calculer le même champ entre-temps : on garde le premier
+            field = self._fields.setdefault(key, field)
+            self._fields.move_to_end(key)
+            if len(self._fields) > self.max_fields:
+                self._fields.popitem(last=False)
+        return field
+
+    def _detour_field(self, destinations, zones, blocked):
+        key = (zones, frozenset(destinations), blocked)
+        with self._lock:
+            field = self._detours.get(key)
+        if field is None:
+            mask = self._mask(zones).copy()
+            for pos in blocked:
+                mask[pos] = False
+            field = self._bfs(key[1], mask)
+            with self._lock:
+                self._detours[key] = field
+                for pos in blocked:
+                    self._detours_by_cell.setdefault(pos, set()).add(key)
+        return field
+
+    def invalidate_cell(self, pos):
+        """ Drop the detour fields computed with the given cell as an obstacle (its occupancy changed).
+        """
+        with self._lock:
+            for key in self._detours_by_cell.pop(pos, ()):
+                self._detours.pop(key, None)
+                for other in key[2]:
+                    if other != pos:
+                        self._detours_by_cell.get(other, set()).discard(key)
+
+    def _neighbors(self, pos, field):
+        x, y = pos
+        width, height = field.shape
+        for dx, dy in NEIGHBOR_OFFSETS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height and field[nx, ny] >= 0:
+                yield (nx, ny)
+
+    def next_step(self, pos, destinations, avoid=None, zones=None, detour=True):
+        """ Return the neighbouring cell of pos on a shortest path to the closest destination, moving
+        only through the given zones, or None if pos is a destination or no step is possible.
+        avoid (a set of cells or a predicate such as grid.has_robot) gives the occupied cells, which are
+        avoided on the way but not at the destination: if every closer cell is occupied, the step
+        follows the shortest detour around them, or is None (wait) without detour.
+        """
+        field = self.distance_field(destinations, zones)
+        if field[pos] == 0:
+            return None
+        occupied = avoid if callable(avoid) else (avoid or ()).__contains__
+
+        def is_blocked(cell):
+            return field[cell] != 0 and occupied(cell)
+
+        #pos peut être hors des zones autorisées : on cherche alors la meilleure case voisine praticable
+        current = field[pos] if field[pos] >= 0 else np.iinfo(np.int32).max
+        closer = sorted((int(field[n]), n) for n in self._neighbors(pos, field) if field[n] < current)
+        for _, step in closer:
+            if not is_blocked(step):
+                return step
+        if not closer or not detour:
+            return None
+
+        blocked = frozenset(step for _, step in closer)
+        detour = self._detour_field(destinations, zones, blocked)
+        options = sorted((int(detour[n]), n) for n in self._neighbors(pos, detour) if not is_blocked(n))
+        return options[0][1] if options else None
+
+    def drop_cells(self, column):
+        """ Return the cells of the given column where a waste can be dropped (no waste in them).
+        """
+        return frozenset((column, int(y)) for y in np.flatnonzero(self.grid.waste_total[column] == 0))
@@ -20,6 +20,7 @@ RED_WASTE = 4
 N_GREEN = 1
 N_YELLOW = 1
 N_RED = 1
+SEED = 42
 
 model = RobotModel(
     width=GRID_WIDTH,
@@ -30,4 +31,6 @@ model = RobotModel(
     n_green=N_GREEN,
     n_yellow=N_YELLOW,
     n_red=N_RED,
+    stream_data=True,
+    seed=SEED,
 )
\ No newline at end of file
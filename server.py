@@ -9,12 +9,21 @@ Groupe 21
 @date 11/03/2025
 '''
 
+import numpy as np
+import pandas as pd
 import solara
 from matplotlib.figure import Figure
-from mesa.visualization import SolaraViz, make_plot_component, make_space_component
+from matplotlib.colors import ListedColormap
+from mesa.visualization import SolaraViz, make_plot_component
 from mesa.visualization.utils import update_counter
-from objects import Radioactivity, WasteDisposal, Waste
+from objects import Waste
+from collector import StreamingCollector, RollingCollector
 from agents import GreenRobot, YellowRobot, RedRobot
+import logs
+
+#Journalisation réglée une fois pour le processus, avant la création du modèle : toutes les traces dans le tableau de bord
+logs.configure(quiet=False)
+
 from run import model
 
 def agent_portrayal(agent):
@@ -37,73 +46,233 @@ def agent_portrayal(agent):
         else:  # red waste
             portrayal["color"] = "red"
 
-    elif isinstance(agent, WasteDisposal):
-        portrayal["color"] = "black"
-        portrayal["marker"] = "s"
-        portrayal["size"] = 700
-        portrayal["zorder"] = 0
-    elif isinstance(agent, Radioactivity):
-        portrayal["marker"] = "s"
-        portrayal["zorder"] = 0
-        portrayal["size"] = 700
-        if agent.zone == "z1":
-            portrayal["color"] = "#B8C3F5"  
-        elif agent.zone == "z2":
-            portrayal["color"] = "#FFF9A3"  
-        else:  
-            portrayal["color"] = "#FFADAD"  
-            
     return portrayal
 
-#Composant Histogramme : Affiche l'évolution des étapes de la simulation
-@solara.component
-def StepHistogram(model):
-    update_counter.get()
-    fig = Figure()
-    ax = fig.subplots()
+#Fond de la grille : couleurs des zones et colonne de dépôt, lues dans les couches de l'environnement
+ZONE_COLORS = ListedColormap(["#B8C3F5", "#FFF9A3", "#FFADAD"])
 
-    # Récupérer les données du DataCollector
-    df = model.datacollector.get_model_vars_dataframe()
+class _Markers:
+    """_Markers class.
+    Scatter collection of the cells drawn with one style, with one slot per cell: a cell is added or
+    removed in O(1) (the last slot fills the removed one).
 
-    # Vérifier si des données existent avant d'afficher et d'ajouter une légende
-    if not df.empty:
-        ax.plot(df.index, df["Step"], label="Step Count", color="blue")
-        ax.legend()  # Only add legend if we have data
+    attr:
+        collection: the scatter collection (PathCollection)
+        slots: slot of each drawn cell (dict)
+        cells: the drawn cells, in slot order (list)
+    """
 
-    ax.set_xlabel("Itération")
-    ax.set_ylabel("Nombre d'étapes")
-    solara.FigureMatplotlib(fig)
+    def __init__(self, ax, marker, color, size, zorder):
+        self.collection = ax.scatter([], [], marker=marker, color=color, s=size, zorder=zorder)
+        self.slots = {}
+        self.cells = []
+        self._offsets = np.empty((16, 2))
 
-# Nouveau composant: Affiche le nombre de déchets par couleur
-@solara.component
-def WasteCountChart(model):
-    update_counter.get()
-    fig = Figure()
-    ax = fig.subplots()
+    def add(self, cell):
+        n = len(self.cells)
+        if n == len(self._offsets):
+            self._offsets = np.concatenate([self._offsets, np.empty_like(self._offsets)])
+        self._offsets[n] = cell
+        self.slots[cell] = n
+        self.cells.append(cell)
+
+    def remove(self, cell):
+        i = self.slots.pop(cell)
+        last = self.cells.pop()
+        if last != cell:
+            self._offsets[i] = self._offsets[len(self.cells)]
+            self.cells[i] = last
+            self.slots[last] = i
+
+    def update(self):
+        self.collection.set_offsets(self._offsets[:len(self.cells)])
+
+class LiveSpace:
+    """LiveSpace class.
+    Matplotlib view of the grid kept between two refreshes of the dashboard. The zones and the disposal
+    column are drawn once as an image. The agents are drawn with agent_portrayal, one scatter collection
+    per style: each refresh only portrays the agents of the cells listed by its own dirty cell set
+    (RobotGrid.track_dirty_cells), so its cost depends on the cells that changed, not on the size of
+    the grid.
+
+    attr:
+        figure: figure drawn by the component (Figure)
+        markers: collection of each style (marker, color, size, zorder) (dict)
+        styles: styles drawn in each non-empty cell (dict)
+        dirty: the cells changed since the last refresh, fed by the grid (DirtyCells)
+    """
+
+    def __init__(self, model):
+        """ Draw the background and every agent, and start tracking the dirty cells of the grid.
+        """
+        self.grid = model.grid
+        self.dirty = self.grid.track_dirty_cells()
+        width, height = self.grid.width, self.grid.height
+        self.figure = Figure()
+        self.ax = self.figure.subplots()
+        background = ZONE_COLORS(model.zones.zone.data.T)
+        background[model.zones.disposal.data.T] = (0, 0, 0, 1)
+        self.ax.imshow(background, origin="lower", extent=(-0.5, width - 0.5, -0.5, height - 0.5),
+                       interpolation="nearest", zorder=0)
+        self.ax.set_xlim(-0.5, width - 0.5)
+        self.ax.set_ylim(-0.5, height - 0.5)
+        self.default_size = (180 / max(width, height)) ** 2
+        self.markers = {}
+        self.styles = {}
+        occupied = np.argwhere((self.grid.robot_count > 0) | (self.grid.waste_total > 0))
+        self._redraw(map(tuple, occupied.tolist()))
+
+    def _style(self, agent):
+        portrayal = agent_portrayal(agent)
+        return (portrayal.get("marker", "o"), portrayal["color"], portrayal.get("size", self.default_size),
+                portrayal.get("zorder", 1))
+
+    def _redraw(self, cells):
+        changed = set()
+        for cell in cells:
+            old = self.styles.pop(cell, set())
+            new = {self._style(agent) for agent in self.grid.iter_cell_list_contents([cell])}
+            for style in old - new:
+                self.markers[style].remove(cell)
+                changed.add(style)
+            for style in new - old:
+                if style not in self.markers:
+                    self.markers[style] = _Markers(self.ax, *style)
+                self.markers[style].add(cell)
+                changed.add(style)
+            if new:
+                self.styles[cell] = new
+        for style in changed:
+            self.markers[style].update()
+
+    def refresh(self):
+        """ Redraw the cells whose content changed since the last refresh.
+        """
+        self._redraw(self.dirty.pop_all())
+
+#Lecture des colonnes du DataCollector sans construire de DataFrame (colonnes mappées avec stream_data,
+#moyennes par bloc pour l'historique ancien avec metrics_window) : abscisses (ligne) et valeurs
+def data_series(model, name):
+    collector = model.datacollector
+    if isinstance(collector, RollingCollector):
+        starts, widths, _, means, _ = collector.history(name)
+        return starts + (widths - 1) / 2, means
+    values = collector.column(name) if isinstance(collector, StreamingCollector) else collector.model_vars.get(name, [])
+    return range(len(values)), values
+
+#Valeurs d'une colonne à partir de la ligne start (StreamingCollector ou DataCollector de mesa)
+def data_since(model, name, start):
+    collector = model.datacollector
+    if isinstance(collector, StreamingCollector):
+        return collector.column(name, start)
+    return np.asarray(collector.model_vars.get(name, [])[start:], dtype=float)
+
+def data_latest(model, name, default=0):
+    collector = model.datacollector
+    if isinstance(collector, (StreamingCollector, RollingCollector)):
+        return collector.latest(name) if len(collector) else default
+    values = collector.model_vars.get(name)
+    return values[-1] if values else default
+
+#Nombre maximal de points gardés par courbe : au-delà, les courbes ne gardent plus qu'un point sur deux
+MAX_CHART_POINTS = 2000
 
-    # Récupérer les données du DataCollector
-    df = model.datacollector.get_model_vars_dataframe()
+class LiveChart:
+    """LiveChart class.
+    Matplotlib figure kept between two refreshes of the dashboard, with one line per DataCollector
+    column. Each refresh only reads the rows collected since the previous one and appends them to the
+    lines, which keep at most MAX_CHART_POINTS points (one row every stride rows, the last row always
+    drawn): the cost of a refresh does not depend on the length of the run. With metrics_window, the
+    lines show the history of the RollingCollector, whose size is already bounded.
 
-    # Vérifier si des données existent avant d'afficher
-    if not df.empty and all(col in df.columns for col in ["GreenWasteCount", "YellowWasteCount", "RedWasteCount"]):
-        ax.plot(df.index, df["GreenWasteCount"], label="Déchets verts", color="blue")
-        ax.plot(df.index, df["YellowWasteCount"], label="Déchets jaunes", color="gold")
-        ax.plot(df.index, df["RedWasteCount"], label="Déchets rouges", color="red")
-        ax.legend()
+    attr:
+        figure: figure drawn by the component (Figure)
+        rows: number of rows already read (int)
+        stride: rows between two kept points (int)
+    """
 
-    ax.set_xlabel("Itération")
-    ax.set_ylabel("Nombre de déchets")
-    ax.set_title("Évolution du nombre de déchets par couleur")
-    solara.FigureMatplotlib(fig)
+    def __init__(self, model, series, xlabel, ylabel, title=None):
+        """ Create the figure, with one empty line per (column, label, color) of series.
+        """
+        self.model = model
+        self.names = [name for name, _, _ in series]
+        self.figure = Figure()
+        self.ax = self.figure.subplots()
+        self.lines = [self.ax.plot([], [], label=label, color=color)[0] for _, label, color in series]
+        self.ax.set_xlabel(xlabel)
+        self.ax.set_ylabel(ylabel)
+        if title:
+            self.ax.set_title(title)
+        self.rows = 0
+        self.stride = 1
+        self._count = 0
+        self._x = np.empty(MAX_CHART_POINTS)
+        self._y = np.empty((len(self.names), MAX_CHART_POINTS))
+
+    def refresh(self):
+        """ Append the rows collected since the last refresh to the lines.
+        """
+        if isinstance(self.model.datacollector, RollingCollector):
+            for line, name in zip(self.lines, self.names):
+                line.set_data(*data_series(self.model, name))
+        else:
+            new = [data_since(self.model, name, self.rows) for name in self.names]
+            if not len(new[0]):
+                return
+            x = np.arange(self.rows, self.rows + len(new[0]))
+            y = np.array(new, dtype=float)
+            self.rows += len(x)
+            last_row, last_values = x[-1], y[:, -1]
+            keep = x % self.stride == 0
+            x, y = x[keep], y[:, keep]
+            #Courbes pleines : un point sur deux, les points gardés restent les multiples de stride
+            while self._count + len(x) > MAX_CHART_POINTS:
+                self.stride *= 2
+                n = (self._count + 1) // 2
+                self._x[:n] = self._x[:self._count:2]
+                self._y[:, :n] = self._y[:, :self._count:2]
+                self._count = n
+                keep = x % self.stride == 0
+                x, y = x[keep], y[:, keep]
+            self._x[self._count:self._count + len(x)] = x
+            self._y[:, self._count:self._count + len(x)] = y
+            self._count += len(x)
+            for line, y, last in zip(self.lines, self._y, last_values):
+                line.set_data(np.append(self._x[:self._count], last_row), np.append(y[:self._count], last))
+        if self.ax.get_legend() is None:
+            self.ax.legend()
+        self.ax.relim()
+        self.ax.autoscale_view()
+
+#Composant Histogramme : Affiche l'évolution des étapes de la simulation
+@solara.component
+def StepHistogram(model):
+    counter = update_counter.get()
+    #Figure et courbes gardées tant que le modèle est le même, complétées à chaque rafraîchissement
+    chart = solara.use_memo(lambda: LiveChart(model, [("Step", "Step Count", "blue")],
+                                              "Itération", "Nombre d'étapes"), dependencies=[model])
+    chart.refresh()
+    solara.FigureMatplotlib(chart.figure, dependencies=[model, counter])
+
+# Nouveau composant: Affiche le nombre de déchets par couleur
+@solara.component
+def WasteCountChart(model):
+    counter = update_counter.get()
+    chart = solara.use_memo(lambda: LiveChart(model, [("GreenWasteCount", "Déchets verts", "blue"),
+                                                      ("YellowWasteCount", "Déchets jaunes", "gold"),
+                                                      ("RedWasteCount", "Déchets rouges", "red")],
+                                              "Itération", "Nombre de déchets",
+                                              "Évolution du nombre de déchets par couleur"), dependencies=[model])
+    chart.refresh()
+    solara.FigureMatplotlib(chart.figure, dependencies=[model, counter])
 
 @solara.component
 def Metrics_Text(model):
     update_counter.get()
-    df = model.datacollector.get_model_vars_dataframe()
-    green_distance = df["GreenDistance"].iloc[-1] if not df.empty else 0
-    yellow_distance = df["YellowDistance"].iloc[-1] if not df.empty else 0
-    red_distance = df["RedDistance"].iloc[-1] if not df.empty else 0
-    nbr_steps_to_clean = df["RedDepositionStep"].iloc[-1] if not df.empty else 0
+    green_distance = data_latest(model, "GreenDistance")
+    yellow_distance = data_latest(model, "YellowDistance")
+    red_distance = data_latest(model, "RedDistance")
+    nbr_steps_to_clean = data_latest(model, "RedDepositionStep")
     solara.Markdown(f"""
     ### Métriques de la simulation
     **Distances parcourues (cumul) :**  
@@ -114,10 +283,48 @@ def Metrics_Text(model):
     **Nombre d'étapes avant nettoyage complet :**
     {nbr_steps_to_clean}""")
 
+# Profilage des phases du step (modèle créé avec profile=True)
+@solara.component
+def ProfileTable(model):
+    update_counter.get()
+    if model.profiler is None:
+        solara.Markdown("Profilage désactivé (option *Profile*).")
+        return
+    report = model.profile_report()
+    lines = ["| Phase | Classe | Action | Appels | Total (ms) | p50 (ms) | p99 (ms) | Part |",
+             "|---|---|---|---|---|---|---|---|"]
+    for row in report.head(15).itertuples():
+        share = f"{row.share:.1%}" if pd.notna(row.share) else "-"
+        lines.append(f"| {row.phase} | {row.agent_class} | {row.action} | {row.count} | "
+                     f"{row.total_ms:.2f} | {row.p50_ms:.3f} | {row.p99_ms:.3f} | {share} |")
+    solara.Markdown("### Profil du step\n" + "\n".join(lines))
+
 # Paramètres de simulation interactifs
 model_params = {
     "width": 15,
     "height": 9,
+    "stream_data": True,
+    "step_mode": {
+        "type": "Select",
+        "label": "Step mode",
+        "value": "sequential",
+        "values": ["sequential", "two_phase"],
+    },
+    "seek_nearest": {
+        "type": "Checkbox",
+        "label": "Seek nearest waste",
+        "value": False,
+    },
+    "routing": {
+        "type": "Checkbox",
+        "label": "Shortest-path routing",
+        "value": False,
+    },
+    "profile": {
+        "type": "Checkbox",
+        "label": "Profile",
+        "value": False,
+    },
     "green_waste": {
         "type": "SliderInt",
         "label": "Green Waste:",
@@ -160,18 +367,33 @@ model_params = {
         "max": 4,
         "step": 1,
     },
+    "seed": {
+        "type": "SliderInt",
+        "label": "Seed",
+        "value": 42,
+        "min": 0,
+        "max": 1000,
+        "step": 1,
+    },
 }
 
 
 # Création des composants d'affichage
-SpaceGraph = make_space_component(agent_portrayal)
+#Vue de la grille : fond dessiné une fois, seules les cellules modifiées sont redessinées
+@solara.component
+def SpaceView(model):
+    counter = update_counter.get()
+    view = solara.use_memo(lambda: LiveSpace(model), dependencies=[model])
+    view.refresh()
+    solara.FigureMatplotlib(view.figure, dependencies=[model, counter], format="png", bbox_inches="tight")
+
 WasteCountComponent = make_plot_component("WasteCountChart")
 DistancePlotComponent = make_plot_component("Metrics_Text")
 
 # Création du Dashboard Solara
 page = SolaraViz(
     model,
-    components=[SpaceGraph, WasteCountChart, Metrics_Text],
+    components=[SpaceView, WasteCountChart, Metrics_Text, ProfileTable],
     model_params=model_params,
     name="Simulation de Robots",
 )
\ No newline at end of file
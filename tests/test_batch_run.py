@@ -0,0 +1,31 @@
+'''
+@authors
+Rayane Bouaita
+Gabriel Trier
+Pierre El Anati
+
+Groupe 21
+
+@date 11/03/2025
+'''
+
+import csv
+
+import batch_run
+from model import RobotModel
+
+
+def test_sweep_writes_every_reporter(tmp_path):
+    output = tmp_path / "sweep.csv"
+    assert batch_run.sweep({"n_green": [1]}, range(1), str(output), max_steps=20, workers=1) == 1
+
+    with open(output, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 1
+    reporters = RobotModel(seed=0).datacollector.model_reporters
+    for name in reporters:
+        assert name in rows[0]
+    assert rows[0]["seed"] == "0"
+
+    #Relance : la configuration déjà présente est ignorée
+    assert batch_run.sweep({"n_green": [1]}, range(1), str(output), max_steps=20, workers=1) == 0
@@ -0,0 +1,56 @@
+'''
+@authors
+Rayane Bouaita
+Gabriel Trier
+Pierre El Anati
+
+Groupe 21
+
+@date 11/03/2025
+'''
+
+import json
+
+import numpy as np
+import pytest
+
+import checkpoint
+from model import RobotModel
+
+
+def _model():
+    model = RobotModel(seed=7)
+    for _ in range(10):
+        model.step()
+    return model
+
+
+def _with_meta(data, **changes):
+    meta = json.loads(data["meta"].tobytes())
+    meta.update(changes)
+    return dict(data, meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8))
+
+
+def test_restore_continues_identically():
+    model = _model()
+    restored = checkpoint.restore(RobotModel, checkpoint.snapshot(model))
+    for _ in range(20):
+        model.step()
+        restored.step()
+    assert restored.datacollector.model_vars == model.datacollector.model_vars
+
+
+def test_restore_refuses_mismatched_robots():
+    data = checkpoint.snapshot(_model())
+    meta = json.loads(data["meta"].tobytes())
+    robots = dict(meta["robots"], classes=list(reversed(meta["robots"]["classes"])))
+    with pytest.raises(ValueError, match="robots recréés"):
+        checkpoint.restore(RobotModel, _with_meta(data, robots=robots))
+
+
+def test_load_names_the_file(tmp_path):
+    path = tmp_path / "model.npz"
+    data = _with_meta(checkpoint.snapshot(_model()), version=checkpoint.CHECKPOINT_VERSION + 1)
+    np.savez_compressed(path, **data)
+    with pytest.raises(ValueError, match="model.npz"):
+        checkpoint.load(RobotModel, path)
@@ -0,0 +1,48 @@
+'''
+@authors
+Rayane Bouaita
+Gabriel Trier
+Pierre El Anati
+
+Groupe 21
+
+@date 11/03/2025
+'''
+
+import pytest
+
+from model import FREE_THREADED, RobotModel
+
+PARAMS = dict(width=30, height=18, green_waste=30, yellow_waste=20, red_waste=10,
+              n_green=4, n_yellow=4, n_red=4, step_mode="two_phase")
+
+
+def _final_state(model):
+    return [(robot.unique_id, robot.pos, tuple(robot.inventory), robot.distance) for robot in model.robots]
+
+
+@pytest.mark.skipif(FREE_THREADED, reason="interpréteur sans GIL")
+def test_workers_refused_with_gil():
+    with pytest.raises(ValueError, match="sans GIL"):
+        RobotModel(seed=0, deliberation_workers=2, **PARAMS)
+
+
+@pytest.mark.skipif(not FREE_THREADED, reason="pool de délibération réservé aux interpréteurs sans GIL")
+def test_workers_match_serial_and_close():
+    serial = RobotModel(seed=4, **PARAMS)
+    pooled = RobotModel(seed=4, deliberation_workers=4, **PARAMS)
+    try:
+        for _ in range(60):
+            serial.step()
+            pooled.step()
+    finally:
+        pooled.close()
+    assert _final_state(pooled) == _final_state(serial)
+    assert pooled._deliberation_pool is None
+
+
+def test_close_without_pool():
+    model = RobotModel(seed=0, **PARAMS)
+    model.close()
+    model.step()
+    assert model.step_count == 1
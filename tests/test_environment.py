@@ -0,0 +1,41 @@
+'''
+@authors
+Rayane Bouaita
+Gabriel Trier
+Pierre El Anati
+
+Groupe 21
+
+@date 11/03/2025
+'''
+
+import gc
+
+from model import RobotModel
+
+
+def _occupied(model):
+    return {pos for agents, pos in model.grid.coord_iter() if agents}
+
+
+def test_each_consumer_gets_every_dirty_cell():
+    model = RobotModel(seed=2)
+    first, second = model.grid.track_dirty_cells(), model.grid.track_dirty_cells()
+    before = _occupied(model)
+    for _ in range(5):
+        model.step()
+    changed = first.pop_all()
+    assert changed
+    assert changed >= before ^ _occupied(model)
+    #Le premier consommateur a vidé son ensemble, pas celui du second
+    assert second.pop_all() == changed
+    assert not first and not second
+
+
+def test_released_consumer_is_no_longer_fed():
+    model = RobotModel(seed=2)
+    cells = model.grid.track_dirty_cells()
+    assert len(model.grid.dirty_cells) == 1
+    del cells
+    gc.collect()
+    assert len(model.grid.dirty_cells) == 0
@@ -0,0 +1,32 @@
+'''
+@authors
+Rayane Bouaita
+Gabriel Trier
+Pierre El Anati
+
+Groupe 21
+
+@date 11/03/2025
+'''
+
+import logging
+
+import benchmark
+import logs
+from model import RobotModel
+
+
+def test_models_do_not_change_logging():
+    logs.configure(quiet=False)
+    try:
+        RobotModel(seed=0)
+        assert all(logger.isEnabledFor(logging.DEBUG) for logger in logs.CATEGORIES.values())
+    finally:
+        logs.configure(quiet=True)
+
+
+def test_benchmark_restores_logging():
+    params = dict(benchmark.SCENARIOS["default"])
+    steps = params.pop("steps")
+    assert benchmark.run_concurrent_models("default", params, steps // 10, 2)["identical"]
+    assert logging.root.manager.disable == logging.NOTSET
@@ -0,0 +1,42 @@
+'''
+@authors
+Rayane Bouaita
+Gabriel Trier
+Pierre El Anati
+
+Groupe 21
+
+@date 11/03/2025
+'''
+
+from concurrent.futures import ThreadPoolExecutor
+
+from model import RobotModel
+
+PARAMS = dict(width=15, height=9, green_waste=8, yellow_waste=10, red_waste=10, n_green=4, n_yellow=4, n_red=4)
+SEEDS = range(6)
+
+
+def _run(seed, steps=120):
+    model = RobotModel(seed=seed, **PARAMS)
+    while model.running and model.step_count < steps:
+        model.step()
+    positions = [(robot.unique_id, robot.pos, tuple(robot.inventory)) for robot in model.robots]
+    return model.datacollector.model_vars, positions
+
+
+def test_concurrent_models_match_serial_runs():
+    serial = [_run(seed) for seed in SEEDS]
+    with ThreadPoolExecutor(len(SEEDS)) as pool:
+        concurrent = list(pool.map(_run, SEEDS))
+    for (serial_vars, serial_positions), (vars_, positions) in zip(serial, concurrent):
+        assert vars_ == serial_vars
+        assert positions == serial_positions
+
+
+def test_models_do_not_share_agents():
+    first, second = RobotModel(seed=0, **PARAMS), RobotModel(seed=0, **PARAMS)
+    assert first.message_service is not second.message_service
+    for robot in first.robots:
+        assert first.message_service.find_agent_from_name(robot.get_name()) is robot
+        assert second.message_service.find_agent_from_name(robot.get_name()) is not robot
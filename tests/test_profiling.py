@@ -0,0 +1,44 @@
+'''
+@authors
+Rayane Bouaita
+Gabriel Trier
+Pierre El Anati
+
+Groupe 21
+
+@date 11/03/2025
+'''
+
+import numpy as np
+
+from model import RobotModel
+from profiling import BINS_PER_DECADE, HISTOGRAM_BINS, Timing
+
+
+def test_timing_percentiles_close_to_exact():
+    durations = np.random.default_rng(0).lognormal(np.log(2e-5), 1.0, 10_000)
+    timing = Timing()
+    for elapsed in durations:
+        timing.add(float(elapsed))
+    assert timing.count == len(durations)
+    assert np.isclose(timing.total, durations.sum())
+    assert timing.max == durations.max()
+    exact = np.percentile(durations, [50, 90, 99])
+    #Erreur au plus d'une demi-classe de l'histogramme
+    assert np.all(np.abs(np.log10(timing.percentiles([50, 90, 99]) / exact)) <= 1 / BINS_PER_DECADE)
+
+
+def test_profiler_memory_does_not_grow_with_steps():
+    model = RobotModel(seed=3, profile=True)
+    for _ in range(50):
+        model.step()
+    step = model.profiler.timings[("step", "RobotModel", None)]
+    assert step.count == 50
+    #Une durée de plus ne fait que changer les compteurs du Timing
+    assert all(timing.bins.shape == (HISTOGRAM_BINS,) for timing in model.profiler.timings.values())
+    assert set(vars(step)) == {"count", "total", "max", "bins"}
+
+    report = model.profile_report()
+    row = report[report.phase == "step"].iloc[0]
+    assert row["count"] == 50
+    assert row["p50_ms"] <= row["max_ms"]
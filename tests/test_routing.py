@@ -0,0 +1,31 @@
+'''
+@authors
+Rayane Bouaita
+Gabriel Trier
+Pierre El Anati
+
+Groupe 21
+
+@date 11/03/2025
+'''
+
+from concurrent.futures import ThreadPoolExecutor
+
+from model import RobotModel
+
+
+def test_distance_field_cache_shared_by_threads():
+    model = RobotModel(seed=0, width=30, height=18, routing=True)
+    router = model.router
+    router.max_fields = 8
+    targets = [(x, y) for x in range(model.width) for y in range(model.height)][:200]
+
+    def query(offset):
+        for i in range(300):
+            target = targets[(offset * 37 + i) % len(targets)]
+            field = router.distance_field([target])
+            assert field[target] == 0
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(query, range(8)))
+    assert len(router._fields) <= router.max_fields
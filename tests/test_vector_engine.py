@@ -0,0 +1,23 @@
+'''
+@authors
+Rayane Bouaita
+Gabriel Trier
+Pierre El Anati
+
+Groupe 21
+
+@date 11/03/2025
+'''
+
+import pytest
+
+from vector_engine import check_parity
+
+
+@pytest.mark.parametrize("params", [
+    {},
+    dict(width=21, height=12, green_waste=8, yellow_waste=6, red_waste=4),
+])
+def test_vector_engine_matches_robot_model(params):
+    #Aucune divergence, step par step, avec RobotModel sur les mêmes graines
+    assert check_parity(range(8), max_steps=300, **params) == []
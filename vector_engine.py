@@ -0,0 +1,534 @@
+'''
+@authors
+Rayane Bouaita
+Gabriel Trier
+Pierre El Anati
+
+Groupe 21
+
+@date 11/03/2025
+'''
+
+import argparse
+import copy
+import random
+import time
+
+import numpy as np
+
+from objects import WASTE_TYPES
+
+#Indices des robots (un par couleur) et des types de déchets, dans l'ordre de WASTE_TYPES
+GREEN, YELLOW, RED = 0, 1, 2
+
+#Au-delà, les identifiants des déchets initiaux rejoignent ceux des déchets déposés (1000, 1001, ...)
+#et le filtre last_dropped_waste_id des robots n'est plus neutre
+MAX_INITIAL_WASTE = 1000
+
+#Tableaux indexés par réplica (première dimension), restreints aux réplicas en cours par run()
+REPLICA_ARRAYS = ("seeds", "x", "y", "direction_x", "direction_y", "blocked_steps", "inventory",
+                  "has_transformed", "distance", "waste", "waste_on_grid", "has_target", "target_x",
+                  "target_y", "request", "request_x", "request_y", "running", "step_count", "deposition_step")
+
+#Ordre de get_neighborhood (von Neumann, sans le centre), suivi par la priorité 3 du robot rouge
+NEIGHBOR_OFFSETS = ((-1, 0), (0, -1), (0, 1), (1, 0))
+
+
+class VectorRobotModel:
+    """VectorRobotModel class.
+    K replicas of the mission with one robot per colour (AloneGreen, AloneYellow and a single
+    RedRobot, i.e. RobotModel(n_green=1, n_yellow=1, n_red=1)) stored as NumPy arrays and
+    advanced together, one batched tick at a time. Replica i starts from the same state as
+    RobotModel(seed=seeds[i]) and follows exactly the same sweep, pickup, transform, drop,
+    move_east and red robot targeting rules.
+
+    attr:
+        seeds: the seed of each replica (numpy array)
+        x, y: the position of each robot, shape (K, 3) (numpy array)
+        direction_x, direction_y: the sweep direction of each robot, shape (K, 3) (numpy array)
+        blocked_steps: the blocking counter of each robot, shape (K, 3) (numpy array)
+        inventory: the number of wastes of each type carried by each robot, shape (K, 3, 3) (numpy array)
+        has_transformed: the hasTransformed flag of the green and yellow robots, shape (K, 3) (numpy array)
+        distance: the distance travelled by each robot, shape (K, 3) (numpy array)
+        waste: the number of wastes of each type in each cell, shape (K, width * height, 3) (numpy array)
+        running: False once every waste of the replica has been disposed of (numpy array)
+        step_count: the number of steps of each replica (numpy array)
+        deposition_step: the step at which every waste was disposed of, -1 if not yet (numpy array)
+    """
+
+    def __init__(self, seeds, width=15, height=9, green_waste=4, yellow_waste=4, red_waste=4):
+        """ Create one replica per seed, placed as RobotModel(seed=seed) would place it.
+        """
+        if width < 3 or height < 2:
+            raise ValueError("La grille doit faire au moins 3x2 cases.")
+        if green_waste + yellow_waste + red_waste > MAX_INITIAL_WASTE:
+            raise ValueError(f"Au plus {MAX_INITIAL_WASTE} déchets initiaux sont supportés.")
+
+        self.seeds = np.asarray(seeds)
+        self.width = width
+        self.height = height
+        self.green_waste = green_waste
+        self.yellow_waste = yellow_waste
+        self.red_waste = red_waste
+        self.zone_width = width // 3
+        n = len(self.seeds)
+        self._rows = np.arange(n)
+        self._n_cells = width * height
+
+        #Zones assignées par RobotModel.create_robots (x_min, x_max), y sur toute la hauteur
+        zw = self.zone_width
+        self.x_min = np.array([0, zw - 1, 2 * zw - 1])
+        self.x_max = np.array([zw - 1, 2 * zw - 1, 3 * zw - 2])
+
+        self.x = np.zeros((n, 3), dtype=np.int64)
+        self.y = np.zeros((n, 3), dtype=np.int64)
+        self.direction_x = np.ones((n, 3), dtype=np.int64)
+        self.direction_y = np.ones((n, 3), dtype=np.int64)
+        self.blocked_steps = np.zeros((n, 3), dtype=np.int64)
+        self.inventory = np.zeros((n, 3, len(WASTE_TYPES)), dtype=np.int64)
+        self.has_transformed = np.zeros((n, 3), dtype=bool)
+        self.distance = np.zeros((n, 3), dtype=np.int64)
+        self.waste = np.zeros((n, width * height, len(WASTE_TYPES)), dtype=np.int32)
+        self._cells = self.waste.reshape(-1, len(WASTE_TYPES))
+        self.waste_on_grid = np.zeros(n, dtype=np.int64)
+
+        #Cible du robot rouge et message REQUEST en attente (livré au step suivant)
+        self.has_target = np.zeros(n, dtype=bool)
+        self.target_x = np.zeros(n, dtype=np.int64)
+        self.target_y = np.zeros(n, dtype=np.int64)
+        self.request = np.zeros(n, dtype=bool)
+        self.request_x = np.zeros(n, dtype=np.int64)
+        self.request_y = np.zeros(n, dtype=np.int64)
+
+        self.running = np.ones(n, dtype=bool)
+        self.step_count = np.zeros(n, dtype=np.int64)
+        self.deposition_step = np.full(n, -1, dtype=np.int64)
+
+        for i, seed in enumerate(self.seeds):
+            self._place(i, random.Random(int(seed)))
+
+    def _place(self, i, rnd):
+        #Mêmes tirages, dans le même ordre, que add_initial_waste puis create_robots
+        zw, height = self.zone_width, self.height
+        waste_ranges = ((GREEN, self.green_waste, 0, zw),
+                        (YELLOW, self.yellow_waste, zw, 2 * zw),
+                        (RED, self.red_waste, 2 * zw, self.width - 1))
+        for waste_type, count, low, high in waste_ranges:
+            for _ in range(count):
+                x = rnd.randrange(low, high)
+                y = rnd.randrange(0, height)
+                self.waste[i, x * height + y, waste_type] += 1
+            self.waste_on_grid[i] += count
+        for robot in (GREEN, YELLOW, RED):
+            self.x[i, robot] = rnd.randrange(self.x_min[robot], self.x_max[robot] + 1)
+            self.y[i, robot] = rnd.randrange(0, height)
+
+    @property
+    def distance_by_type(self):
+        """ Return the distance travelled by each colour, as RobotModel.distance_by_type.
+        """
+        return {waste_type: self.distance[:, i] for i, waste_type in enumerate(WASTE_TYPES)}
+
+    def _robot_at(self, x, y):
+        robots_x, robots_y = self.x, self.y
+        return (((robots_x[:, GREEN] == x) & (robots_y[:, GREEN] == y))
+                | ((robots_x[:, YELLOW] == x) & (robots_y[:, YELLOW] == y))
+                | ((robots_x[:, RED] == x) & (robots_y[:, RED] == y)))
+
+    def _in_grid(self, x, y):
+        return (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+
+    def _in_zone(self, robot, x, y):
+        return (x >= self.x_min[robot]) & (x <= self.x_max[robot]) & (y >= 0) & (y < self.height)
+
+    def _zone_index(self, x):
+        return np.where(x < self.zone_width, 0, np.where(x < 2 * self.zone_width, 1, 2))
+
+    def _cell_waste(self, x, y):
+        #Contenu (par type) de la case, 0 pour les cases hors de la grille
+        inside = self._in_grid(x, y)
+        cell = np.where(inside, x * self.height + y, 0)
+        return np.take(self._cells, self._rows * self._n_cells + cell, axis=0) * inside[:, None]
+
+    def _move_to(self, robot, mask, x, y, count=True):
+        if not mask.any():
+            return
+        self.x[:, robot] = np.where(mask, x, self.x[:, robot])
+        self.y[:, robot] = np.where(mask, y, self.y[:, robot])
+        if count:
+            self.distance[:, robot] += mask
+
+    def _clip_x(self, robot, x):
+        return np.clip(x, self.x_min[robot], self.x_max[robot])
+
+    def _clip_y(self, y):
+        return np.clip(y, 0, self.height - 1)
+
+    def _sweep(self, robot, mask):
+        # Balayage en serpentin commun à RobotAgent.move, AloneGreen.move et AloneYellow.move
+        x, y = self.x[:, robot], self.y[:, robot]
+        dx, dy = self.direction_x[:, robot], self.direction_y[:, robot]
+        new_x, new_y = x + dx, y.copy()
+
+        edge = mask & ((new_x < self.x_min[robot]) | (new_x > self.x_max[robot]))
+        dx = np.where(edge, -dx, dx)
+        new_x = np.where(edge, x, new_x)
+        new_y = np.where(edge, y + dy, new_y)
+        vertical_edge = edge & ((new_y < 0) | (new_y >= self.height))
+        dy = np.where(vertical_edge, -dy, dy)
+        new_y = np.where(vertical_edge, y + dy, new_y)
+
+        outside = mask & ~self._in_grid(new_x, new_y)
+        new_x, new_y = np.where(outside, x, new_x), np.where(outside, y, new_y)
+        dx, dy = np.where(outside, -dx, dx), np.where(outside, -dy, dy)
+        return new_x, new_y, dx, dy
+
+    def _try_alternatives(self, robot, mask, alternatives, exclude_current=False):
+        if not mask.any():
+            return
+        x, y = self.x[:, robot], self.y[:, robot]
+        moved = np.zeros_like(mask)
+        for alt_x, alt_y in alternatives:
+            valid = mask & ~moved & self._in_grid(alt_x, alt_y) & self._in_zone(robot, alt_x, alt_y)
+            if exclude_current:
+                valid &= (alt_x != x) | (alt_y != y)
+            valid &= ~self._robot_at(alt_x, alt_y)
+            self._move_to(robot, valid, alt_x, alt_y)
+            moved |= valid
+        self.blocked_steps[:, robot] = np.where(moved, 0, self.blocked_steps[:, robot])
+
+    def _move_green(self, mask):
+        # AloneGreen.move
+        if not mask.any():
+            return
+        robot = GREEN
+        x, y = self.x[:, robot].copy(), self.y[:, robot].copy()
+        new_x, new_y, dx, dy = self._sweep(robot, mask)
+        outside = mask & ~self._in_zone(robot, new_x, new_y)
+        new_x, new_y = np.where(outside, x, new_x), np.where(outside, y, new_y)
+        dx, dy = np.where(outside, -dx, dx), np.where(outside, -dy, dy)
+        self.direction_x[:, robot], self.direction_y[:, robot] = dx, dy
+
+        free = mask & ~self._robot_at(new_x, new_y)
+        self._move_to(robot, free, new_x, new_y)
+        self.blocked_steps[:, robot] = np.where(free, 0, self.blocked_steps[:, robot] + (mask & ~free))
+
+        retry = mask & ~free & (self.blocked_steps[:, robot] > 5)
+        alternatives = ((self._clip_x(robot, x - 2 * dx), y),
+                        (x, self._clip_y(y - 1)),
+                        (x, self._clip_y(y + 1)))
+        self._try_alternatives(robot, retry, alternatives)
+
+    def _move_yellow(self, mask):
+        # AloneYellow.move
+        if not mask.any():
+            return
+        robot = YELLOW
+        x, y = self.x[:, robot].copy(), self.y[:, robot].copy()
+        corrected_x, corrected_y = self._clip_x(robot, x), self._clip_y(y)
+        correction = mask & ((corrected_x != x) | (corrected_y != y))
+        self._move_to(robot, correction, corrected_x, corrected_y, count=False)
+        mask = mask & ~correction
+
+        new_x, new_y, dx, dy = self._sweep(robot, mask)
+        outside = mask & ~self._in_zone(robot, new_x, new_y)
+        new_x, new_y = np.where(outside, corrected_x, new_x), np.where(outside, corrected_y, new_y)
+        dx, dy = np.where(outside, -dx, dx), np.where(outside, -dy, dy)
+        self.direction_x[:, robot], self.direction_y[:, robot] = dx, dy
+
+        #Position inchangée : première direction (Est, Ouest, Sud, Nord) restant dans la zone
+        stuck = mask & (new_x == x) & (new_y == y)
+        for step_x, step_y in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            test_x, test_y = x + step_x, y + step_y
+            found = stuck & self._in_zone(robot, test_x, test_y) & self._in_grid(test_x, test_y)
+            new_x, new_y = np.where(found, test_x, new_x), np.where(found, test_y, new_y)
+            stuck &= ~found
+
+        free = mask & ~self._robot_at(new_x, new_y)
+        self._move_to(robot, free, new_x, new_y)
+        self.blocked_steps[:, robot] = np.where(free, 0, self.blocked_steps[:, robot] + (mask & ~free))
+
+        retry = mask & ~free & (self.blocked_steps[:, robot] > 5)
+        left, right = self._clip_x(robot, x - 1), self._clip_x(robot, x + 1)
+        up, down = self._clip_y(y - 1), self._clip_y(y + 1)
+        alternatives = ((self._clip_x(robot, x - 2 * dx), y), (x, up), (x, down),
+                        (left, up), (left, down), (right, up), (right, down))
+        self._try_alternatives(robot, retry, alternatives, exclude_current=True)
+
+    def _move_red(self, mask):
+        # RobotAgent.move (pas de compteur de blocage)
+        if not mask.any():
+            return
+        robot = RED
+        new_x, new_y, dx, dy = self._sweep(robot, mask)
+        self.direction_x[:, robot], self.direction_y[:, robot] = dx, dy
+        free = mask & ~self._robot_at(new_x, new_y)
+        self._move_to(robot, free, new_x, new_y)
+
+    def _move_east(self, robot, mask):
+        if not mask.any():
+            return
+        x, y = self.x[:, robot], self.y[:, robot]
+        ok = mask & (x + 1 < self.width)
+        if robot != RED:
+            #Le robot rouge est autorisé dans toutes les zones
+            ok &= self._zone_index(x + 1) == robot
+        self._move_to(robot, ok, x + 1, y)
+
+    def _move_vertical(self, robot, mask):
+        if not mask.any():
+            return
+        x, y = self.x[:, robot], self.y[:, robot]
+        moved = np.zeros_like(mask)
+        for new_y in (y - 1, y + 1):
+            ok = mask & ~moved & (new_y >= 0) & (new_y < self.height)
+            ok &= (self._cell_waste(x, new_y).sum(axis=1) == 0) & ~self._robot_at(x, new_y)
+            self._move_to(robot, ok, x, new_y)
+            moved |= ok
+
+    def _pickup(self, robot, mask, waste_type):
+        if not mask.any():
+            return
+        cell = self.x[:, robot] * self.height + self.y[:, robot]
+        self.waste[self._rows[mask], cell[mask], waste_type] -= 1
+        self.inventory[:, robot, waste_type] += mask
+        self.waste_on_grid -= mask
+
+    def _drop(self, robot, mask, waste_type):
+        if not mask.any():
+            return
+        cell = self.x[:, robot] * self.height + self.y[:, robot]
+        self.waste[self._rows[mask], cell[mask], waste_type] += 1
+        self.inventory[:, robot, waste_type] -= mask
+        self.waste_on_grid += mask
+        self.has_transformed[:, robot] &= ~mask
+
+    def _step_gatherer(self, robot, active):
+        # GreenGather.deliberate / AloneYellow.deliberate puis RobotModel.do
+        collected, produced = robot, robot + 1
+        here = self._cell_waste(self.x[:, robot], self.y[:, robot])
+        carried = self.inventory[:, robot, collected]
+
+        pickup = active & (here[:, collected] > 0) & (carried < 2)
+        transform = active & ~pickup & ~self.has_transformed[:, robot] & (carried >= 2)
+        deliver = (active & ~pickup & ~transform
+                   & (self.has_transformed[:, robot] | (self.inventory[:, robot, produced] == 1)))
+        at_column = self.x[:, robot] == (robot + 1) * self.zone_width - 1
+        empty = here.sum(axis=1) == 0
+        drop = deliver & at_column & empty
+        wander = active & ~(pickup | transform | deliver)
+
+        self._pickup(robot, pickup, collected)
+        self.inventory[:, robot, collected] -= 2 * transform
+        self.inventory[:, robot, produced] += transform
+        self.has_transformed[:, robot] |= transform
+        self._drop(robot, drop, produced)
+        if robot == YELLOW:
+            #notify_waste_drop : REQUEST au robot rouge, livré au prochain dispatch
+            self.request |= drop
+            self.request_x = np.where(drop, self.x[:, robot], self.request_x)
+            self.request_y = np.where(drop, self.y[:, robot], self.request_y)
+        self._move_vertical(robot, deliver & at_column & ~empty)
+        self._move_east(robot, deliver & ~at_column)
+
+        self.distance[:, robot] += wander
+        if robot == GREEN:
+            self._move_green(wander)
+        else:
+            self._move_yellow(wander)
+
+    def _step_red(self, active, inbox, inbox_x, inbox_y):
+        # RedRobot.process_messages, RedRobot.deliberate (un seul robot rouge) puis RobotModel.do
+        x, y = self.x[:, RED].copy(), self.y[:, RED].copy()
+        carried = self.inventory[:, RED, RED]
+
+        #REQUEST pris en compte seulement sans cible et inventaire vide ; sinon il finit dans
+        #waste_locations, vidé au dépôt suivant avant d'avoir pu servir (priorité 2.5 jamais atteinte)
+        accept = active & inbox & ~self.has_target & (carried == 0)
+        self.has_target |= accept
+        self.target_x = np.where(accept, inbox_x, self.target_x)
+        self.target_y = np.where(accept, inbox_y, self.target_y)
+
+        here = self._cell_waste(x, y)
+        #Priorité 1 : déchet rouge sur la case
+        pickup = active & (carried == 0) & (here[:, RED] > 0)
+        self.has_target &= ~pickup
+        rest = active & ~pickup
+
+        #Priorité 2 : se rapprocher de la cible (axe le plus éloigné d'abord)
+        chase = rest & self.has_target & (carried == 0)
+        arrived = chase & (x == self.target_x) & (y == self.target_y)
+        self.has_target &= ~arrived
+        chase &= ~arrived
+        dx, dy = self.target_x - x, self.target_y - y
+        horizontal = np.abs(dx) > np.abs(dy)
+        step_x = np.where(horizontal, x + np.where(dx > 0, 1, -1), x)
+        step_y = np.where(horizontal, y, y + np.where(dy > 0, 1, -1))
+        chase &= self._in_grid(step_x, step_y) & ~self._robot_at(step_x, step_y)
+        self._move_to(RED, chase, step_x, step_y)
+
+        #Priorité 3 : premier voisin contenant un déchet rouge
+        search = rest & ~self.has_target & (carried == 0)
+        targeted = np.zeros_like(search)
+        for offset_x, offset_y in NEIGHBOR_OFFSETS:
+            if not search.any():
+                break
+            near_x, near_y = x + offset_x, y + offset_y
+            found = search & (self._cell_waste(near_x, near_y)[:, RED] > 0)
+            self.has_target |= found
+            self.target_x = np.where(found, near_x, self.target_x)
+            self.target_y = np.where(found, near_y, self.target_y)
+            self._move_to(RED, found, near_x, near_y)
+            search &= ~found
+            targeted |= found
+
+        #Priorité 4 : dépôt dans la zone de dépôt, sinon vers l'est
+        deliver = rest & (carried > 0)
+        drop = deliver & (x == self.width - 1) & (here.sum(axis=1) == 0)
+        self.has_target &= ~drop
+        self.inventory[:, RED, RED] -= drop
+        self._move_east(RED, deliver & ~drop)
+
+        #Priorité 5 : un seul robot rouge, donc pas de marche aléatoire mais move standard
+        #(y compris quand le pas vers la cible est bloqué par un robot)
+        wander = rest & ~chase & ~targeted & ~deliver
+        self._pickup(RED, pickup, RED)
+        self.distance[:, RED] += wander
+        self._move_red(wander)
+
+    def step(self):
+        """ Advance every running replica by one RobotModel step.
+        """
+        finished = self.running & (self.waste_on_grid == 0) & (self.inventory.sum(axis=(1, 2)) == 0)
+        self.deposition_step = np.where(finished, self.step_count, self.deposition_step)
+        self.running &= ~finished
+        active = self.running
+
+        #dispatch_messages : les REQUEST du step précédent arrivent dans la boîte du robot rouge
+        inbox = self.request & active
+        inbox_x, inbox_y = self.request_x, self.request_y
+        self.request = self.request & ~active
+
+        self._step_gatherer(GREEN, active)
+        self._step_gatherer(YELLOW, active)
+        self._step_red(active, inbox, inbox_x, inbox_y)
+        self.step_count += active
+
+    def _subset(self, rows):
+        #Copie restreinte aux réplicas donnés (mêmes paramètres, tableaux indexés par rows)
+        engine = copy.copy(self)
+        for name in REPLICA_ARRAYS:
+            setattr(engine, name, getattr(self, name)[rows])
+        engine._rows = np.arange(len(rows))
+        engine._cells = engine.waste.reshape(-1, len(WASTE_TYPES))
+        return engine
+
+    def run(self, max_steps=5000, window=32):
+        """ Step until every replica is finished or max_steps steps have been run.
+        Every window steps, the finished replicas are left out of the batch so that only the
+        running ones are advanced; their final state is written back into this object.
+        """
+        done = 0
+        while done < max_steps and self.running.any():
+            rows = np.flatnonzero(self.running)
+            engine = self if len(rows) == len(self.running) else self._subset(rows)
+            for _ in range(min(window, max_steps - done)):
+                if not engine.running.any():
+                    break
+                engine.step()
+                done += 1
+            if engine is not self:
+                for name in REPLICA_ARRAYS:
+                    getattr(self, name)[rows] = getattr(engine, name)
+        return self
+
+
+def _model_state(model):
+    #Même représentation que VectorRobotModel pour un RobotModel (robots dans l'ordre vert, jaune, rouge)
+    robots = model.robots
+    positions = [robot.pos for robot in robots]
+    inventory = [[robot.inventory.count(waste_type) for waste_type in WASTE_TYPES] for robot in robots]
+    return (positions, inventory, [robot.distance for robot in robots],
+            model.grid.waste_count.reshape(len(WASTE_TYPES), -1).T.tolist())
+
+
+def _replica_state(engine, i):
+    positions = [(int(engine.x[i, r]), int(engine.y[i, r])) for r in (GREEN, YELLOW, RED)]
+    return (positions, engine.inventory[i].tolist(), engine.distance[i].tolist(), engine.waste[i].tolist())
+
+
+def check_parity(seeds, max_steps=400, **params):
+    """ Run RobotModel and VectorRobotModel side by side on the same seeds and compare the robots
+    positions, inventories, distances and waste grids after every step.
+    Return the list of (seed, step) where the first divergence of each replica happened.
+    """
+    from model import RobotModel
+
+    engine = VectorRobotModel(seeds, **params)
+    models = [RobotModel(**params, seed=int(seed)) for seed in seeds]
+    divergences = {}
+    for step in range(max_steps + 1):
+        for i, model in enumerate(models):
+            if i in divergences:
+                continue
+            same = _model_state(model) == _replica_state(engine, i)
+            same = same and model.running == bool(engine.running[i])
+            same = same and (model.deposition_step if model.deposition_step is not None else -1) == engine.deposition_step[i]
+            if not same:
+                divergences[i] = (int(seeds[i]), step)
+        if step == max_steps or not any(model.running for model in models):
+            break
+        for model in models:
+            if model.running:
+                model.step()
+        engine.step()
+    return sorted(divergences.values())
+
+
+def compare_throughput(n_replicas, max_steps=1000, n_models=50, **params):
+    """ Return the replicas/sec of VectorRobotModel on n_replicas seeds and of a loop of n_models
+    RobotModel runs on the same seeds.
+    """
+    from model import RobotModel
+
+    seeds = np.arange(n_replicas)
+    start = time.perf_counter()
+    VectorRobotModel(seeds, **params).run(max_steps)
+    vector_rate = n_replicas / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for seed in seeds[:n_models]:
+        model = RobotModel(**params, seed=int(seed))
+        while model.running and model.step_count < max_steps:
+            model.step()
+    model_rate = min(n_models, n_replicas) / (time.perf_counter() - start)
+    return vector_rate, model_rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulation vectorisée de K réplicas (un robot par couleur).")
+    parser.add_argument("--replicas", type=int, default=10000)
+    parser.add_argument("--max-steps", type=int, default=1000)
+    parser.add_argument("--parity", type=int, default=0, help="vérifie la parité avec RobotModel sur N graines")
+    parser.add_argument("--throughput", action="store_true", help="compare les réplicas/s avec une boucle de RobotModel")
+    args = parser.parse_args()
+
+    if args.parity:
+        divergences = check_parity(np.arange(args.parity), args.max_steps)
+        print(f"Parité : {args.parity - len(divergences)}/{args.parity} réplicas identiques à RobotModel")
+        for seed, step in divergences:
+            print(f"  graine {seed} : divergence au step {step}")
+    if args.throughput:
+        vector_rate, model_rate = compare_throughput(args.replicas, args.max_steps)
+        print(f"VectorRobotModel : {vector_rate:10.1f} réplicas/s | RobotModel : {model_rate:8.1f} réplicas/s "
+              f"| x{vector_rate / model_rate:.1f}")
+        return
+
+    engine = VectorRobotModel(np.arange(args.replicas)).run(args.max_steps)
+    done = engine.deposition_step[engine.deposition_step >= 0]
+    print(f"{len(done)}/{args.replicas} réplicas terminés, deposition_step moyen : "
+          f"{done.mean() if len(done) else float('nan'):.1f}")
+
+
+if __name__ == "__main__":
+    main()